@@ -0,0 +1,93 @@
+"""add grade stats tables
+
+Revision ID: 3f9c2d7b1e04
+Revises: de570aa59e05
+Create Date: 2026-10-16 09:12:31.402118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2d7b1e04"
+down_revision: Union[str, Sequence[str], None] = "de570aa59e05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    existing_tables = set(sa.inspect(bind).get_table_names())
+
+    if "course_student_stats" not in existing_tables:
+        op.create_table(
+            "course_student_stats",
+            sa.Column("course_id", sa.Integer(), nullable=False),
+            sa.Column("student_id", sa.Integer(), nullable=False),
+            sa.Column("total_assignments", sa.Integer(), nullable=False),
+            sa.Column("submitted", sa.Integer(), nullable=False),
+            sa.Column("graded", sa.Integer(), nullable=False),
+            sa.Column("score_sum", sa.Float(), nullable=False),
+            sa.ForeignKeyConstraint(["course_id"], ["courses.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["student_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("course_id", "student_id"),
+        )
+        op.create_index(
+            "ix_course_student_stats_student_id",
+            "course_student_stats",
+            ["student_id"],
+        )
+
+    if "course_assignment_stats" not in existing_tables:
+        op.create_table(
+            "course_assignment_stats",
+            sa.Column("course_id", sa.Integer(), nullable=False),
+            sa.Column("assignment_id", sa.Integer(), nullable=False),
+            sa.Column("total_students", sa.Integer(), nullable=False),
+            sa.Column("submitted", sa.Integer(), nullable=False),
+            sa.Column("graded", sa.Integer(), nullable=False),
+            sa.Column("score_sum", sa.Float(), nullable=False),
+            sa.ForeignKeyConstraint(["course_id"], ["courses.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(
+                ["assignment_id"], ["assignments.id"], ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("course_id", "assignment_id"),
+        )
+
+    # backfill from source (same queries as app.services.grade_stats.rebuild)
+    op.execute("DELETE FROM course_student_stats")
+    op.execute("DELETE FROM course_assignment_stats")
+    op.execute("""
+        INSERT INTO course_student_stats
+            (course_id, student_id, total_assignments, submitted, graded, score_sum)
+        SELECT e.course_id, e.student_id, COUNT(a.id), COUNT(s.id), COUNT(s.score),
+               COALESCE(SUM(s.score), 0.0)
+        FROM enrollments e
+        LEFT JOIN assignments a ON a.course_id = e.course_id
+        LEFT JOIN submissions s
+               ON s.assignment_id = a.id AND s.student_id = e.student_id
+        GROUP BY e.course_id, e.student_id
+        """)
+    op.execute("""
+        INSERT INTO course_assignment_stats
+            (course_id, assignment_id, total_students, submitted, graded, score_sum)
+        SELECT a.course_id, a.id,
+               (SELECT COUNT(e.id) FROM enrollments e
+                WHERE e.course_id = a.course_id),
+               COUNT(s.id), COUNT(s.score), COALESCE(SUM(s.score), 0.0)
+        FROM assignments a
+        LEFT JOIN submissions s ON s.assignment_id = a.id
+        GROUP BY a.id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("course_assignment_stats")
+    op.drop_index("ix_course_student_stats_student_id", "course_student_stats")
+    op.drop_table("course_student_stats")
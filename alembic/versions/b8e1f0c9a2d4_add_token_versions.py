@@ -0,0 +1,40 @@
+"""add token versions
+
+Revision ID: b8e1f0c9a2d4
+Revises: 7c2e8a41d5b3
+Create Date: 2026-10-17 09:42:37.104518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e1f0c9a2d4"
+down_revision: Union[str, Sequence[str], None] = "7c2e8a41d5b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if "token_versions" in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        "token_versions",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("token_versions")
@@ -0,0 +1,47 @@
+"""add refresh token families
+
+Revision ID: c3d9e5a7f102
+Revises: b8e1f0c9a2d4
+Create Date: 2026-10-17 11:18:04.662931
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d9e5a7f102"
+down_revision: Union[str, Sequence[str], None] = "b8e1f0c9a2d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if "refresh_token_families" in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        "refresh_token_families",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("generation", sa.Integer(), nullable=False),
+        sa.Column("token_version", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_refresh_token_families_user_id", "refresh_token_families", ["user_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_refresh_token_families_user_id", "refresh_token_families")
+    op.drop_table("refresh_token_families")
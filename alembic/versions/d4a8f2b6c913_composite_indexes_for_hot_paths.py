@@ -0,0 +1,77 @@
+"""composite indexes for hot paths
+
+Revision ID: d4a8f2b6c913
+Revises: c3d9e5a7f102
+Create Date: 2026-10-17 14:02:51.318207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a8f2b6c913"
+down_revision: Union[str, Sequence[str], None] = "c3d9e5a7f102"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, new index, its columns, single-column indexes it makes redundant)
+_COMPOSITE = (
+    (
+        "assignments",
+        "ix_assignments_course_due",
+        # the gradebook's due-date order (NULLs last, then id via the rowid)
+        ["course_id", sa.text("due_at IS NULL"), "due_at"],
+        ["ix_assignments_course_id"],
+    ),
+    (
+        "enrollments",
+        # covering for "students of a course"; student-first lookups already
+        # have the (student_id, course_id) unique constraint
+        "ix_enrollments_course_student",
+        ["course_id", "student_id"],
+        ["ix_enrollments_course_id", "ix_enrollments_student_id"],
+    ),
+)
+# prefix of uq_submission_assignment_student
+_REDUNDANT = (("submissions", "ix_submissions_assignment_id"),)
+
+_SINGLE_COLUMN = {
+    "ix_assignments_course_id": "course_id",
+    "ix_enrollments_course_id": "course_id",
+    "ix_enrollments_student_id": "student_id",
+    "ix_submissions_assignment_id": "assignment_id",
+}
+
+
+def _index_names(table: str) -> set[str]:
+    return {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, name, columns, replaces in _COMPOSITE:
+        existing = _index_names(table)
+        if name not in existing:
+            op.create_index(name, table, columns)
+        for old in replaces:
+            if old in existing:
+                op.drop_index(old, table)
+
+    for table, old in _REDUNDANT:
+        if old in _index_names(table):
+            op.drop_index(old, table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, old in _REDUNDANT:
+        op.create_index(old, table, [_SINGLE_COLUMN[old]])
+
+    for table, name, _columns, replaces in _COMPOSITE:
+        for old in replaces:
+            op.create_index(old, table, [_SINGLE_COLUMN[old]])
+        op.drop_index(name, table)
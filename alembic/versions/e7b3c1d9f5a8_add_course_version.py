@@ -0,0 +1,37 @@
+"""add course version
+
+Revision ID: e7b3c1d9f5a8
+Revises: d4a8f2b6c913
+Create Date: 2026-10-17 15:40:12.927361
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b3c1d9f5a8"
+down_revision: Union[str, Sequence[str], None] = "d4a8f2b6c913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    columns = {c["name"] for c in sa.inspect(bind).get_columns("courses")}
+    if "version" in columns:
+        return
+
+    op.add_column(
+        "courses",
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("courses", "version")
@@ -0,0 +1,43 @@
+"""add cache events
+
+Revision ID: f1a6d3c8e2b4
+Revises: e7b3c1d9f5a8
+Create Date: 2026-10-17 17:08:26.551930
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a6d3c8e2b4"
+down_revision: Union[str, Sequence[str], None] = "e7b3c1d9f5a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if "cache_events" in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        "cache_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("cache", sa.String(length=64), nullable=False),
+        sa.Column("key", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(op.f("ix_cache_events_created_at"), "cache_events", ["created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_cache_events_created_at"), table_name="cache_events")
+    op.drop_table("cache_events")
@@ -4,8 +4,62 @@ from datetime import timedelta
 SECRET_KEY = "change-me-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE = timedelta(minutes=60)
+REFRESH_TOKEN_EXPIRE = timedelta(days=14)  # idle time before a session must log in
+TOKEN_VERSION_REFRESH_SECONDS = 30  # how stale another process's revocations get
+
+# Password hashing (bcrypt)
+PASSWORD_HASH_WORKERS = 2  # hashing processes; 0 hashes in the request threadpool
+PASSWORD_HASH_MAX_PENDING = 64  # queued + running before logins are turned away
+PASSWORD_HASH_NICE = 10  # hashing processes yield the CPU to request handling
 
 # Late policy
 GRACE_PERIOD_MINUTES = 10  # submissions within 10 mins after due are not late
 LATE_PENALTY_PER_DAY = 0.10  # 10% per day late
 LATE_PENALTY_MAX = 0.50  # max 50% total deduction
+
+# Gradebook
+GRADEBOOK_MAX_PAGE_SIZE = 5000  # max rows per keyset page
+GRADEBOOK_STREAM_BATCH_SIZE = 1000  # rows fetched per round trip when streaming
+
+# Roster import
+ROSTER_IMPORT_CHUNK_SIZE = 1000  # rows resolved, inserted and committed together
+ROSTER_IMPORT_MAX_ERRORS = 100  # per-row problems echoed back in the summary
+
+# Submissions
+SUBMISSION_GROUP_COMMIT = False  # opt-in: batch concurrent submits per transaction
+SUBMISSION_GROUP_COMMIT_WINDOW_MS = 2  # how long a batch waits for company
+SUBMISSION_GROUP_COMMIT_MAX_BATCH = 256  # submissions per transaction at most
+
+# Idempotency keys
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)  # how long a stored response replays
+IDEMPOTENCY_CACHE_SIZE = 10_000  # stored responses kept in process (LRU)
+IDEMPOTENCY_SWEEP_INTERVAL_SECONDS = 600  # how often expired keys are deleted
+IDEMPOTENCY_CLAIM_TTL = timedelta(seconds=30)  # a claim whose request died frees up
+IDEMPOTENCY_WAIT_SECONDS = 5  # a retry waits this long for the first try, then 409
+IDEMPOTENCY_WAIT_POLL_SECONDS = 0.05  # how often a waiting retry looks again
+
+# Database (applied to every connection by app.db.session.create_sqlite_engine)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # readers and the writer no longer block each other
+    "synchronous": "NORMAL",  # WAL-safe; a power cut may lose the last commits
+    "busy_timeout": 5000,  # ms to wait for the write lock before "locked"
+    "cache_size": -65536,  # page cache per connection, in KiB when negative
+    "mmap_size": 268_435_456,  # read pages through a 256 MiB memory map
+    "temp_store": "MEMORY",  # sorts and temp b-trees for big gradebooks
+}
+DB_POOL_SIZE = 20  # per engine (reader and writer each have one)
+DB_MAX_OVERFLOW = 20
+# aiosqlite runs every connection on a thread of its own: a few keep SQLite
+# busy, more only fight over the GIL (and stretch the latency tail)
+ASYNC_DB_POOL_SIZE = 5
+ASYNC_DB_MAX_OVERFLOW = 0
+SLOW_QUERY_THRESHOLD_MS = 200  # statements this slow are logged with their plan
+
+# Lookup cache (app.services.lookup_cache), per process
+LOOKUP_CACHE_TTL_SECONDS = 30  # changes made outside the app show up after this
+LOOKUP_CACHE_SIZE = 10_000  # entries per cache (courses, assignments, members)
+
+# Cache invalidation across worker processes (app.services.cache_events)
+CACHE_EVENT_POLL_SECONDS = 1  # how long another process's writes go unseen here
+CACHE_EVENT_RETENTION = timedelta(minutes=10)  # must outlast every cache's TTL
+CACHE_EVENT_PRUNE_INTERVAL_SECONDS = 60  # how often older events are deleted
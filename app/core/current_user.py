@@ -1,32 +1,71 @@
+from typing import NamedTuple
+
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.auth import oauth2_scheme
 from app.core.config import ALGORITHM, SECRET_KEY
-from app.core.deps import get_db
+from app.core.deps import get_async_read_db, get_read_db
 from app.models.user import User
+from app.services import token_versions
 
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
 
+class Principal(NamedTuple):
+    """The authenticated caller, as stated by their access token's claims."""
+
+    id: int
+    email: str
+    role: str
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    The caller, from the access token alone: no database query. Tokens
+    revoked through app.services.token_versions are rejected, as are tokens
+    without role/email claims (minted before they were added); those clients
+    log in again.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        principal = Principal(
+            id=int(payload["sub"]), email=payload["email"], role=payload["role"]
+        )
+        version = int(payload.get("ver", 0))
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise credentials_exception
+
+    if not token_versions.is_current(principal.id, version):
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return principal
+
+
+# the full users row, for the few routes that need more than the claims
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db),
+) -> User:
+    user = db.get(User, principal.id)
+    if user is None:
+        raise credentials_exception
+
+    return user
+
+
+# same, for `async def` routes on the async read session
+async def get_current_user_async(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> User:
+    user = await db.get(User, principal.id)
     if user is None:
         raise credentials_exception
 
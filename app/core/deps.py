@@ -1,4 +1,4 @@
-from app.db.session import SessionLocal
+from app.db.session import AsyncReadSessionLocal, ReadSessionLocal, SessionLocal
 
 
 # every request that needs DB will get a fresh session, and it will always close.
@@ -8,3 +8,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# same, on the read-only engine: for routes that only read
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# async read-only session, for `async def` routes
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
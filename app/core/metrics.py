@@ -0,0 +1,138 @@
+"""
+In-process request metrics, rendered in the Prometheus text format at
+/metrics.
+
+Everything here is written only from the event loop thread (by
+MetricsMiddleware), so plain ints and dicts need no locks. Each worker
+process keeps its own numbers, as Prometheus expects when it scrapes every
+worker.
+"""
+
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable
+
+# seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# bytes
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.in_flight = 0
+        # (method, route template, status) -> count
+        self.requests: defaultdict[tuple[str, str, int], int] = defaultdict(int)
+        # (method, route template) -> histogram
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.response_size: dict[tuple[str, str], Histogram] = {}
+        self._callbacks: list[tuple[str, str, str, str | None, Callable]] = []
+
+    def observe(
+        self, method: str, route: str, status: int, seconds: float, size: int
+    ) -> None:
+        self.requests[(method, route, status)] += 1
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.response_size[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        self.response_size[key].observe(size)
+
+    def register_callback(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        read: Callable[[], float | dict[str, float] | None],
+        label: str | None = None,
+    ) -> None:
+        """
+        Export `read()` as a `kind` ("gauge" or "counter") metric at render
+        time, for numbers kept elsewhere. Skipped while it returns None.
+
+        With `label`, `read()` returns {label value: number} and each entry
+        becomes one sample, e.g. lookup_cache_hits_total{cache="courses"}.
+        """
+        self._callbacks.append((name, kind, help_text, label, read))
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_in_flight Requests being handled right now.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Requests handled, by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{_label(route)}",'
+                f'status="{status}"}} {count}'
+            )
+
+        for name, help_text, histograms in (
+            (
+                "http_request_duration_seconds",
+                "Time from request start to last response byte.",
+                self.latency,
+            ),
+            (
+                "http_response_size_bytes",
+                "Response body size.",
+                self.response_size,
+            ),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), histogram in sorted(histograms.items()):
+                labels = f'method="{method}",route="{_label(route)}"'
+                lines.extend(histogram.samples(name, labels))
+
+        for name, kind, help_text, label, read in self._callbacks:
+            value = read()
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if label is None:
+                lines.append(f"{name} {value}")
+                continue
+            for label_value, sample in sorted(value.items()):
+                lines.append(f'{name}{{{label}="{_label(label_value)}"}} {sample}')
+
+        lines.append("# HELP process_pid Worker process these metrics come from.")
+        lines.append("# TYPE process_pid gauge")
+        lines.append(f"process_pid {os.getpid()}")
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
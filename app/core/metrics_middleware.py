@@ -0,0 +1,73 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import RequestMetrics, request_metrics
+from app.db import query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI: logs one line per request and records it in `metrics` (by
+    route template, e.g. /courses/{course_id}/gradebook, so ids don't blow
+    up the label set). It only watches the messages going past, so
+    streaming responses stream through untouched.
+
+    It also opens the request's SQL accounting (app.db.query_stats) and
+    reports it on the response as X-Query-Count and a Server-Timing "db"
+    entry. Headers go out before the body, so a streamed response reports
+    the statements run until its first byte; the log line has them all.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500  # if the app raises before responding
+        size = 0
+        stats, token = query_stats.start_request()
+
+        async def send_and_record(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-query-count", str(stats.count).encode()),
+                    (
+                        b"server-timing",
+                        f"db;dur={stats.seconds * 1000:.2f}".encode(),
+                    ),
+                ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            query_stats.end_request(token)
+            self.metrics.in_flight -= 1
+            duration = time.perf_counter() - start
+            # the router leaves the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.metrics.observe(scope["method"], route, status, duration, size)
+            logger.info(
+                "%s %s -> %s (%.2fs, %d queries in %.1fms)",
+                scope["method"],
+                scope["path"],
+                status,
+                duration,
+                stats.count,
+                stats.seconds * 1000,
+            )
@@ -1,10 +1,11 @@
 from fastapi import Depends, HTTPException, status
 
-from app.core.current_user import get_current_user
-from app.models.user import User
+from app.core.current_user import Principal, get_current_principal
 
 
-def require_instructor(current_user: User = Depends(get_current_user)) -> User:
+def require_instructor(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if current_user.role != "instructor":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
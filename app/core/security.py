@@ -28,3 +28,21 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
 
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+
+def create_user_access_token(
+    user, version: int = 0, expires_delta: timedelta | None = None
+) -> str:
+    """
+    Access token for `user` (anything with id, email and role) carrying the
+    claims get_current_principal reads, minted at token `version`.
+    """
+    return create_access_token(
+        data={
+            "sub": str(user.id),
+            "email": user.email,
+            "role": user.role,
+            "ver": version,
+        },
+        expires_delta=expires_delta,
+    )
@@ -1,6 +1,14 @@
 from app.db.base_class import Base  # noqa: F401
 from app.models.assignment import Assignment  # noqa: F401
+from app.models.cache_event import CacheEvent  # noqa: F401
 from app.models.course import Course  # noqa: F401
 from app.models.enrollment import Enrollment  # noqa: F401
+from app.models.grade_stats import (  # noqa: F401
+    CourseAssignmentStats,
+    CourseStudentStats,
+)
+from app.models.idempotency import IdempotencyKey  # noqa: F401
+from app.models.refresh_token import RefreshTokenFamily  # noqa: F401
 from app.models.submission import Submission  # noqa: F401
+from app.models.token_version import TokenVersion  # noqa: F401
 from app.models.user import User  # noqa: F401
@@ -2,7 +2,18 @@ from app.db.base import Base
 from app.db.session import engine
 
 # import models so SQLAlchemy registers them
-from app.models import assignment, course, enrollment, submission, user  # noqa: F401
+from app.models import (  # noqa: F401
+    assignment,
+    cache_event,
+    course,
+    enrollment,
+    grade_stats,
+    idempotency,
+    refresh_token,
+    submission,
+    token_version,
+    user,
+)
 
 
 def init_db() -> None:
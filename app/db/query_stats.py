@@ -0,0 +1,92 @@
+"""
+Per-request SQL accounting.
+
+Every engine made by app.db.session is instrumented: each statement it runs is
+timed and added to the QueryStats of the request being handled (a ContextVar
+set by MetricsMiddleware). Sync routes and dependencies run in the threadpool
+with a copy of the request's context, so their statements land on the same
+object as the async routes'. Work handed to a background worker (the
+submission writer, sweepers) runs in the worker's own context and is not
+counted against the request.
+
+A statement slower than SLOW_QUERY_THRESHOLD_MS is logged together with its
+EXPLAIN QUERY PLAN, whether or not a request is being handled. Parameters are
+left out of the log line: they carry emails and password hashes.
+"""
+
+import logging
+import time
+from contextvars import ContextVar, Token
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import SLOW_QUERY_THRESHOLD_MS
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def start_request() -> tuple[QueryStats, Token]:
+    """Count statements from here on (in this context) into a fresh QueryStats."""
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def query_plan(conn, statement: str, parameters=()) -> list[str]:
+    """
+    SQLite's EXPLAIN QUERY PLAN for `statement`, one step per line (e.g.
+    "SEARCH enrollments USING COVERING INDEX ..."). `conn` is a SQLAlchemy
+    Connection; the plan is read on its DBAPI connection, so it is not
+    itself counted.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def _log_slow_query(conn, statement: str, parameters, executemany: bool, ms: float):
+    plan = "  (not available)"
+    if not executemany:
+        try:
+            plan = "\n".join(
+                f"  {step}" for step in query_plan(conn, statement, parameters)
+            )
+        except Exception:  # diagnostics only: never fail the query that ran
+            logger.debug("EXPLAIN QUERY PLAN failed", exc_info=True)
+    logger.warning("slow query (%.1f ms): %s\nquery plan:\n%s", ms, statement, plan)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time `engine`'s statements into the current request and log slow ones."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info.pop("query_started_at")
+        stats = _current.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+        if seconds * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+            _log_slow_query(conn, statement, parameters, executemany, seconds * 1000)
@@ -1,18 +1,109 @@
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.core.config import (
+    ASYNC_DB_MAX_OVERFLOW,
+    ASYNC_DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    SQLITE_PRAGMAS,
+)
+from app.db.query_stats import instrument_engine
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATABASE_URL = f"sqlite:///{BASE_DIR}/micro_lms.db"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{BASE_DIR}/micro_lms.db"
+
+
+def _apply_pragmas_on_connect(
+    engine: Engine, pragmas: dict | None, read_only: bool
+) -> None:
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+
+def create_sqlite_engine(
+    url: str,
+    *,
+    read_only: bool = False,
+    pragmas: dict | None = None,
+    **kwargs,
+) -> Engine:
+    """
+    Engine whose connections all get `pragmas` (SQLITE_PRAGMAS by default)
+    as they are opened. A read_only engine's connections also refuse writes
+    (PRAGMA query_only), so a GET route cannot take the write lock by mistake.
+    Its statements are counted per request (app.db.query_stats). Extra keyword
+    arguments go to create_engine.
+    """
+    if "poolclass" not in kwargs:
+        kwargs.setdefault("pool_size", DB_POOL_SIZE)
+        kwargs.setdefault("max_overflow", DB_MAX_OVERFLOW)
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+    _apply_pragmas_on_connect(engine, pragmas, read_only)
+    instrument_engine(engine)
+    return engine
+
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def create_async_sqlite_engine(
+    url: str,
+    *,
+    read_only: bool = False,
+    pragmas: dict | None = None,
+    **kwargs,
+) -> AsyncEngine:
+    """
+    create_sqlite_engine for a `sqlite+aiosqlite://` URL: same pragmas,
+    read_only handling and query accounting (pool sized by
+    ASYNC_DB_POOL_SIZE), for AsyncSession routes that wait on SQLite without
+    holding a threadpool worker.
+    """
+    if "poolclass" not in kwargs:
+        kwargs.setdefault("pool_size", ASYNC_DB_POOL_SIZE)
+        kwargs.setdefault("max_overflow", ASYNC_DB_MAX_OVERFLOW)
+    engine = create_async_engine(url, **kwargs)
+    _apply_pragmas_on_connect(engine.sync_engine, pragmas, read_only)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+# writes (and anything that must read its own writes) use `engine`; GET routes
+# read through `read_engine`, whose pool WAL lets run alongside the writer
+engine = create_sqlite_engine(DATABASE_URL)
+read_engine = create_sqlite_engine(DATABASE_URL, read_only=True)
 
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
 )
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine,
+)
+
+# async twin of read_engine for the hottest GET routes
+async_read_engine = create_async_sqlite_engine(ASYNC_DATABASE_URL, read_only=True)
+AsyncReadSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_read_engine,
+)
 
 
 def get_db():
@@ -1,9 +1,12 @@
 import logging
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
-from app.core.logging_middleware import LoggingMiddleware
+from app.core.metrics import request_metrics
+from app.core.metrics_middleware import MetricsMiddleware
 from app.db.init_db import init_db
+from app.db.session import SessionLocal
 
 # Import routers directly (bulletproof way)
 from app.routers.admin import router as admin_router
@@ -13,25 +16,159 @@ from app.routers.courses import router as courses_router
 from app.routers.enrollments import router as enrollments_router
 from app.routers.instructor_dashboard import router as instructor_dashboard_router
 from app.routers.submissions import router as submissions_router
+from app.services import lookup_cache, single_flight
+from app.workers.cache_event_listener import (
+    start_cache_event_listener,
+    stop_cache_event_listener,
+)
+from app.workers.idempotency_sweeper import (
+    start_idempotency_sweeper,
+    stop_idempotency_sweeper,
+)
+from app.workers.password_hasher import (
+    get_password_hasher,
+    start_password_hasher,
+    stop_password_hasher,
+)
+from app.workers.submission_writer import (
+    start_submission_writer,
+    stop_submission_writer,
+)
+from app.workers.token_version_refresher import (
+    start_token_version_refresher,
+    stop_token_version_refresher,
+)
 
 logging.basicConfig(level=logging.INFO)
 
 app = FastAPI(title="Micro LMS")
 
 # Middleware
-app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 # Health check
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    hasher = get_password_hasher()
+    return {
+        "status": "ok",
+        "password_hasher": hasher.stats()._asdict() if hasher else None,
+        "lookup_cache": {
+            name: stats._asdict() for name, stats in lookup_cache.stats().items()
+        },
+    }
+
+
+# Prometheus scrape endpoint (per worker process). Async so it renders on the
+# event loop, the only thread that writes the metrics.
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        request_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+def _hasher_stat(field: str):
+    def read():
+        hasher = get_password_hasher()
+        return getattr(hasher.stats(), field) if hasher else None
+
+    return read
+
+
+request_metrics.register_callback(
+    "password_hash_pending",
+    "gauge",
+    "bcrypt calls queued or running in the hashing pool.",
+    _hasher_stat("pending"),
+)
+request_metrics.register_callback(
+    "password_hash_rejected_total",
+    "counter",
+    "bcrypt calls turned away because the hashing pool was full.",
+    _hasher_stat("rejected"),
+)
+
+
+def _lookup_cache_stat(field: str):
+    def read():
+        return {name: getattr(s, field) for name, s in lookup_cache.stats().items()}
+
+    return read
+
+
+request_metrics.register_callback(
+    "lookup_cache_entries",
+    "gauge",
+    "Lookup cache entries held, by cache.",
+    _lookup_cache_stat("size"),
+    label="cache",
+)
+request_metrics.register_callback(
+    "lookup_cache_hits_total",
+    "counter",
+    "Lookups answered from the in-process cache.",
+    _lookup_cache_stat("hits"),
+    label="cache",
+)
+request_metrics.register_callback(
+    "lookup_cache_misses_total",
+    "counter",
+    "Lookups that had to query the database.",
+    _lookup_cache_stat("misses"),
+    label="cache",
+)
+request_metrics.register_callback(
+    "lookup_cache_evictions_total",
+    "counter",
+    "Lookup cache entries dropped to stay within LOOKUP_CACHE_SIZE.",
+    _lookup_cache_stat("evictions"),
+    label="cache",
+)
+
+
+def _single_flight_stat(field: str):
+    def read():
+        return {name: getattr(s, field) for name, s in single_flight.stats().items()}
+
+    return read
+
+
+request_metrics.register_callback(
+    "single_flight_calls_total",
+    "counter",
+    "Expensive reads that went through single-flight coalescing.",
+    _single_flight_stat("calls"),
+    label="endpoint",
+)
+request_metrics.register_callback(
+    "single_flight_coalesced_total",
+    "counter",
+    "Expensive reads answered with an identical in-flight request's result.",
+    _single_flight_stat("coalesced"),
+    label="endpoint",
+)
 
 
 # Startup event
 @app.on_event("startup")
 def on_startup():
     init_db()
+    start_submission_writer(SessionLocal)
+    start_idempotency_sweeper(SessionLocal)
+    start_token_version_refresher(SessionLocal)
+    start_cache_event_listener(SessionLocal)
+    start_password_hasher()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_submission_writer()
+    stop_idempotency_sweeper()
+    stop_token_version_refresher()
+    stop_cache_event_listener()
+    stop_password_hasher()
 
 
 # Include routers
@@ -1,4 +1,15 @@
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -7,12 +18,17 @@ from app.db.base_class import Base
 class Assignment(Base):
     __tablename__ = "assignments"
 
+    __table_args__ = (
+        Index(
+            "ix_assignments_course_due", "course_id", text("due_at IS NULL"), "due_at"
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(
         Integer,
         ForeignKey("courses.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     title = Column(String(255), nullable=False)
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class CacheEvent(Base):
+    """
+    "Drop `key` from `cache`", written in the same transaction as the change
+    that made the cached value stale and replayed by every worker process in
+    id order. Managed by app.services.cache_events.
+    """
+
+    __tablename__ = "cache_events"
+    # AUTOINCREMENT: ids are never reused, even once pruning empties the table,
+    # so "everything after the last id I applied" stays well defined
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    cache: Mapped[str] = mapped_column(String(64), nullable=False)
+    key: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
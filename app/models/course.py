@@ -11,6 +11,9 @@ class Course(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text)
     instructor_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    # bumped by every write that changes the course's gradebook; see
+    # app.services.course_versions
+    version: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
 
     enrollments = relationship(
         "Enrollment", back_populates="course", cascade="all, delete-orphan"
@@ -1,4 +1,12 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, UniqueConstraint, func
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base  # <-- adjust if needed
@@ -9,13 +17,12 @@ class Enrollment(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(
-        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     course_id = Column(
         Integer,
         ForeignKey("courses.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -25,6 +32,7 @@ class Enrollment(Base):
         UniqueConstraint(
             "student_id", "course_id", name="uq_enrollments_student_course"
         ),
+        Index("ix_enrollments_course_student", "course_id", "student_id"),
     )
 
     student = relationship("User", back_populates="enrollments")
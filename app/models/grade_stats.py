@@ -0,0 +1,46 @@
+from sqlalchemy import Float, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class CourseStudentStats(Base):
+    """
+    Per-(course, student) grade counters, kept in step with submissions,
+    enrollments and assignments by app.services.grade_stats.
+    """
+
+    __tablename__ = "course_student_stats"
+
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True
+    )
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+    total_assignments: Mapped[int] = mapped_column(nullable=False, default=0)
+    submitted: Mapped[int] = mapped_column(nullable=False, default=0)
+    graded: Mapped[int] = mapped_column(nullable=False, default=0)
+    score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class CourseAssignmentStats(Base):
+    """
+    Per-(course, assignment) grade counters, kept in step with submissions,
+    enrollments and assignments by app.services.grade_stats.
+    """
+
+    __tablename__ = "course_assignment_stats"
+
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True
+    )
+    assignment_id: Mapped[int] = mapped_column(
+        ForeignKey("assignments.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    total_students: Mapped[int] = mapped_column(nullable=False, default=0)
+    submitted: Mapped[int] = mapped_column(nullable=False, default=0)
+    graded: Mapped[int] = mapped_column(nullable=False, default=0)
+    score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
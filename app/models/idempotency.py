@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class IdempotencyKey(Base):
+    """
+    The stored response for a write made with an Idempotency-Key header, so
+    a retried request can be answered without running again. Managed by
+    app.services.idempotency.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    # sha256 of method, path and body: a key reused for a different request
+    # is rejected rather than replayed
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # 0 while the request that claimed the key is still running
+    status_code: Mapped[int] = mapped_column(nullable=False)
+    response_body: Mapped[str] = mapped_column(Text, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
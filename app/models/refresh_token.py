@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class RefreshTokenFamily(Base):
+    """
+    One login session's chain of refresh tokens. Only the latest generation
+    may be exchanged; presenting an older one means the chain leaked, and the
+    whole family is revoked. Managed by app.services.refresh_tokens.
+    """
+
+    __tablename__ = "refresh_token_families"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    generation: Mapped[int] = mapped_column(nullable=False, default=0)
+    # the user's access token version at login: revoking their tokens
+    # (app.services.token_versions) ends the session too
+    token_version: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
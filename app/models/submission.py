@@ -14,9 +14,7 @@ class Submission(Base):
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    assignment_id = Column(
-        Integer, ForeignKey("assignments.id"), nullable=False, index=True
-    )
+    assignment_id = Column(Integer, ForeignKey("assignments.id"), nullable=False)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     content = Column(Text, nullable=False)
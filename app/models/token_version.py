@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class TokenVersion(Base):
+    """
+    Per-user access token version. Tokens carry the version they were minted
+    with; bumping it (POST /auth/logout-all) rejects all older ones. Users
+    who were never bumped have no row and are at version 0. Managed by
+    app.services.token_versions.
+    """
+
+    __tablename__ = "token_versions"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
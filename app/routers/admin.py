@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends
 
+from app.core.current_user import Principal
 from app.core.permissions import require_instructor
-from app.models.user import User
 
 router = APIRouter()
 
 
 @router.get("/ping")
-def admin_ping(current_user: User = Depends(require_instructor)):
+def admin_ping(current_user: Principal = Depends(require_instructor)):
     return {"msg": "admin ok", "user": current_user.email}
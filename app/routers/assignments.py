@@ -1,60 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.current_user import get_current_user
-from app.core.deps import get_db
+from app.core.current_user import Principal, get_current_principal
+from app.core.deps import get_async_read_db, get_db
 from app.core.permissions import require_instructor
 from app.models.assignment import Assignment
-from app.models.course import Course
-from app.models.enrollment import Enrollment
-from app.models.user import User
 from app.schemas.assignment import AssignmentCreate, AssignmentRead
+from app.services import grade_stats, lookup_cache
 
 router = APIRouter()
 
 
-def _ensure_course_exists(db: Session, course_id: int) -> Course:
-    course = db.query(Course).filter(Course.id == course_id).first()
+def _ensure_course_exists(db: Session, course_id: int) -> lookup_cache.CourseInfo:
+    course = lookup_cache.course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
 
 
-def _ensure_can_view_course_assignments(
-    db: Session, course_id: int, user: User
+async def _ensure_can_view_course_assignments(
+    db: AsyncSession, course_id: int, user: Principal
 ) -> None:
-    # Instructor of the course can view
-    is_instructor = (
-        db.query(Course)
-        .filter(Course.id == course_id, Course.instructor_id == user.id)
-        .first()
-        is not None
-    )
-    if is_instructor:
-        return
-
-    # Enrolled student can view
-    is_enrolled = (
-        db.query(Enrollment)
-        .filter(Enrollment.course_id == course_id, Enrollment.student_id == user.id)
-        .first()
-        is not None
-    )
+    course = await lookup_cache.course_async(db, course_id)
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
 
-    if not is_enrolled:
+    # Instructor of the course or an enrolled student can view
+    if course.instructor_id != user.id and not await lookup_cache.is_member_async(
+        db, course_id, user.id
+    ):
         raise HTTPException(status_code=403, detail="Not enrolled in this course")
 
 
 @router.get("/courses/{course_id}/assignments", response_model=list[AssignmentRead])
-def list_assignments(
+async def list_assignments(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    _ensure_course_exists(db, course_id)
-    _ensure_can_view_course_assignments(db, course_id, current_user)
+    await _ensure_can_view_course_assignments(db, course_id, current_user)
 
-    return db.query(Assignment).filter(Assignment.course_id == course_id).all()
+    result = await db.scalars(
+        select(Assignment).where(Assignment.course_id == course_id)
+    )
+    return result.all()
 
 
 @router.post(
@@ -66,7 +57,7 @@ def create_assignment(
     course_id: int,
     payload: AssignmentCreate,
     db: Session = Depends(get_db),
-    instructor: User = Depends(require_instructor),
+    instructor: Principal = Depends(require_instructor),
 ):
     course = _ensure_course_exists(db, course_id)
 
@@ -85,6 +76,8 @@ def create_assignment(
         max_score=payload.max_score,
     )
     db.add(a)
+    db.flush()
+    grade_stats.on_assignment_created(db, course_id, a.id)
     db.commit()
     db.refresh(a)
     return a
@@ -1,14 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Callable
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.core.config import ACCESS_TOKEN_EXPIRE
-from app.core.current_user import get_current_user
+from app.core.current_user import (
+    Principal,
+    get_current_principal,
+    get_current_user_async,
+)
 from app.core.deps import get_db
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.security import (
+    create_user_access_token,
+    hash_password,
+    verify_password,
+)
 from app.models.user import User
-from app.schemas.auth import LoginRequest
+from app.schemas.auth import LoginRequest, RefreshRequest
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserRead
+from app.services import refresh_tokens, token_versions
+from app.services.refresh_tokens import RefreshTokenError
+from app.workers.password_hasher import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    get_password_hasher,
+)
 
 router = APIRouter()
 
@@ -18,31 +36,77 @@ def ping():
     return {"msg": "auth ok"}
 
 
+async def _password_work(hasher: PasswordHasher | None, fn: Callable, *args):
+    """Run a bcrypt call in the hashing pool (or the threadpool without one)."""
+    if hasher is None:
+        return await run_in_threadpool(fn, *args)
+    try:
+        return await hasher.run(fn, *args)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+def _email_taken(db: Session, email: str) -> bool:
+    taken = db.query(User.id).filter(User.email == email).first() is not None
+    # don't hold a pooled connection while the password is hashed
+    db.close()
+    return taken
+
+
+def _create_user(db: Session, payload: UserCreate, hashed_password: str) -> User:
+    user = User(
+        email=payload.email,
+        full_name=payload.full_name,
+        hashed_password=hashed_password,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _start_session(db: Session, user_id: int, token_version: int) -> str:
+    refresh_token = refresh_tokens.issue(db, user_id, token_version)
+    db.commit()
+    return refresh_token
+
+
+def _login_candidate(db: Session, email: str) -> tuple[User | None, int]:
+    """The user (if any) and the token version to mint with, in one hop."""
+    user = db.query(User).filter(User.email == email).first()
+    version = token_versions.version_for(db, user.id) if user else 0
+    # don't hold a pooled connection while the password is checked
+    db.close()
+    return user, version
+
+
 @router.post(
     "/register",
     response_model=UserRead,
     status_code=status.HTTP_201_CREATED,
     responses={
         400: {"description": "Email already registered"},
+        503: {"description": "Password hashing is saturated"},
     },
 )
-def register(payload: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == payload.email).first()
-    if existing_user:
+async def register(
+    payload: UserCreate,
+    db: Session = Depends(get_db),
+    hasher: PasswordHasher | None = Depends(get_password_hasher),
+):
+    if await run_in_threadpool(_email_taken, db, payload.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
-    user = User(
-        email=payload.email,
-        full_name=payload.full_name,
-        hashed_password=hash_password(payload.password),
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    hashed_password = await _password_work(hasher, hash_password, payload.password)
+    # a concurrent registration of the same email still fails on the unique index
+    return await run_in_threadpool(_create_user, db, payload, hashed_password)
 
 
 @router.post(
@@ -50,33 +114,89 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
     response_model=Token,
     responses={
         401: {"description": "Invalid email or password"},
+        503: {"description": "Password hashing is saturated"},
     },
 )
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
+async def login(
+    payload: LoginRequest,
+    db: Session = Depends(get_db),
+    hasher: PasswordHasher | None = Depends(get_password_hasher),
+):
+    user, version = await run_in_threadpool(_login_candidate, db, payload.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
-    if not verify_password(payload.password, user.hashed_password):
+    if not await _password_work(
+        hasher, verify_password, payload.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
+    # role and email ride in the token so requests need no users lookup
+    access_token = create_user_access_token(
+        user, version=version, expires_delta=ACCESS_TOKEN_EXPIRE
+    )
+    refresh_token = await run_in_threadpool(_start_session, db, user.id, version)
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post(
+    "/refresh",
+    response_model=Token,
+    responses={
+        401: {"description": "Invalid refresh token"},
+    },
+)
+def refresh(payload: RefreshRequest, db: Session = Depends(get_db)):
+    """New access and refresh tokens for a refresh token, which is used up."""
+    try:
+        rotation = refresh_tokens.rotate(db, payload.refresh_token)
+    except RefreshTokenError:
+        # keep the family revocation when the token was a reused one
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+
+    access_token = create_user_access_token(
+        rotation.user,
+        version=rotation.token_version,
         expires_delta=ACCESS_TOKEN_EXPIRE,
     )
+    db.commit()
 
     return {
         "access_token": access_token,
         "token_type": "bearer",
+        "refresh_token": rotation.refresh_token,
     }
 
 
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(
+    db: Session = Depends(get_db),
+    me: Principal = Depends(get_current_principal),
+):
+    """
+    End every session of the caller, this one included: all access tokens
+    issued so far are rejected, and their refresh tokens no longer rotate.
+    """
+    token_versions.revoke(db, me.id)
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get("/me", response_model=UserRead)
-def me(current_user: User = Depends(get_current_user)):
+async def me(current_user: User = Depends(get_current_user_async)):
     return current_user
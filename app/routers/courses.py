@@ -1,23 +1,49 @@
+import csv
+import io
+import json
 from datetime import datetime, timezone
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import and_, case, func
+from itertools import islice
+from typing import Literal, get_args
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    or_,
+    select,
+    type_coerce,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.config import GRACE_PERIOD_MINUTES
-from app.core.current_user import get_current_user
-from app.core.deps import get_db
+from app.core.config import (
+    GRACE_PERIOD_MINUTES,
+    GRADEBOOK_MAX_PAGE_SIZE,
+    GRADEBOOK_STREAM_BATCH_SIZE,
+)
+from app.core.current_user import Principal, get_current_principal
+from app.core.deps import get_async_read_db, get_db, get_read_db
 from app.core.permissions import require_instructor
 from app.models.assignment import Assignment
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.models.grade_stats import CourseAssignmentStats, CourseStudentStats
 from app.models.submission import Submission
 from app.models.user import User
 from app.schemas.assignment_stats import AssignmentStatsRow
 from app.schemas.course import CourseCreate, CourseRead
 from app.schemas.dashboard import CourseDashboardRow
-from app.schemas.gradebook import GradebookRow
+from app.schemas.gradebook import GradebookMatrix, GradebookRow, GradebookStatus
 from app.schemas.gradebook_summary import GradebookStudentSummary
+from app.services import grade_stats, lookup_cache, single_flight
+from app.utils.etag import etag_matches, make_etag, not_modified, set_etag
+from app.utils.pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
@@ -54,8 +80,8 @@ def _assignment_order_by():
 
 @router.get("/", response_model=list[CourseRead])
 def list_courses(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     return db.query(Course).all()
 
@@ -64,7 +90,7 @@ def list_courses(
 def create_course(
     payload: CourseCreate,
     db: Session = Depends(get_db),
-    instructor: User = Depends(require_instructor),
+    instructor: Principal = Depends(require_instructor),
 ):
     course = Course(
         title=payload.title,
@@ -78,42 +104,108 @@ def create_course(
 
 
 @router.get("/me", response_model=list[CourseRead])
-def my_courses(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def my_courses(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    return (
-        db.query(Course)
+    result = await db.scalars(
+        select(Course)
         .join(Enrollment, Enrollment.course_id == Course.id)
-        .filter(Enrollment.student_id == current_user.id)
-        .all()
+        .where(Enrollment.student_id == current_user.id)
     )
+    return result.all()
+
+
+# Gradebook status and late flags, computed by SQLite inside the query.
+# SQLAlchemy stores datetimes as naive UTC text, which julianday() reads as
+# UTC; the difference is rounded to whole milliseconds before truncating to
+# minutes, matching app.services.late_policy to the millisecond.
+_late_ms = cast(
+    func.round(
+        (func.julianday(Submission.submitted_at) - func.julianday(Assignment.due_at))
+        * 86_400_000
+    ),
+    Integer,
+)
+_late_minutes = _late_ms // 60_000
 
+# the gradebook only reports minutes for submissions past due
+_gradebook_late_by_minutes = case((_late_ms >= 60_000, _late_minutes), else_=None)
+_gradebook_is_late = type_coerce(
+    case((_late_minutes > GRACE_PERIOD_MINUTES, True), else_=False), Boolean
+)
+_gradebook_status = case(
+    (Submission.id.is_(None), "missing"),
+    (Submission.score.is_(None), "submitted"),
+    else_="graded",
+)
 
-@router.get("/{course_id}/gradebook", response_model=list[GradebookRow])
-def course_gradebook(
-    course_id: int,
-    db: Session = Depends(get_db),
-    instructor: User = Depends(require_instructor),
-):
-    # verify course + ownership
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    if course.instructor_id != instructor.id:
-        raise HTTPException(status_code=403, detail="Not course instructor")
+_GRADEBOOK_FIELDS = (
+    "student_id",
+    "student_email",
+    "assignment_id",
+    "assignment_title",
+    "submitted_at",
+    "grade",
+    "feedback",
+    "status",
+    "is_late",
+    "late_by_minutes",
+)
 
-    rows = (
-        db.query(
-            User.id.label("student_id"),
-            User.email.label("student_email"),
-            Assignment.id.label("assignment_id"),
-            Assignment.title.label("assignment_title"),
-            Assignment.due_at.label("due_at"),
-            Submission.submitted_at,
-            Submission.score.label("grade"),
-            Submission.feedback,
+
+def _gradebook_columns(student_id, student_email) -> tuple:
+    return (
+        student_id.label("student_id"),
+        student_email.label("student_email"),
+        Assignment.id.label("assignment_id"),
+        Assignment.title.label("assignment_title"),
+        Assignment.due_at.label("due_at"),
+        Submission.submitted_at,
+        Submission.score.label("grade"),
+        Submission.feedback,
+        _gradebook_status.label("status"),
+        _gradebook_is_late.label("is_late"),
+        _gradebook_late_by_minutes.label("late_by_minutes"),
+    )
+
+
+def _gradebook_filters(
+    status_filter: GradebookStatus | None, late: bool | None
+) -> list:
+    """
+    WHERE clauses for the ?status= and ?late= filters. Status is matched on
+    the underlying columns rather than the CASE so SQLite can use indexes.
+    """
+    filters = []
+    if status_filter == "missing":
+        filters.append(Submission.id.is_(None))
+    elif status_filter == "submitted":
+        filters.extend([Submission.id.is_not(None), Submission.score.is_(None)])
+    elif status_filter == "graded":
+        filters.append(Submission.score.is_not(None))
+
+    if late is True:
+        filters.append(_late_minutes > GRACE_PERIOD_MINUTES)
+    elif late is False:
+        filters.append(
+            or_(
+                Submission.id.is_(None),
+                Assignment.due_at.is_(None),
+                _late_minutes <= GRACE_PERIOD_MINUTES,
+            )
         )
+    return filters
+
+
+def _gradebook_record(r) -> dict:
+    return {field: getattr(r, field) for field in _GRADEBOOK_FIELDS}
+
+
+def _course_gradebook_query(db: Session, course_id: int):
+    """Every enrolled student x every assignment of the course (unordered)."""
+    return (
+        db.query(*_gradebook_columns(User.id, User.email))
         .join(Enrollment, Enrollment.student_id == User.id)
         .join(Assignment, Assignment.course_id == Enrollment.course_id)
         .outerjoin(
@@ -124,347 +216,642 @@ def course_gradebook(
             ),
         )
         .filter(Enrollment.course_id == course_id)
-        .order_by(*_gradebook_order_by())
+    )
+
+
+_STATUS_CODES = get_args(GradebookStatus)
+_MISSING = _STATUS_CODES.index("missing")
+_SUBMITTED = _STATUS_CODES.index("submitted")
+_GRADED = _STATUS_CODES.index("graded")
+
+
+def _gradebook_matrix(db: Session, course_id: int) -> dict:
+    """
+    GradebookMatrix payload (already JSON-safe). Reads students, assignments
+    and the course's submissions separately and pivots them in Python, so
+    the database never materializes the students x assignments cross join.
+    """
+    students = (
+        db.query(User.id, User.email)
+        .join(Enrollment, Enrollment.student_id == User.id)
+        .filter(Enrollment.course_id == course_id)
+        .order_by(User.email.asc())
+        .all()
+    )
+    assignments = (
+        db.query(
+            Assignment.id, Assignment.title, Assignment.due_at, Assignment.max_score
+        )
+        .filter(Assignment.course_id == course_id)
+        .order_by(*_assignment_order_by())
+        .all()
+    )
+    submissions = (
+        db.query(
+            Submission.student_id,
+            Submission.assignment_id,
+            Submission.score,
+            _gradebook_late_by_minutes,
+        )
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .filter(Assignment.course_id == course_id)
         .all()
     )
 
-    result: list[dict] = []
-    for r in rows:
-        if r.submitted_at is None:
-            status_val = "missing"
-        elif r.grade is None:
-            status_val = "submitted"
-        else:
-            status_val = "graded"
+    student_index = {s.id: i for i, s in enumerate(students)}
+    assignment_index = {a.id: j for j, a in enumerate(assignments)}
+    width = len(assignments)
+
+    grades = [[None] * width for _ in students]
+    status_codes = [[_MISSING] * width for _ in students]
+    late_by_minutes = [[None] * width for _ in students]
+
+    for student_id, assignment_id, score, minutes in submissions:
+        i = student_index.get(student_id)
+        if i is None:
+            continue  # not enrolled (any more)
+        j = assignment_index[assignment_id]
+        grades[i][j] = score
+        status_codes[i][j] = _SUBMITTED if score is None else _GRADED
+        late_by_minutes[i][j] = minutes
+
+    return {
+        "students": [{"id": s.id, "email": s.email} for s in students],
+        "assignments": [
+            {
+                "id": a.id,
+                "title": a.title,
+                "due_at": a.due_at.isoformat() if a.due_at else None,
+                "max_score": a.max_score,
+            }
+            for a in assignments
+        ],
+        "status_codes": list(_STATUS_CODES),
+        "grace_period_minutes": GRACE_PERIOD_MINUTES,
+        "grades": grades,
+        "status": status_codes,
+        "late_by_minutes": late_by_minutes,
+    }
 
-        # compute late flags for gradebook display
-        is_late = False
-        late_by_minutes = None
 
-        if r.submitted_at is not None and r.due_at is not None:
-            due = r.due_at
-            submitted = r.submitted_at
+def _batches(rows, size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
 
-            # SQLite often returns naive datetimes; treat as UTC
-            if due.tzinfo is None:
-                due = due.replace(tzinfo=timezone.utc)
-            if submitted.tzinfo is None:
-                submitted = submitted.replace(tzinfo=timezone.utc)
 
-            late_minutes = int((submitted - due).total_seconds() // 60)
+def _gradebook_cursor(r) -> str:
+    """Keyset cursor for a gradebook row: the _gradebook_order_by sort key."""
+    due_at = r.due_at.isoformat() if r.due_at is not None else None
+    return encode_cursor([r.student_email, due_at, r.assignment_id])
 
-            if late_minutes > 0:
-                late_by_minutes = late_minutes
-                # only mark "late" if beyond grace
-                if late_minutes > GRACE_PERIOD_MINUTES:
-                    is_late = True
 
-        result.append(
-            {
-                "student_id": r.student_id,
-                "student_email": r.student_email,
-                "assignment_id": r.assignment_id,
-                "assignment_title": r.assignment_title,
-                "submitted_at": r.submitted_at,
-                "grade": r.grade,
-                "feedback": r.feedback,
-                "status": status_val,
-                "is_late": is_late,
-                "late_by_minutes": late_by_minutes,
-            }
+def _gradebook_after(cursor: str):
+    """
+    Keyset predicate selecting rows strictly after `cursor` in
+    _gradebook_order_by order (NULL due dates sort last).
+    """
+    try:
+        email, due_at, assignment_id = decode_cursor(cursor)
+        if due_at is not None:
+            due_at = datetime.fromisoformat(due_at)
+        assignment_id = int(assignment_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if due_at is None:
+        same_student_after = and_(
+            Assignment.due_at.is_(None), Assignment.id > assignment_id
+        )
+    else:
+        same_student_after = or_(
+            Assignment.due_at.is_(None),
+            Assignment.due_at > due_at,
+            and_(Assignment.due_at == due_at, Assignment.id > assignment_id),
         )
 
-    return result
+    return or_(
+        User.email > email,
+        and_(User.email == email, same_student_after),
+    )
 
 
-# ✅ Option A: student sees only THEIR rows
-@router.get("/{course_id}/gradebook/me", response_model=list[GradebookRow])
-def my_course_gradebook(
+def _instructor_course_version(
+    db: Session, course_id: int, instructor: Principal
+) -> int:
+    """
+    404/403 unless `instructor` teaches the course, else the course's version
+    (app.services.course_versions). One primary-key lookup, so a conditional
+    GET is answered before any gradebook query runs.
+    """
+    course = db.execute(
+        select(Course.instructor_id, Course.version).where(Course.id == course_id)
+    ).first()
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if course.instructor_id != instructor.id:
+        raise HTTPException(status_code=403, detail="Not course instructor")
+    return course.version
+
+
+def _ensure_course_instructor(
+    db: Session, course_id: int, instructor: Principal
+) -> None:
+    """_instructor_course_version's checks, for routes that send no ETag."""
+    course = lookup_cache.course(db, course_id)
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if course.instructor_id != instructor.id:
+        raise HTTPException(status_code=403, detail="Not course instructor")
+
+
+def _gradebook_page(query, limit: int | None) -> tuple[list, str | None]:
+    """(rows, X-Next-Cursor or None); every row when limit is None."""
+    if limit is None:
+        return query.all(), None
+    # fetch one extra row to learn whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, _gradebook_cursor(rows[-1])
+    return rows, None
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@router.get(
+    "/{course_id}/gradebook",
+    response_model=list[GradebookRow] | GradebookMatrix,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "Gradebook rows (long format); one JSON object per "
+            "line when format=ndjson; a GradebookMatrix when format=matrix. "
+            "X-Next-Cursor is set when more rows remain.",
+        },
+        400: {"description": "Invalid cursor or unsupported parameters"},
+    },
+)
+def course_gradebook(
     course_id: int,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=GRADEBOOK_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    format: Literal["json", "ndjson", "matrix"] = "json",
+    status_filter: GradebookStatus | None = Query(default=None, alias="status"),
+    late: bool | None = None,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_read_db),
+    instructor: Principal = Depends(require_instructor),
 ):
-    # 1) course exists?
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
+    version = _instructor_course_version(db, course_id, instructor)
 
-    # 2) enrolled?
-    enrolled = (
-        db.query(Enrollment)
-        .filter(
-            Enrollment.course_id == course_id,
-            Enrollment.student_id == me.id,
-        )
-        .first()
-    )
-    if not enrolled:
-        raise HTTPException(status_code=403, detail="Not enrolled in this course")
+    if format == "matrix":
+        if any(p is not None for p in (limit, cursor, status_filter, late)):
+            raise HTTPException(
+                status_code=400,
+                detail="format=matrix does not support limit, cursor, status or late",
+            )
 
-    # 3) assignments in this course + this student's submission (if any)
-    rows = (
-        db.query(
-            Assignment.id.label("assignment_id"),
-            Assignment.title.label("assignment_title"),
-            Assignment.due_at.label("due_at"),
-            Submission.submitted_at,
-            Submission.score.label("grade"),
-            Submission.feedback,
-        )
-        .select_from(Assignment)
-        .outerjoin(
-            Submission,
-            and_(
-                Submission.assignment_id == Assignment.id,
-                Submission.student_id == me.id,
-            ),
-        )
-        .filter(Assignment.course_id == course_id)
-        .order_by(*_assignment_order_by())
-        .all()
+    etag = make_etag(
+        "gradebook", course_id, version, format, limit, cursor, status_filter, late
     )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # the ETag covers course, version and parameters: requests with the same
+    # one may share a single computation (see app.services.single_flight)
+    if format == "matrix":
+        matrix = JSONResponse(
+            single_flight.do(
+                "gradebook", etag, lambda: _gradebook_matrix(db, course_id)
+            )
+        )
+        set_etag(matrix, etag)
+        return matrix
 
-    result: list[dict] = []
-    for r in rows:
-        if r.submitted_at is None:
-            status_val = "missing"
-        elif r.grade is None:
-            status_val = "submitted"
+    query = _course_gradebook_query(db, course_id).filter(
+        *_gradebook_filters(status_filter, late)
+    )
+    if cursor is not None:
+        query = query.filter(_gradebook_after(cursor))
+    query = query.order_by(*_gradebook_order_by())
+
+    if format == "ndjson":
+        if limit is None:
+            # unbounded: stream straight off the cursor, batch by batch
+            rows, next_cursor = query.yield_per(GRADEBOOK_STREAM_BATCH_SIZE), None
         else:
-            status_val = "graded"
+            rows, next_cursor = _gradebook_page(query, limit)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+        def ndjson_lines():
+            for batch in _batches(rows, GRADEBOOK_STREAM_BATCH_SIZE):
+                yield "".join(
+                    json.dumps(_gradebook_record(r), default=_json_default) + "\n"
+                    for r in batch
+                )
+
+        streamed = StreamingResponse(
+            ndjson_lines(), media_type="application/x-ndjson", headers=headers
+        )
+        set_etag(streamed, etag)
+        return streamed
 
-        # compute late flags
-        is_late = False
-        late_by_minutes = None
+    def page():
+        rows, next_cursor = _gradebook_page(query, limit)
+        return [_gradebook_record(r) for r in rows], next_cursor
 
-        if r.submitted_at is not None and r.due_at is not None:
-            due = r.due_at
-            submitted = r.submitted_at
+    records, next_cursor = single_flight.do("gradebook", etag, page)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    set_etag(response, etag)
+    return records
 
-            if due.tzinfo is None:
-                due = due.replace(tzinfo=timezone.utc)
-            if submitted.tzinfo is None:
-                submitted = submitted.replace(tzinfo=timezone.utc)
 
-            late_minutes = int((submitted - due).total_seconds() // 60)
+def _gradebook_export(
+    db: Session,
+    course_id: int,
+    instructor: Principal,
+    status_filter: GradebookStatus | None,
+    late: bool | None,
+    *,
+    delimiter: str,
+    media_type: str,
+    extension: str,
+) -> StreamingResponse:
+    _ensure_course_instructor(db, course_id, instructor)
+
+    query = (
+        _course_gradebook_query(db, course_id)
+        .filter(*_gradebook_filters(status_filter, late))
+        .order_by(*_gradebook_order_by())
+    )
 
-            if late_minutes > 0:
-                late_by_minutes = late_minutes
-                if late_minutes > GRACE_PERIOD_MINUTES:
-                    is_late = True
+    def lines():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+
+        # header goes out before the query even runs
+        writer.writerow(_GRADEBOOK_FIELDS)
+        yield buffer.getvalue()
+
+        rows = query.yield_per(GRADEBOOK_STREAM_BATCH_SIZE)
+        for batch in _batches(rows, GRADEBOOK_STREAM_BATCH_SIZE):
+            buffer.seek(0)
+            buffer.truncate()
+            for r in batch:
+                submitted_at = r.submitted_at.isoformat() if r.submitted_at else None
+                writer.writerow(
+                    (
+                        r.student_id,
+                        r.student_email,
+                        r.assignment_id,
+                        r.assignment_title,
+                        submitted_at,
+                        r.grade,
+                        r.feedback,
+                        r.status,
+                        "true" if r.is_late else "false",
+                        r.late_by_minutes,
+                    )
+                )
+            yield buffer.getvalue()
+
+    filename = f"course-{course_id}-gradebook.{extension}"
+    return StreamingResponse(
+        lines(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-        result.append(
-            {
-                "student_id": me.id,
-                "student_email": me.email,
-                "assignment_id": r.assignment_id,
-                "assignment_title": r.assignment_title,
-                "submitted_at": r.submitted_at,
-                "grade": r.grade,
-                "feedback": r.feedback,
-                "status": status_val,
-                "is_late": is_late,
-                "late_by_minutes": late_by_minutes,
-            }
-        )
 
-    return result
+@router.get(
+    "/{course_id}/gradebook/export.csv",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}}}},
+)
+def export_gradebook_csv(
+    course_id: int,
+    status_filter: GradebookStatus | None = Query(default=None, alias="status"),
+    late: bool | None = None,
+    db: Session = Depends(get_read_db),
+    instructor: Principal = Depends(require_instructor),
+):
+    return _gradebook_export(
+        db,
+        course_id,
+        instructor,
+        status_filter,
+        late,
+        delimiter=",",
+        media_type="text/csv; charset=utf-8",
+        extension="csv",
+    )
 
 
 @router.get(
-    "/{course_id}/gradebook/summary", response_model=list[GradebookStudentSummary]
+    "/{course_id}/gradebook/export.tsv",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/tab-separated-values": {}}}},
 )
-def gradebook_summary(
+def export_gradebook_tsv(
     course_id: int,
-    db: Session = Depends(get_db),
-    instructor: User = Depends(require_instructor),
+    status_filter: GradebookStatus | None = Query(default=None, alias="status"),
+    late: bool | None = None,
+    db: Session = Depends(get_read_db),
+    instructor: Principal = Depends(require_instructor),
 ):
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    if course.instructor_id != instructor.id:
-        raise HTTPException(status_code=403, detail="Not course instructor")
+    return _gradebook_export(
+        db,
+        course_id,
+        instructor,
+        status_filter,
+        late,
+        delimiter="\t",
+        media_type="text/tab-separated-values; charset=utf-8",
+        extension="tsv",
+    )
 
-    rows = (
-        db.query(
-            User.id.label("student_id"),
-            User.email.label("student_email"),
-            func.count(Assignment.id).label("total_assignments"),
-            func.sum(case((Submission.id.is_(None), 1), else_=0)).label("missing"),
-            func.sum(case((Submission.id.is_not(None), 1), else_=0)).label("submitted"),
-            func.sum(case((Submission.score.is_not(None), 1), else_=0)).label("graded"),
-            func.avg(Submission.score).label("average_grade"),
+
+# ✅ Option A: student sees only THEIR rows
+@router.get("/{course_id}/gradebook/me", response_model=list[GradebookRow])
+async def my_course_gradebook(
+    course_id: int,
+    response: Response,
+    status_filter: GradebookStatus | None = Query(default=None, alias="status"),
+    late: bool | None = None,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    me: Principal = Depends(get_current_principal),
+):
+    # 1) course exists? 2) enrolled? 3) its version (one round trip)
+    access = (
+        await db.execute(
+            select(Course.version, Enrollment.id.label("enrollment_id"))
+            .outerjoin(
+                Enrollment,
+                and_(
+                    Enrollment.course_id == Course.id,
+                    Enrollment.student_id == me.id,
+                ),
+            )
+            .where(Course.id == course_id)
         )
-        .join(Enrollment, Enrollment.student_id == User.id)
-        .join(Assignment, Assignment.course_id == Enrollment.course_id)
+    ).first()
+    if access is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if access.enrollment_id is None:
+        raise HTTPException(status_code=403, detail="Not enrolled in this course")
+
+    etag = make_etag(
+        "gradebook/me", course_id, me.id, access.version, status_filter, late
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    # 4) assignments in this course + this student's submission (if any)
+    rows = await db.execute(
+        select(*_gradebook_columns(literal(me.id), literal(me.email)))
+        .select_from(Assignment)
         .outerjoin(
             Submission,
             and_(
                 Submission.assignment_id == Assignment.id,
-                Submission.student_id == User.id,
+                Submission.student_id == me.id,
             ),
         )
-        .filter(Enrollment.course_id == course_id)
-        .group_by(User.id, User.email)
+        .where(Assignment.course_id == course_id)
+        .where(*_gradebook_filters(status_filter, late))
+        .order_by(*_assignment_order_by())
+    )
+
+    return [_gradebook_record(r) for r in rows]
+
+
+def _gradebook_summary(db: Session, course_id: int) -> list[dict]:
+    rows = (
+        db.query(
+            User.id.label("student_id"),
+            User.email.label("student_email"),
+            CourseStudentStats.total_assignments,
+            CourseStudentStats.submitted,
+            CourseStudentStats.graded,
+            CourseStudentStats.score_sum,
+        )
+        .join(CourseStudentStats, CourseStudentStats.student_id == User.id)
+        # a course without assignments has nothing to summarize (no rows)
+        .filter(
+            CourseStudentStats.course_id == course_id,
+            CourseStudentStats.total_assignments > 0,
+        )
         .order_by(User.email.asc())
         .all()
     )
 
     result: list[dict] = []
     for r in rows:
-        avg = float(r.average_grade) if r.average_grade is not None else None
         result.append(
             {
                 "student_id": r.student_id,
                 "student_email": r.student_email,
-                "total_assignments": int(r.total_assignments or 0),
-                "missing": int(r.missing or 0),
-                "submitted": int(r.submitted or 0),
-                "graded": int(r.graded or 0),
-                "average_grade": avg,
+                "total_assignments": r.total_assignments,
+                "missing": r.total_assignments - r.submitted,
+                "submitted": r.submitted,
+                "graded": r.graded,
+                "average_grade": grade_stats.average_grade(r.score_sum, r.graded),
             }
         )
     return result
 
 
 @router.get(
-    "/{course_id}/gradebook/assignments", response_model=list[AssignmentStatsRow]
+    "/{course_id}/gradebook/summary", response_model=list[GradebookStudentSummary]
 )
-def gradebook_assignment_stats(
+def gradebook_summary(
     course_id: int,
-    db: Session = Depends(get_db),
-    instructor: User = Depends(require_instructor),
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_read_db),
+    instructor: Principal = Depends(require_instructor),
 ):
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    if course.instructor_id != instructor.id:
-        raise HTTPException(status_code=403, detail="Not course instructor")
+    version = _instructor_course_version(db, course_id, instructor)
+    etag = make_etag("gradebook/summary", course_id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    return single_flight.do(
+        "gradebook/summary", etag, lambda: _gradebook_summary(db, course_id)
+    )
 
-    total_students = (
-        db.query(func.count(Enrollment.id))
-        .filter(Enrollment.course_id == course_id)
-        .scalar()
-    ) or 0
 
+def _gradebook_assignment_stats(db: Session, course_id: int) -> list[dict]:
     rows = (
         db.query(
             Assignment.id.label("assignment_id"),
             Assignment.title.label("assignment_title"),
-            func.count(Submission.id).label("submitted"),
-            func.sum(case((Submission.score.is_not(None), 1), else_=0)).label("graded"),
-            func.avg(Submission.score).label("average_grade"),
+            CourseAssignmentStats.total_students,
+            CourseAssignmentStats.submitted,
+            CourseAssignmentStats.graded,
+            CourseAssignmentStats.score_sum,
         )
-        .filter(Assignment.course_id == course_id)
-        .outerjoin(Submission, Submission.assignment_id == Assignment.id)
-        .group_by(Assignment.id, Assignment.title)
+        .join(
+            CourseAssignmentStats,
+            CourseAssignmentStats.assignment_id == Assignment.id,
+        )
+        .filter(CourseAssignmentStats.course_id == course_id)
         .order_by(Assignment.id.asc())
         .all()
     )
 
     result: list[dict] = []
     for r in rows:
-        submitted = int(r.submitted or 0)
-        graded = int(r.graded or 0)
-        missing = int(total_students - submitted)
-        avg = float(r.average_grade) if r.average_grade is not None else None
-
         result.append(
             {
                 "assignment_id": r.assignment_id,
                 "assignment_title": r.assignment_title,
-                "total_students": int(total_students),
-                "submitted": submitted,
-                "graded": graded,
-                "missing": missing,
-                "average_grade": avg,
+                "total_students": r.total_students,
+                "submitted": r.submitted,
+                "graded": r.graded,
+                "missing": r.total_students - r.submitted,
+                "average_grade": grade_stats.average_grade(r.score_sum, r.graded),
             }
         )
 
     return result
 
 
+@router.get(
+    "/{course_id}/gradebook/assignments", response_model=list[AssignmentStatsRow]
+)
+def gradebook_assignment_stats(
+    course_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_read_db),
+    instructor: Principal = Depends(require_instructor),
+):
+    version = _instructor_course_version(db, course_id, instructor)
+    etag = make_etag("gradebook/assignments", course_id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    return single_flight.do(
+        "gradebook/assignments",
+        etag,
+        lambda: _gradebook_assignment_stats(db, course_id),
+    )
+
+
 @router.get("/me/dashboard", response_model=list[CourseDashboardRow])
 def my_dashboard(
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_read_db),
+    me: Principal = Depends(get_current_principal),
 ):
-    courses = (
-        db.query(Course)
-        .join(Enrollment, Enrollment.course_id == Course.id)
-        .filter(Enrollment.student_id == me.id)
-        .all()
+    now = datetime.now(timezone.utc)
+
+    # the version of each of my courses, plus how many of their due dates have
+    # passed: the overdue flags move with the clock, not with writes
+    passed_due_dates = (
+        select(func.count())
+        .where(Assignment.course_id == Course.id, Assignment.due_at < now)
+        .scalar_subquery()
     )
-
-    result: list[dict] = []
-    for c in courses:
-        agg = (
-            db.query(
-                func.count(Assignment.id).label("total_assignments"),
-                func.sum(case((Submission.id.is_not(None), 1), else_=0)).label(
-                    "submitted"
-                ),
-                func.sum(case((Submission.id.is_(None), 1), else_=0)).label("missing"),
-                func.sum(case((Submission.score.is_not(None), 1), else_=0)).label(
-                    "graded"
-                ),
-                func.avg(Submission.score).label("average_grade"),
-            )
-            .select_from(Assignment)
-            .outerjoin(
-                Submission,
-                and_(
-                    Submission.assignment_id == Assignment.id,
-                    Submission.student_id == me.id,
-                ),
+    versions = db.execute(
+        select(Course.id, Course.version, passed_due_dates)
+        .join(Enrollment, Enrollment.course_id == Course.id)
+        .where(Enrollment.student_id == me.id)
+        .order_by(Course.id)
+    ).all()
+    etag = make_etag("dashboard", me.id, [tuple(v) for v in versions])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    # next due assignment the student has NOT submitted, ranked per course
+    # across every enrolled course at once
+    next_due = (
+        select(
+            Assignment.course_id.label("course_id"),
+            Assignment.title.label("title"),
+            Assignment.due_at.label("due_at"),
+            func.row_number()
+            .over(
+                partition_by=Assignment.course_id,
+                order_by=(Assignment.due_at.asc(), Assignment.id.asc()),
             )
-            .filter(Assignment.course_id == c.id)
-            .first()
+            .label("rank"),
         )
+        .join(
+            Enrollment,
+            and_(
+                Enrollment.course_id == Assignment.course_id,
+                Enrollment.student_id == me.id,
+            ),
+        )
+        .outerjoin(
+            Submission,
+            and_(
+                Submission.assignment_id == Assignment.id,
+                Submission.student_id == me.id,
+            ),
+        )
+        .where(Submission.id.is_(None), Assignment.due_at.is_not(None))
+        .subquery()
+    )
 
-        total_assignments = int(agg.total_assignments or 0)
-        submitted = int(agg.submitted or 0)
-        missing = int(agg.missing or 0)
-        graded = int(agg.graded or 0)
-        avg = float(agg.average_grade) if agg.average_grade is not None else None
-
-        # next due assignment the student has NOT submitted
-        next_due = (
-            db.query(Assignment)
-            .outerjoin(
-                Submission,
-                and_(
-                    Submission.assignment_id == Assignment.id,
-                    Submission.student_id == me.id,
-                ),
-            )
-            .filter(Assignment.course_id == c.id)
-            .filter(Submission.id.is_(None))
-            .filter(Assignment.due_at.is_not(None))
-            .order_by(Assignment.due_at.asc())
-            .first()
+    # per-course counters come straight from the materialized stats rows
+    rows = (
+        db.query(
+            Course.id.label("course_id"),
+            Course.title.label("course_title"),
+            CourseStudentStats.total_assignments,
+            CourseStudentStats.submitted,
+            CourseStudentStats.graded,
+            CourseStudentStats.score_sum,
+            next_due.c.due_at.label("next_due_at"),
+            next_due.c.title.label("next_due_title"),
+        )
+        .join(CourseStudentStats, CourseStudentStats.course_id == Course.id)
+        .outerjoin(
+            next_due,
+            and_(next_due.c.course_id == Course.id, next_due.c.rank == 1),
         )
+        .filter(CourseStudentStats.student_id == me.id)
+        .order_by(Course.id.asc())
+        .all()
+    )
 
+    result: list[dict] = []
+    for r in rows:
         # overdue flag for next due assignment
-        now = datetime.now(timezone.utc)
         next_due_is_overdue = False
-        if next_due and next_due.due_at:
-            due = next_due.due_at
+        if r.next_due_at is not None:
+            due = r.next_due_at
             if due.tzinfo is None:
                 due = due.replace(tzinfo=timezone.utc)
             next_due_is_overdue = due < now
 
         result.append(
             {
-                "course_id": c.id,
-                "course_title": c.title,
-                "total_assignments": total_assignments,
-                "submitted": submitted,
-                "missing": missing,
-                "graded": graded,
-                "average_grade": avg,
-                "next_due_at": next_due.due_at if next_due else None,
-                "next_due_title": next_due.title if next_due else None,
+                "course_id": r.course_id,
+                "course_title": r.course_title,
+                "total_assignments": r.total_assignments,
+                "submitted": r.submitted,
+                "missing": r.total_assignments - r.submitted,
+                "graded": r.graded,
+                "average_grade": grade_stats.average_grade(r.score_sum, r.graded),
+                "next_due_at": r.next_due_at,
+                "next_due_title": r.next_due_title,
                 "next_due_is_overdue": next_due_is_overdue,
             }
         )
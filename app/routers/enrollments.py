@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.current_user import get_current_user  # adjust if needed
-from app.db.session import get_db
-from app.models.course import Course
+from app.core.config import ROSTER_IMPORT_CHUNK_SIZE, ROSTER_IMPORT_MAX_ERRORS
+from app.core.current_user import Principal, get_current_principal
+from app.core.deps import get_db, get_read_db
+from app.core.permissions import require_instructor
 from app.models.enrollment import Enrollment
-from app.models.user import User
-from app.schemas.enrollment import EnrollmentCreate, EnrollmentOut
+from app.schemas.enrollment import (
+    EnrollmentCreate,
+    EnrollmentOut,
+    RosterImportError,
+    RosterImportSummary,
+)
+from app.services import grade_stats, lookup_cache, roster_import
 
 router = APIRouter()
 
@@ -16,28 +23,132 @@ router = APIRouter()
 def enroll_me(
     payload: EnrollmentCreate,
     db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    me: Principal = Depends(get_current_principal),
 ):
-    course = db.query(Course).filter(Course.id == payload.course_id).first()
-    if not course:
+    if not lookup_cache.course(db, payload.course_id):
         raise HTTPException(status_code=404, detail="Course not found")
 
     enrollment = Enrollment(student_id=me.id, course_id=payload.course_id)
     db.add(enrollment)
 
     try:
-        db.commit()
+        db.flush()
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=409, detail="Already enrolled")
 
+    grade_stats.on_enrollment_created(db, payload.course_id, me.id)
+    lookup_cache.on_enrollments_created(db, payload.course_id)
+    db.commit()
+    lookup_cache.members_changed(payload.course_id)
+
     db.refresh(enrollment)
     return enrollment
 
 
 @router.get("/me", response_model=list[EnrollmentOut])
 def my_enrollments(
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    me: Principal = Depends(get_current_principal),
 ):
     return db.query(Enrollment).filter(Enrollment.student_id == me.id).all()
+
+
+_ROSTER_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def _ensure_course_instructor(db: Session, course_id: int, user: Principal) -> None:
+    course = lookup_cache.course(db, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if course.instructor_id != user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Only the course instructor can import a roster",
+        )
+
+
+def _enroll_chunk_and_commit(
+    db: Session, course_id: int, rows: list[roster_import.RosterRow]
+) -> roster_import.ChunkResult:
+    try:
+        result = roster_import.enroll_chunk(db, course_id, rows)
+        if result.enrolled:
+            lookup_cache.on_enrollments_created(db, course_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if result.enrolled:
+        lookup_cache.members_changed(course_id)
+    return result
+
+
+def _record_chunk(
+    summary: RosterImportSummary, rows: int, result: roster_import.ChunkResult
+) -> None:
+    summary.rows += rows
+    summary.enrolled += result.enrolled
+    summary.already_enrolled += result.already_enrolled
+    summary.rejected += len(result.rejected)
+    summary.chunks_committed += 1
+    room = ROSTER_IMPORT_MAX_ERRORS - len(summary.errors)
+    summary.errors.extend(
+        RosterImportError(line=r.line, email=r.email, error=r.error)
+        for r in result.rejected[:room]
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=RosterImportSummary,
+    responses={
+        400: {"description": "Unreadable roster (e.g. CSV without an email column)"},
+        415: {"description": "Body must be text/csv or JSON lines"},
+    },
+)
+async def import_roster(
+    request: Request,
+    course_id: int = Query(...),
+    db: Session = Depends(get_db),
+    instructor: Principal = Depends(require_instructor),
+):
+    """
+    Enroll a streamed roster in one course: CSV with an `email` column, or
+    JSON lines with an "email" key. Rows are committed every
+    ROSTER_IMPORT_CHUNK_SIZE rows, so a failure part-way through keeps the
+    chunks before it.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = _ROSTER_CONTENT_TYPES.get(media_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Roster must be text/csv or application/x-ndjson",
+        )
+
+    await run_in_threadpool(_ensure_course_instructor, db, course_id, instructor)
+
+    summary = RosterImportSummary(course_id=course_id)
+    chunk = []
+    try:
+        async for row in roster_import.iter_roster_rows(request.stream(), fmt):
+            chunk.append(row)
+            if len(chunk) >= ROSTER_IMPORT_CHUNK_SIZE:
+                result = await run_in_threadpool(
+                    _enroll_chunk_and_commit, db, course_id, chunk
+                )
+                _record_chunk(summary, len(chunk), result)
+                chunk = []
+    except roster_import.RosterFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if chunk:
+        result = await run_in_threadpool(_enroll_chunk_and_commit, db, course_id, chunk)
+        _record_chunk(summary, len(chunk), result)
+
+    return summary
@@ -1,14 +1,12 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db
+from app.core.current_user import Principal
+from app.core.deps import get_read_db
 from app.core.permissions import require_instructor
-from app.models.assignment import Assignment
 from app.models.course import Course
-from app.models.enrollment import Enrollment
-from app.models.submission import Submission
-from app.models.user import User
+from app.models.grade_stats import CourseAssignmentStats, CourseStudentStats
 from app.schemas.instructor_dashboard import InstructorCourseStats
 
 router = APIRouter(tags=["instructor"])
@@ -16,52 +14,59 @@ router = APIRouter(tags=["instructor"])
 
 @router.get("/instructor/dashboard", response_model=list[InstructorCourseStats])
 def instructor_dashboard(
-    db: Session = Depends(get_db),
-    me: User = Depends(require_instructor),
+    db: Session = Depends(get_read_db),
+    me: Principal = Depends(require_instructor),
 ):
-    courses = db.query(Course).filter(Course.instructor_id == me.id).all()
+    my_course_ids = select(Course.id).where(Course.instructor_id == me.id)
 
-    rows: list[InstructorCourseStats] = []
-
-    for course in courses:
-        total_students = (
-            db.query(func.count(Enrollment.id))
-            .filter(Enrollment.course_id == course.id)
-            .scalar()
-        ) or 0
-
-        total_assignments = (
-            db.query(func.count(Assignment.id))
-            .filter(Assignment.course_id == course.id)
-            .scalar()
-        ) or 0
-
-        total_submissions = (
-            db.query(func.count(Submission.id))
-            .join(Assignment, Submission.assignment_id == Assignment.id)
-            .filter(Assignment.course_id == course.id)
-            .scalar()
-        ) or 0
+    students = (
+        select(
+            CourseStudentStats.course_id.label("course_id"),
+            func.count().label("total"),
+        )
+        .where(CourseStudentStats.course_id.in_(my_course_ids))
+        .group_by(CourseStudentStats.course_id)
+        .subquery()
+    )
 
-        ungraded_submissions = (
-            db.query(func.count(Submission.id))
-            .join(Assignment, Submission.assignment_id == Assignment.id)
-            .filter(
-                Assignment.course_id == course.id,
-                Submission.score.is_(None),
-            )
-            .scalar()
-        ) or 0
+    assignments = (
+        select(
+            CourseAssignmentStats.course_id.label("course_id"),
+            func.count().label("total"),
+            func.sum(CourseAssignmentStats.submitted).label("submissions"),
+            func.sum(
+                CourseAssignmentStats.submitted - CourseAssignmentStats.graded
+            ).label("ungraded"),
+        )
+        .where(CourseAssignmentStats.course_id.in_(my_course_ids))
+        .group_by(CourseAssignmentStats.course_id)
+        .subquery()
+    )
 
-        rows.append(
-            InstructorCourseStats(
-                course_id=course.id,
-                course_title=course.title,
-                total_students=total_students,
-                total_assignments=total_assignments,
-                total_submissions=total_submissions,
-                ungraded_submissions=ungraded_submissions,
-            )
+    rows = (
+        db.query(
+            Course.id,
+            Course.title,
+            students.c.total.label("total_students"),
+            assignments.c.total.label("total_assignments"),
+            assignments.c.submissions.label("total_submissions"),
+            assignments.c.ungraded.label("ungraded_submissions"),
         )
+        .outerjoin(students, students.c.course_id == Course.id)
+        .outerjoin(assignments, assignments.c.course_id == Course.id)
+        .filter(Course.instructor_id == me.id)
+        .order_by(Course.id.asc())
+        .all()
+    )
 
-    return rows
+    return [
+        InstructorCourseStats(
+            course_id=r.id,
+            course_title=r.title,
+            total_students=r.total_students or 0,
+            total_assignments=r.total_assignments or 0,
+            total_submissions=r.total_submissions or 0,
+            ungraded_submissions=r.ungraded_submissions or 0,
+        )
+        for r in rows
+    ]
@@ -1,86 +1,106 @@
-import math
+import asyncio
 from datetime import datetime, timezone
+from typing import Callable
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import and_
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.core.config import GRACE_PERIOD_MINUTES, LATE_PENALTY_MAX, LATE_PENALTY_PER_DAY
-from app.core.current_user import get_current_user
-from app.core.deps import get_db
+from app.core.current_user import Principal, get_current_principal
+from app.core.deps import get_db, get_read_db
 from app.core.permissions import require_instructor
-from app.models.assignment import Assignment
-from app.models.course import Course
-from app.models.enrollment import Enrollment
 from app.models.submission import Submission
-from app.models.user import User
 from app.schemas.submission import (
+    BulkGradeRequest,
+    BulkGradeResponse,
+    BulkGradeResult,
     SubmissionCreate,
     SubmissionGradeUpdate,
     SubmissionRead,
 )
+from app.services import grade_stats, idempotency, lookup_cache
+from app.services.late_policy import late_columns, late_penalty
+from app.services.submissions import upsert_submission
+from app.workers.submission_writer import SubmissionWriter, get_submission_writer
 
 router = APIRouter()
 
 
-def _ensure_assignment_exists(db: Session, assignment_id: int) -> Assignment:
-    a = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+def _ensure_assignment_exists(
+    db: Session, assignment_id: int
+) -> lookup_cache.AssignmentInfo:
+    a = lookup_cache.assignment(db, assignment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assignment not found")
     return a
 
 
-def _ensure_student_enrolled(db: Session, course_id: int, student_id: int) -> None:
-    enrolled = (
-        db.query(Enrollment)
-        .filter(Enrollment.course_id == course_id, Enrollment.student_id == student_id)
-        .first()
-        is not None
-    )
-    if not enrolled:
-        raise HTTPException(status_code=403, detail="Not enrolled in this course")
-
-
-def _late_penalty_multiplier(
-    assignment: Assignment,
-    submitted_at: datetime,
-) -> tuple[bool, int | None, int, float]:
-    """
-    Returns: (is_late, late_by_minutes, days_late, multiplier)
+def _ensure_course_instructor(
+    db: Session, course_id: int, instructor: Principal, detail: str
+) -> None:
+    course = lookup_cache.course(db, course_id)
+    if not course or course.instructor_id != instructor.id:
+        raise HTTPException(status_code=403, detail=detail)
 
-    Policy:
-    - GRACE_PERIOD_MINUTES: if late_by_minutes <= grace -> not late, no penalty
-    - LATE_PENALTY_PER_DAY: percent off per day late
-    - LATE_PENALTY_MAX: cap total deduction (0.50 means max 50% off)
-    """
-    if assignment.due_at is None:
-        return (False, None, 0, 1.0)
 
-    due = assignment.due_at
-    if due.tzinfo is None:
-        due = due.replace(tzinfo=timezone.utc)
+def _submission_target(
+    db: Session, assignment_id: int, student_id: int
+) -> lookup_cache.AssignmentInfo:
+    """The assignment, once the student is known to be enrolled in its course."""
+    target = _ensure_assignment_exists(db, assignment_id)
+    if not lookup_cache.is_member(db, target.course_id, student_id):
+        raise HTTPException(status_code=403, detail="Not enrolled in this course")
+    return target
 
-    submitted = submitted_at
-    if submitted.tzinfo is None:
-        submitted = submitted.replace(tzinfo=timezone.utc)
 
-    if submitted <= due:
-        return (False, 0, 0, 1.0)
+def _save_submission(
+    db: Session,
+    course_id: int,
+    assignment_id: int,
+    student_id: int,
+    content: str | None,
+    submitted_at: datetime,
+    respond: Callable[[dict], SubmissionRead],
+    idempotency_key: str | None,
+) -> SubmissionRead:
+    try:
+        row = upsert_submission(db, assignment_id, student_id, content, submitted_at)
+        grade_stats.on_submission_changed(db, course_id, assignment_id, student_id)
+        result = respond(row)
+        if idempotency_key:
+            _store_response(db, student_id, idempotency_key, 201, result)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
 
-    late_minutes = int((submitted - due).total_seconds() // 60)
 
-    # ✅ grace period
-    if late_minutes <= GRACE_PERIOD_MINUTES:
-        return (False, late_minutes, 0, 1.0)
+def _store_response(
+    db: Session, user_id: int, key: str, status_code: int, result: SubmissionRead
+) -> None:
+    """Keep `result` for replays of this Idempotency-Key. Does not commit."""
+    idempotency.complete(db, user_id, key, status_code, result.model_dump_json())
 
-    # compute days late (ceil, so 1 minute past grace counts as 1 day late)
-    days_late = int(math.ceil(late_minutes / 1440)) if late_minutes > 0 else 0
 
-    raw_deduction = days_late * LATE_PENALTY_PER_DAY
-    capped_deduction = min(raw_deduction, LATE_PENALTY_MAX)
+def _graded_feedback(feedback: str | None, is_late: bool, days_late: int) -> str | None:
+    """Instructor feedback with a late-penalty note appended (mentions the cap)."""
+    note = None
+    if is_late and days_late > 0:
+        raw_deduction = days_late * LATE_PENALTY_PER_DAY
+        capped_deduction = min(raw_deduction, LATE_PENALTY_MAX)
+        penalty_pct = int(round(capped_deduction * 100))
+        note = (
+            f"Late penalty applied: -{penalty_pct}% "
+            f"({days_late} day(s) late, grace {GRACE_PERIOD_MINUTES} min, "
+            f"cap {int(LATE_PENALTY_MAX * 100)}%)."
+        )
 
-    multiplier = max(0.0, 1.0 - capped_deduction)
-    return (True, late_minutes, days_late, multiplier)
+    if feedback and note:
+        return feedback + "\n" + note
+    return feedback or note
 
 
 @router.post(
@@ -88,77 +108,82 @@ def _late_penalty_multiplier(
     response_model=SubmissionRead,
     status_code=status.HTTP_201_CREATED,
 )
-def submit_assignment(
+async def submit_assignment(
     assignment_id: int,
     payload: SubmissionCreate,
+    request: Request,
+    idempotency_key: str | None = Header(None),
     db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    me: Principal = Depends(get_current_principal),
+    writer: SubmissionWriter | None = Depends(get_submission_writer),
 ):
-    assignment = _ensure_assignment_exists(db, assignment_id)
-    _ensure_student_enrolled(db, assignment.course_id, me.id)
+    if idempotency.check_key(idempotency_key):
+        fingerprint = idempotency.request_hash(request, payload.model_dump_json())
+        replayed = await run_in_threadpool(
+            idempotency.reserve, db, me.id, idempotency_key, fingerprint
+        )
+        if replayed is not None:
+            return replayed
+    try:
+        return await _submit(
+            db, assignment_id, me.id, payload.content, writer, idempotency_key
+        )
+    except Exception:
+        if idempotency_key:
+            await run_in_threadpool(idempotency.release, db, me.id, idempotency_key)
+        raise
+
 
+async def _submit(
+    db: Session,
+    assignment_id: int,
+    student_id: int,
+    content: str | None,
+    writer: SubmissionWriter | None,
+    idempotency_key: str | None,
+) -> SubmissionRead:
+    target = await run_in_threadpool(_submission_target, db, assignment_id, student_id)
+
+    # stamped at receipt, even if group commit writes it a few ms later
     now = datetime.now(timezone.utc)
 
     # ✅ Late detection using the SAME policy (grace window included)
-    is_late, late_by_minutes, _days_late, _mult = _late_penalty_multiplier(
-        assignment, now
-    )
+    is_late, late_by_minutes, _days_late, _mult = late_penalty(target.due_at, now)
 
-    # allow resubmission: update existing submission if it exists
-    existing = (
-        db.query(Submission)
-        .filter(
-            and_(
-                Submission.assignment_id == assignment_id,
-                Submission.student_id == me.id,
-            )
+    def respond(row: dict) -> SubmissionRead:
+        # attach computed fields
+        return SubmissionRead(**row, is_late=is_late, late_by_minutes=late_by_minutes)
+
+    if writer is None:
+        return await run_in_threadpool(
+            _save_submission,
+            db,
+            target.course_id,
+            assignment_id,
+            student_id,
+            content,
+            now,
+            respond,
+            idempotency_key,
         )
-        .first()
-    )
-
-    if existing:
-        existing.content = payload.content
-        existing.submitted_at = now
-
-        # clear previous grading on resubmit (policy choice)
-        existing.score = None
-        existing.feedback = None
-        existing.graded_at = None
-
-        try:
-            db.commit()
-        except Exception:
-            db.rollback()
-            raise
 
-        db.refresh(existing)
-
-        # attach computed fields
-        existing.is_late = is_late
-        existing.late_by_minutes = late_by_minutes
-        return existing
-
-    # otherwise create first submission
-    s = Submission(
-        assignment_id=assignment_id,
-        student_id=me.id,
-        content=payload.content,
-        submitted_at=now,
+    # hand our pooled connection back before waiting, so a surge of queued
+    # requests cannot starve the writer of connections
+    db.close()
+    # the writer stores the Idempotency-Key response in its batch transaction
+    stored_key = (student_id, idempotency_key) if idempotency_key else None
+    row = await asyncio.wrap_future(
+        writer.submit(
+            target.course_id,
+            assignment_id,
+            student_id,
+            content,
+            now,
+            idempotency_key=stored_key,
+            response_body=lambda row: respond(row).model_dump_json(),
+        )
     )
-    db.add(s)
-
-    try:
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-
-    db.refresh(s)
-
-    # attach computed fields
-    s.is_late = is_late
-    s.late_by_minutes = late_by_minutes
-    return s
+    return respond(row)
 
 
 @router.get(
@@ -167,25 +192,22 @@ def submit_assignment(
 )
 def list_submissions_for_assignment(
     assignment_id: int,
-    db: Session = Depends(get_db),
-    instructor: User = Depends(require_instructor),
+    db: Session = Depends(get_read_db),
+    instructor: Principal = Depends(require_instructor),
 ):
     assignment = _ensure_assignment_exists(db, assignment_id)
-
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
-    if not course or course.instructor_id != instructor.id:
-        raise HTTPException(
-            status_code=403,
-            detail="Only the course instructor can view submissions",
-        )
+    _ensure_course_instructor(
+        db,
+        assignment.course_id,
+        instructor,
+        "Only the course instructor can view submissions",
+    )
 
     subs = db.query(Submission).filter(Submission.assignment_id == assignment_id).all()
 
     # attach computed fields for response (uses submission time)
-    for s in subs:
-        is_late, late_by_minutes, _days_late, _mult = _late_penalty_multiplier(
-            assignment, s.submitted_at
-        )
+    late = late_columns([assignment.due_at] * len(subs), [s.submitted_at for s in subs])
+    for s, is_late, late_by_minutes in zip(subs, late.is_late, late.late_by_minutes):
         s.is_late = is_late
         s.late_by_minutes = late_by_minutes
 
@@ -199,22 +221,39 @@ def list_submissions_for_assignment(
 def grade_submission(
     submission_id: int,
     payload: SubmissionGradeUpdate,
+    request: Request,
+    idempotency_key: str | None = Header(None),
     db: Session = Depends(get_db),
-    instructor: User = Depends(require_instructor),
+    instructor: Principal = Depends(require_instructor),
 ):
+    if idempotency.check_key(idempotency_key):
+        fingerprint = idempotency.request_hash(request, payload.model_dump_json())
+        replayed = idempotency.reserve(db, instructor.id, idempotency_key, fingerprint)
+        if replayed is not None:
+            return replayed
+    try:
+        return _grade(db, submission_id, payload, instructor, idempotency_key)
+    except Exception:
+        if idempotency_key:
+            idempotency.release(db, instructor.id, idempotency_key)
+        raise
+
+
+def _grade(
+    db: Session,
+    submission_id: int,
+    payload: SubmissionGradeUpdate,
+    instructor: Principal,
+    idempotency_key: str | None,
+) -> SubmissionRead:
     sub = db.query(Submission).filter(Submission.id == submission_id).first()
     if not sub:
         raise HTTPException(status_code=404, detail="Submission not found")
 
-    assignment = db.query(Assignment).filter(Assignment.id == sub.assignment_id).first()
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
-    if not course or course.instructor_id != instructor.id:
-        raise HTTPException(
-            status_code=403, detail="Only the course instructor can grade"
-        )
+    assignment = _ensure_assignment_exists(db, sub.assignment_id)
+    _ensure_course_instructor(
+        db, assignment.course_id, instructor, "Only the course instructor can grade"
+    )
 
     if payload.score < 0 or payload.score > assignment.max_score:
         raise HTTPException(
@@ -225,46 +264,133 @@ def grade_submission(
     raw_score = payload.score
 
     # compute late penalty based on actual submitted time
-    is_late, late_by_minutes, days_late, mult = _late_penalty_multiplier(
-        assignment,
-        sub.submitted_at,
+    is_late, late_by_minutes, days_late, mult = late_penalty(
+        assignment.due_at, sub.submitted_at
     )
 
     final_score = round(raw_score * mult, 2)
     sub.score = final_score
-
-    # add/merge feedback note if late (mention cap)
-    note = None
-    if is_late and days_late > 0:
-        raw_deduction = days_late * LATE_PENALTY_PER_DAY
-        capped_deduction = min(raw_deduction, LATE_PENALTY_MAX)
-        penalty_pct = int(round(capped_deduction * 100))
-        note = (
-            f"Late penalty applied: -{penalty_pct}% "
-            f"({days_late} day(s) late, grace {GRACE_PERIOD_MINUTES} min, "
-            f"cap {int(LATE_PENALTY_MAX * 100)}%)."
-        )
-
-    if payload.feedback and note:
-        sub.feedback = payload.feedback + "\n" + note
-    elif payload.feedback:
-        sub.feedback = payload.feedback
-    elif note:
-        sub.feedback = note
-    else:
-        sub.feedback = None
-
+    sub.feedback = _graded_feedback(payload.feedback, is_late, days_late)
     sub.graded_at = datetime.now(timezone.utc)
 
+    # attach computed fields for response
+    sub.is_late = is_late
+    sub.late_by_minutes = late_by_minutes
+
     try:
+        db.flush()
+        grade_stats.on_submission_changed(
+            db, assignment.course_id, assignment.id, sub.student_id
+        )
+        result = SubmissionRead.model_validate(sub)
+        if idempotency_key:
+            _store_response(db, instructor.id, idempotency_key, 200, result)
         db.commit()
     except Exception:
         db.rollback()
         raise
 
-    db.refresh(sub)
+    return result
 
-    # attach computed fields for response
-    sub.is_late = is_late
-    sub.late_by_minutes = late_by_minutes
-    return sub
+
+@router.patch(
+    "/assignments/{assignment_id}/grades",
+    response_model=BulkGradeResponse,
+)
+def bulk_grade_assignment(
+    assignment_id: int,
+    payload: BulkGradeRequest,
+    db: Session = Depends(get_db),
+    instructor: Principal = Depends(require_instructor),
+):
+    """
+    Grade many submissions to one assignment in a single transaction.
+
+    Items that cannot be applied (unknown submission, score out of range,
+    the same submission twice) are reported per item and do not block the
+    rest of the batch.
+    """
+    assignment = _ensure_assignment_exists(db, assignment_id)
+    _ensure_course_instructor(
+        db, assignment.course_id, instructor, "Only the course instructor can grade"
+    )
+
+    subs = (
+        db.query(Submission.id, Submission.student_id, Submission.submitted_at)
+        .filter(Submission.assignment_id == assignment_id)
+        .all()
+    )
+    by_id = {s.id: s for s in subs}
+    by_student = {s.student_id: s for s in subs}
+
+    results = []
+    accepted = []  # (result, submission row, item)
+    seen = set()
+    for index, item in enumerate(payload.grades):
+        result = BulkGradeResult(
+            index=index,
+            status="error",
+            submission_id=item.submission_id,
+            student_id=item.student_id,
+        )
+        results.append(result)
+
+        if item.submission_id is not None:
+            sub = by_id.get(item.submission_id)
+        else:
+            sub = by_student.get(item.student_id)
+
+        if sub is None:
+            result.error = "Submission not found"
+        elif sub.id in seen:
+            result.error = "Submission appears more than once in this batch"
+        elif item.score < 0 or item.score > assignment.max_score:
+            result.error = f"score must be between 0 and {assignment.max_score}"
+        else:
+            seen.add(sub.id)
+            accepted.append((result, sub, item))
+
+    late = late_columns(
+        [assignment.due_at] * len(accepted),
+        [sub.submitted_at for _, sub, _ in accepted],
+    )
+    graded_at = datetime.now(timezone.utc)
+
+    updates = []
+    for (result, sub, item), is_late, late_by_minutes, days_late, mult in zip(
+        accepted, *late
+    ):
+        score = round(item.score * mult, 2)
+        updates.append(
+            {
+                "id": sub.id,
+                "score": score,
+                "feedback": _graded_feedback(item.feedback, is_late, days_late),
+                "graded_at": graded_at,
+            }
+        )
+        result.status = "graded"
+        result.submission_id = sub.id
+        result.student_id = sub.student_id
+        result.score = score
+        result.is_late = is_late
+        result.late_by_minutes = late_by_minutes
+
+    if updates:
+        try:
+            # ORM bulk UPDATE by primary key: one executemany
+            db.execute(update(Submission), updates)
+            grade_stats.on_submissions_changed(
+                db,
+                assignment.course_id,
+                assignment.id,
+                [sub.student_id for _, sub, _ in accepted],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    return BulkGradeResponse(
+        graded=len(updates), failed=len(results) - len(updates), results=results
+    )
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -15,3 +16,20 @@ class EnrollmentOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RosterImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    error: str
+
+
+class RosterImportSummary(BaseModel):
+    course_id: int
+    rows: int = 0
+    enrolled: int = 0
+    already_enrolled: int = 0
+    rejected: int = 0
+    chunks_committed: int = 0
+    # at most ROSTER_IMPORT_MAX_ERRORS entries; `rejected` has the full count
+    errors: list[RosterImportError] = []
@@ -1,8 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel
 
+GradebookStatus = Literal["missing", "submitted", "graded"]
+
 
 class GradebookRow(BaseModel):
     student_id: int
@@ -18,3 +20,31 @@ class GradebookRow(BaseModel):
 
     is_late: bool = False
     late_by_minutes: int | None = None
+
+
+class GradebookMatrixStudent(BaseModel):
+    id: int
+    email: str
+
+
+class GradebookMatrixAssignment(BaseModel):
+    id: int
+    title: str
+    due_at: Optional[datetime] = None
+    max_score: float
+
+
+class GradebookMatrix(BaseModel):
+    """
+    Pivoted gradebook for grid UIs. Cell [i][j] of grades / status /
+    late_by_minutes belongs to students[i] and assignments[j]; status cells
+    are indexes into status_codes.
+    """
+
+    students: list[GradebookMatrixStudent]
+    assignments: list[GradebookMatrixAssignment]
+    status_codes: list[GradebookStatus]
+    grace_period_minutes: int
+    grades: list[list[Optional[float]]]
+    status: list[list[int]]
+    late_by_minutes: list[list[Optional[int]]]
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class SubmissionCreate(BaseModel):
@@ -29,3 +29,38 @@ class SubmissionRead(BaseModel):
 class SubmissionGradeUpdate(BaseModel):
     score: float
     feedback: Optional[str] = None
+
+
+class BulkGradeItem(BaseModel):
+    # identify the submission directly, or by the student who made it
+    submission_id: Optional[int] = None
+    student_id: Optional[int] = None
+    score: float
+    feedback: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _one_target(self):
+        if (self.submission_id is None) == (self.student_id is None):
+            raise ValueError("provide exactly one of submission_id or student_id")
+        return self
+
+
+class BulkGradeRequest(BaseModel):
+    grades: list[BulkGradeItem] = Field(min_length=1)
+
+
+class BulkGradeResult(BaseModel):
+    index: int
+    status: Literal["graded", "error"]
+    submission_id: Optional[int] = None
+    student_id: Optional[int] = None
+    score: Optional[float] = None
+    is_late: bool = False
+    late_by_minutes: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkGradeResponse(BaseModel):
+    graded: int
+    failed: int
+    results: list[BulkGradeResult]
@@ -0,0 +1,75 @@
+"""
+Cache invalidation across worker processes.
+
+In-process caches (app.services.lookup_cache, app.services.token_versions)
+are only told about the writes their own process makes. To reach the other
+uvicorn workers, and other nodes on the same database file, a write also
+publishes a (cache, key) event into the append-only cache_events table, in
+the transaction that makes the change. Every process polls the table by id
+(app.workers.cache_event_listener) and hands each new event to the handlers
+subscribed to its cache, so another process's change is seen here at most
+CACHE_EVENT_POLL_SECONDS after it commits.
+
+SQLite has a single writer, so ids commit in increasing order: an event can
+never show up behind one this process has already applied. Events older than
+CACHE_EVENT_RETENTION are pruned. A process that misses pruned events lost
+nothing, because every entry they would have dropped has expired by then.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import CACHE_EVENT_RETENTION
+from app.models.cache_event import CacheEvent
+
+# cache name -> handler(db, key); db is the listener's session, for handlers
+# that reload rather than drop
+_handlers: defaultdict[str, list[Callable[[Session, int], None]]] = defaultdict(list)
+# id of the newest event applied in this process
+_last_seen = 0
+
+
+def subscribe(cache: str, handler: Callable[[Session, int], None]) -> None:
+    _handlers[cache].append(handler)
+
+
+def publish(db: Session, cache: str, key: int) -> None:
+    """Tell every process to drop `key` from `cache`. Does not commit."""
+    db.execute(
+        insert(CacheEvent).values(
+            cache=cache, key=key, created_at=datetime.now(timezone.utc)
+        )
+    )
+
+
+def skip_to_latest(db: Session) -> None:
+    """Start from the newest event: a starting process has nothing cached."""
+    global _last_seen
+    _last_seen = db.execute(select(func.max(CacheEvent.id))).scalar() or 0
+
+
+def poll(db: Session) -> int:
+    """Apply the events committed since the last poll; returns how many."""
+    global _last_seen
+    events = db.execute(
+        select(CacheEvent.id, CacheEvent.cache, CacheEvent.key)
+        .where(CacheEvent.id > _last_seen)
+        .order_by(CacheEvent.id)
+    ).all()
+    # a roster import publishes the same key once per chunk
+    for cache, key in dict.fromkeys((e.cache, e.key) for e in events):
+        for handler in _handlers.get(cache, ()):
+            handler(db, key)
+    if events:
+        _last_seen = events[-1].id
+    return len(events)
+
+
+def prune(db: Session, now: datetime | None = None) -> int:
+    """Delete events older than CACHE_EVENT_RETENTION. Does not commit."""
+    cutoff = (now or datetime.now(timezone.utc)) - CACHE_EVENT_RETENTION
+    return db.execute(delete(CacheEvent).where(CacheEvent.created_at < cutoff)).rowcount
@@ -0,0 +1,37 @@
+"""
+Per-course data versions, for conditional GETs.
+
+courses.version goes up by one in the same transaction as every write that
+can change what the course's gradebook and dashboard reads return: new or
+graded submissions, enrollments, assignments. Those writes all go through
+app.services.grade_stats' on_* hooks, which call bump().
+
+Read paths fold the version into a strong ETag (app.utils.etag). They must
+read it before the rows it describes: a write landing in between then costs
+the client one extra download, while reading it after could pair old rows
+with the new version.
+"""
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.course import Course
+
+
+def bump(db: Session, course_id: int) -> None:
+    """Mark the course's reads as changed. Does not commit."""
+    db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(version=Course.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_all(db: Session) -> None:
+    """bump() for every course. Does not commit."""
+    db.execute(
+        update(Course)
+        .values(version=Course.version + 1)
+        .execution_options(synchronize_session=False)
+    )
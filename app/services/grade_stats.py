@@ -0,0 +1,249 @@
+"""
+Materialized grade counters for the gradebook and dashboard read paths.
+
+`course_student_stats` holds one row per (course, enrolled student) and
+`course_assignment_stats` one row per (course, assignment). Write paths call
+the on_* hooks after flushing their change and before committing, so the
+counters move in the same transaction as the rows they describe. The hooks
+also bump the course's version (app.services.course_versions), which is what
+conditional GETs on those reads compare against.
+
+Counters are recomputed from source (an indexed, per-key or per-course
+aggregate) rather than adjusted by deltas, so concurrent writers and repeated
+hook calls cannot make them drift. If they drift anyway (manual SQL, restored
+backups), rebuild:
+
+    python -m app.services.grade_stats [--course-id ID]
+"""
+
+import argparse
+
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models.assignment import Assignment
+from app.models.enrollment import Enrollment
+from app.models.grade_stats import CourseAssignmentStats, CourseStudentStats
+from app.models.submission import Submission
+from app.services import course_versions
+
+_STUDENT_COLUMNS = (
+    "course_id",
+    "student_id",
+    "total_assignments",
+    "submitted",
+    "graded",
+    "score_sum",
+)
+_ASSIGNMENT_COLUMNS = (
+    "course_id",
+    "assignment_id",
+    "total_students",
+    "submitted",
+    "graded",
+    "score_sum",
+)
+
+
+def average_grade(score_sum: float, graded: int) -> float | None:
+    """Mean score over graded submissions (None when nothing is graded)."""
+    return float(score_sum) / graded if graded else None
+
+
+def _student_stats_source():
+    """CourseStudentStats rows computed from enrollments/assignments/submissions."""
+    return (
+        select(
+            Enrollment.course_id,
+            Enrollment.student_id,
+            func.count(Assignment.id),
+            func.count(Submission.id),
+            func.count(Submission.score),
+            func.coalesce(func.sum(Submission.score), 0.0),
+        )
+        .select_from(Enrollment)
+        .outerjoin(Assignment, Assignment.course_id == Enrollment.course_id)
+        .outerjoin(
+            Submission,
+            and_(
+                Submission.assignment_id == Assignment.id,
+                Submission.student_id == Enrollment.student_id,
+            ),
+        )
+        .group_by(Enrollment.course_id, Enrollment.student_id)
+    )
+
+
+def _assignment_stats_source():
+    """CourseAssignmentStats rows computed from assignments/submissions."""
+    total_students = (
+        select(func.count(Enrollment.id))
+        .where(Enrollment.course_id == Assignment.course_id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Assignment.course_id,
+            Assignment.id,
+            total_students,
+            func.count(Submission.id),
+            func.count(Submission.score),
+            func.coalesce(func.sum(Submission.score), 0.0),
+        )
+        .select_from(Assignment)
+        .outerjoin(Submission, Submission.assignment_id == Assignment.id)
+        .group_by(Assignment.id)
+    )
+
+
+def _course_student_count(course_id: int):
+    return (
+        select(func.count(Enrollment.id))
+        .where(Enrollment.course_id == course_id)
+        .scalar_subquery()
+    )
+
+
+def _course_assignment_count(course_id: int):
+    return (
+        select(func.count(Assignment.id))
+        .where(Assignment.course_id == course_id)
+        .scalar_subquery()
+    )
+
+
+def _set_total_students(db: Session, course_id: int) -> None:
+    db.execute(
+        update(CourseAssignmentStats)
+        .where(CourseAssignmentStats.course_id == course_id)
+        .values(total_students=_course_student_count(course_id))
+    )
+
+
+def _upsert(db: Session, model, columns: tuple[str, ...], source) -> None:
+    stmt = insert(model).from_select(columns, source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=columns[:2],
+        set_={c: stmt.excluded[c] for c in columns[2:]},
+    )
+    db.execute(stmt)
+
+
+def _refresh_student(db: Session, course_id: int, student_id: int) -> None:
+    source = _student_stats_source().where(
+        Enrollment.course_id == course_id, Enrollment.student_id == student_id
+    )
+    _upsert(db, CourseStudentStats, _STUDENT_COLUMNS, source)
+
+
+def _refresh_assignment(db: Session, assignment_id: int) -> None:
+    source = _assignment_stats_source().where(Assignment.id == assignment_id)
+    _upsert(db, CourseAssignmentStats, _ASSIGNMENT_COLUMNS, source)
+
+
+def on_submission_changed(
+    db: Session, course_id: int, assignment_id: int, student_id: int
+) -> None:
+    """A submission was created, resubmitted or graded."""
+    _refresh_student(db, course_id, student_id)
+    _refresh_assignment(db, assignment_id)
+    course_versions.bump(db, course_id)
+
+
+def on_submissions_changed(
+    db: Session, course_id: int, assignment_id: int, student_ids: list[int]
+) -> None:
+    """Several submissions to one assignment changed (bulk grading)."""
+    if not student_ids:
+        return
+    source = _student_stats_source().where(
+        Enrollment.course_id == course_id, Enrollment.student_id.in_(student_ids)
+    )
+    _upsert(db, CourseStudentStats, _STUDENT_COLUMNS, source)
+    _refresh_assignment(db, assignment_id)
+    course_versions.bump(db, course_id)
+
+
+def on_enrollment_created(db: Session, course_id: int, student_id: int) -> None:
+    _refresh_student(db, course_id, student_id)
+    _set_total_students(db, course_id)
+    course_versions.bump(db, course_id)
+
+
+def on_enrollments_created(db: Session, course_id: int, student_ids: list[int]) -> None:
+    """Several students were enrolled in one course at once (roster import)."""
+    if not student_ids:
+        return
+    source = _student_stats_source().where(
+        Enrollment.course_id == course_id, Enrollment.student_id.in_(student_ids)
+    )
+    _upsert(db, CourseStudentStats, _STUDENT_COLUMNS, source)
+    _set_total_students(db, course_id)
+    course_versions.bump(db, course_id)
+
+
+def on_assignment_created(db: Session, course_id: int, assignment_id: int) -> None:
+    _refresh_assignment(db, assignment_id)
+    db.execute(
+        update(CourseStudentStats)
+        .where(CourseStudentStats.course_id == course_id)
+        .values(total_assignments=_course_assignment_count(course_id))
+    )
+    course_versions.bump(db, course_id)
+
+
+def rebuild(db: Session, course_id: int | None = None) -> None:
+    """
+    Recompute both stats tables from source, for one course or all of them.
+    Does not commit.
+    """
+    student_source = _student_stats_source()
+    assignment_source = _assignment_stats_source()
+    clear_students = delete(CourseStudentStats)
+    clear_assignments = delete(CourseAssignmentStats)
+
+    if course_id is not None:
+        student_source = student_source.where(Enrollment.course_id == course_id)
+        assignment_source = assignment_source.where(Assignment.course_id == course_id)
+        clear_students = clear_students.where(CourseStudentStats.course_id == course_id)
+        clear_assignments = clear_assignments.where(
+            CourseAssignmentStats.course_id == course_id
+        )
+
+    db.execute(clear_students)
+    db.execute(clear_assignments)
+    db.execute(insert(CourseStudentStats).from_select(_STUDENT_COLUMNS, student_source))
+    db.execute(
+        insert(CourseAssignmentStats).from_select(
+            _ASSIGNMENT_COLUMNS, assignment_source
+        )
+    )
+    # the counters may have moved if they had drifted
+    if course_id is None:
+        course_versions.bump_all(db)
+    else:
+        course_versions.bump(db, course_id)
+
+
+def main() -> None:
+    import app.db.base  # noqa: F401  (register every model)
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild grade statistics tables.")
+    parser.add_argument("--course-id", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild(db, args.course_id)
+        db.commit()
+    finally:
+        db.close()
+
+    scope = f"course {args.course_id}" if args.course_id else "all courses"
+    print(f"Rebuilt grade statistics for {scope}.")
+
+
+if __name__ == "__main__":
+    main()
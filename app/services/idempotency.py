@@ -0,0 +1,264 @@
+"""
+Idempotency-Key support for retried writes.
+
+A client that sends `Idempotency-Key: <key>` with a write gets the same
+response back if it retries with the same key, without the write running
+again (a retried submit would otherwise clear a grade made in between).
+
+Each (user, key) is a row in the idempotency_keys table. Before the write
+runs, reserve() claims the key by inserting a row without a response yet; the
+primary key lets only one request win. The winner runs the write and fills
+in the response with complete(), in the same transaction as the write (for
+group-committed submits, the writer's batch transaction), or gives the key up
+with release() if the write fails. A request that finds the key claimed but
+not yet answered waits for the response, and gets 409 if it takes longer than
+IDEMPOTENCY_WAIT_SECONDS. A claim whose request died (and never completed or
+released it) can be taken over after IDEMPOTENCY_CLAIM_TTL.
+
+Recently replayed responses are also kept in an in-process LRU, so repeated
+replays are answered without touching the database. Stored responses never
+change, so the LRU can only be stale about expiry, which it checks itself.
+Claims are never cached.
+
+Expired keys are deleted by app.workers.idempotency_sweeper.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    IDEMPOTENCY_CACHE_SIZE,
+    IDEMPOTENCY_CLAIM_TTL,
+    IDEMPOTENCY_KEY_TTL,
+    IDEMPOTENCY_WAIT_POLL_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS,
+)
+from app.models.idempotency import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+# status_code of a claimed key whose request has not answered yet
+PENDING = 0
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    body: str
+    expires_at: datetime
+
+    @property
+    def pending(self) -> bool:
+        return self.status_code == PENDING
+
+
+class _LRU:
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._items: OrderedDict[tuple[int, str], StoredResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[int, str]) -> StoredResponse | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: tuple[int, str], value: StoredResponse) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self._capacity:
+                self._items.popitem(last=False)
+
+    def discard(self, key: tuple[int, str]) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def prune(self, now: datetime) -> None:
+        with self._lock:
+            for key in [k for k, v in self._items.items() if v.expires_at <= now]:
+                del self._items[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+_cache = _LRU(IDEMPOTENCY_CACHE_SIZE)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; they are stored as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def request_hash(request: Request, body: str) -> str:
+    """Fingerprint of the request a key was first used with."""
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, body):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def check_key(key: str | None) -> str | None:
+    if key is not None and not 0 < len(key) <= MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters",
+        )
+    return key
+
+
+def lookup(db: Session, user_id: int, key: str) -> StoredResponse | None:
+    """
+    The unexpired stored response (or pending claim) for (user, key), if
+    there is one.
+    """
+    now = datetime.now(timezone.utc)
+    stored = _cache.get((user_id, key))
+    if stored is None:
+        row = db.execute(
+            select(
+                IdempotencyKey.request_hash,
+                IdempotencyKey.status_code,
+                IdempotencyKey.response_body,
+                IdempotencyKey.expires_at,
+            ).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).first()
+        if row is None:
+            return None
+        stored = StoredResponse(row[0], row[1], row[2], _as_utc(row[3]))
+        if not stored.pending:
+            _cache.put((user_id, key), stored)
+
+    if stored.expires_at <= now:
+        _cache.discard((user_id, key))
+        return None
+    return stored
+
+
+def _claim(db: Session, user_id: int, key: str, fingerprint: str) -> bool:
+    """
+    Insert a pending row for (user, key), or take over an expired one.
+    Commits; True if this request now owns the key.
+    """
+    now = datetime.now(timezone.utc)
+    values = {
+        "request_hash": fingerprint,
+        "status_code": PENDING,
+        "response_body": "",
+        "created_at": now,
+        "expires_at": now + IDEMPOTENCY_CLAIM_TTL,
+    }
+    result = db.execute(
+        insert(IdempotencyKey)
+        .values(user_id=user_id, key=key, **values)
+        .on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+            set_=values,
+            where=IdempotencyKey.expires_at <= now,
+        )
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def reserve(db: Session, user_id: int, key: str, fingerprint: str) -> Response | None:
+    """
+    Claim (user, key) before running the write it guards. Returns None when
+    the caller now owns the key: it must complete() or release() it. Returns
+    the stored response, as a Response to return from the route, when an
+    earlier request with the key has answered, waiting for it while that
+    request is still running. A key reused with a different request is a
+    client error, not a replay.
+
+    Commits the claim, so it is seen by concurrent requests at once.
+    """
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        stored = lookup(db, user_id, key)
+        if stored is None and _claim(db, user_id, key, fingerprint):
+            return None
+        if stored is not None:
+            if stored.request_hash != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+            if not stored.pending:
+                return Response(
+                    content=stored.body,
+                    status_code=stored.status_code,
+                    media_type="application/json",
+                    headers={REPLAY_HEADER: "true"},
+                )
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        # hand the connection back while the other request finishes
+        db.rollback()
+        time.sleep(IDEMPOTENCY_WAIT_POLL_SECONDS)
+
+
+def complete(db: Session, user_id: int, key: str, status_code: int, body: str) -> None:
+    """
+    Store the response to the request that reserved (user, key), in the
+    write's own transaction. Not cached here: a rolled back write must
+    not leave a replayable response behind, and the first replay reads it
+    through. Does not commit.
+    """
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(
+            status_code=status_code,
+            response_body=body,
+            expires_at=datetime.now(timezone.utc) + IDEMPOTENCY_KEY_TTL,
+        )
+    )
+
+
+def release(db: Session, user_id: int, key: str) -> None:
+    """
+    Give up a reserved (user, key) whose write failed, so a retry runs it
+    again instead of waiting. Call after rolling the write back. Commits.
+    """
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code == PENDING,
+        )
+    )
+    db.commit()
+
+
+def sweep(db: Session) -> int:
+    """
+    Delete expired keys from the table and the LRU; returns rows deleted.
+    Does not commit.
+    """
+    now = datetime.now(timezone.utc)
+    _cache.prune(now)
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+    return result.rowcount
+
+
+def clear_cache() -> None:
+    _cache.clear()
@@ -0,0 +1,150 @@
+"""
+Late-submission policy, evaluated one value at a time or a whole column at once.
+
+Policy (see app.core.config):
+- GRACE_PERIOD_MINUTES: if late_by_minutes <= grace -> not late, no penalty
+- LATE_PENALTY_PER_DAY: percent off per day late (days rounded up)
+- LATE_PENALTY_MAX: cap total deduction (0.50 means max 50% off)
+
+late_columns() uses NumPy when it is installed and falls back to a plain
+Python loop over late_penalty() otherwise; both give identical results.
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Sequence
+
+from app.core.config import GRACE_PERIOD_MINUTES, LATE_PENALTY_MAX, LATE_PENALTY_PER_DAY
+
+try:
+    import numpy as np
+except ImportError:  # optional speedup
+    np = None
+
+_MICROS_PER_MINUTE = 60_000_000
+_MINUTES_PER_DAY = 1440
+
+
+class LateColumns(NamedTuple):
+    is_late: list[bool]
+    late_by_minutes: list[int | None]
+    days_late: list[int]
+    multiplier: list[float]
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite often returns naive datetimes; treat as UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def late_penalty(
+    due_at: datetime | None,
+    submitted_at: datetime | None,
+) -> tuple[bool, int | None, int, float]:
+    """
+    Returns: (is_late, late_by_minutes, days_late, multiplier)
+
+    late_by_minutes is None when there is no due date or no submission,
+    0 when submitted on time, and the whole minutes past due otherwise.
+    """
+    if due_at is None or submitted_at is None:
+        return (False, None, 0, 1.0)
+
+    due = _as_utc(due_at)
+    submitted = _as_utc(submitted_at)
+
+    if submitted <= due:
+        return (False, 0, 0, 1.0)
+
+    late_minutes = int((submitted - due).total_seconds() // 60)
+
+    # grace period
+    if late_minutes <= GRACE_PERIOD_MINUTES:
+        return (False, late_minutes, 0, 1.0)
+
+    # compute days late (ceil, so 1 minute past grace counts as 1 day late)
+    days_late = int(math.ceil(late_minutes / _MINUTES_PER_DAY))
+
+    capped_deduction = min(days_late * LATE_PENALTY_PER_DAY, LATE_PENALTY_MAX)
+    multiplier = max(0.0, 1.0 - capped_deduction)
+    return (True, late_minutes, days_late, multiplier)
+
+
+def _late_columns_python(
+    due_at: Sequence[datetime | None],
+    submitted_at: Sequence[datetime | None],
+) -> LateColumns:
+    results = [late_penalty(d, s) for d, s in zip(due_at, submitted_at)]
+    if not results:
+        return LateColumns([], [], [], [])
+    return LateColumns(*(list(column) for column in zip(*results)))
+
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+_MISSING = -(2**63)
+
+
+def _epoch_micros(values: Sequence[datetime | None]):
+    """
+    int64 microseconds since the epoch (naive values are UTC), with _MISSING
+    standing in for None. Integer arithmetic here is much cheaper than letting
+    NumPy parse datetime objects itself.
+    """
+    return np.fromiter(
+        (
+            (
+                _MISSING
+                if v is None
+                else (v - (_EPOCH if v.tzinfo is None else _EPOCH_UTC))
+                // _ONE_MICROSECOND
+            )
+            for v in values
+        ),
+        dtype=np.int64,
+        count=len(values),
+    )
+
+
+def _late_columns_numpy(
+    due_at: Sequence[datetime | None],
+    submitted_at: Sequence[datetime | None],
+) -> LateColumns:
+    due = _epoch_micros(due_at)
+    submitted = _epoch_micros(submitted_at)
+
+    present = (due != _MISSING) & (submitted != _MISSING)
+    delta = np.where(present, submitted - due, 0)
+
+    minutes = np.where(delta > 0, np.floor_divide(delta, _MICROS_PER_MINUTE), 0)
+    late = present & (minutes > GRACE_PERIOD_MINUTES)
+
+    days = np.where(late, -np.floor_divide(-minutes, _MINUTES_PER_DAY), 0)
+    deduction = np.minimum(days * LATE_PENALTY_PER_DAY, LATE_PENALTY_MAX)
+    multiplier = np.maximum(0.0, 1.0 - deduction)
+
+    late_by_minutes = [
+        m if p else None for m, p in zip(minutes.tolist(), present.tolist())
+    ]
+    return LateColumns(
+        late.tolist(), late_by_minutes, days.tolist(), multiplier.tolist()
+    )
+
+
+def late_columns(
+    due_at: Sequence[datetime | None],
+    submitted_at: Sequence[datetime | None],
+) -> LateColumns:
+    """
+    Evaluate the late policy for parallel sequences of due/submitted
+    timestamps in one pass. Each output column has one entry per input pair,
+    with the same meaning as the corresponding late_penalty() field.
+    """
+    if len(due_at) != len(submitted_at):
+        raise ValueError("due_at and submitted_at must have the same length")
+    if np is None or not due_at:
+        return _late_columns_python(due_at, submitted_at)
+    return _late_columns_numpy(due_at, submitted_at)
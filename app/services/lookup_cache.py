@@ -0,0 +1,240 @@
+"""
+Read-through cache for the point lookups that open most routes.
+
+Before doing any real work, routes check that a course or assignment exists,
+who teaches the course and whether the caller is enrolled in it. This module
+answers those checks from memory. It keeps three LRU caches, each with a TTL
+of LOOKUP_CACHE_TTL_SECONDS and at most LOOKUP_CACHE_SIZE entries:
+
+  - courses: course_id -> CourseInfo
+  - assignments: assignment_id -> AssignmentInfo
+  - members: course_id -> frozenset of enrolled student ids
+
+Cached course and assignment fields never change once written, and there is
+no way to unenroll, so a cached "yes" stays true. A cached "no" may be
+stale, so a student missing from a membership set is checked against the
+database before being turned away. "Not found" is never cached.
+
+Each worker process has its own copy. Writes that change membership call
+on_enrollments_created() before committing, which tells the other processes
+through app.services.cache_events, and members_changed() after committing,
+which updates this one at once. The TTL bounds how long changes made outside
+the app (manual SQL, restored backups) take to show up.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL_SECONDS
+from app.models.assignment import Assignment
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.services import cache_events
+
+
+class CacheStats(NamedTuple):
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class TTLCache:
+    """
+    Thread-safe LRU mapping whose entries also expire `ttl` seconds after
+    they were loaded. Used from the event loop and the threadpool alike; the
+    lock is never held while loading.
+    """
+
+    def __init__(self, capacity: int, ttl: float):
+        self._capacity = capacity
+        self._ttl = ttl
+        self._items: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        # moves on every invalidation, so a load that started before one is
+        # returned to its caller but not stored
+        self._epoch = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def _get(self, key: Hashable) -> tuple[bool, object, int]:
+        """(found, value, epoch to store a fresh load under)."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return True, value, self._epoch
+                del self._items[key]
+            self.misses += 1
+            return False, None, self._epoch
+
+    def _put(self, key: Hashable, value: object, epoch: int) -> None:
+        if value is None:
+            return
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._items[key] = (time.monotonic() + self._ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self._capacity:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, load: Callable[[], object]):
+        found, value, epoch = self._get(key)
+        if not found:
+            value = load()
+            self._put(key, value, epoch)
+        return value
+
+    async def get_or_load_async(
+        self, key: Hashable, load: Callable[[], Awaitable[object]]
+    ):
+        found, value, epoch = self._get(key)
+        if not found:
+            value = await load()
+            self._put(key, value, epoch)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+            self._epoch += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._epoch += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(len(self._items), self.hits, self.misses, self.evictions)
+
+
+class CourseInfo(NamedTuple):
+    id: int
+    instructor_id: int
+
+
+class AssignmentInfo(NamedTuple):
+    id: int
+    course_id: int
+    due_at: datetime | None
+    max_score: float
+
+
+_courses = TTLCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL_SECONDS)
+_assignments = TTLCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL_SECONDS)
+_members = TTLCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL_SECONDS)
+# cache_events name for "course <key>'s roster changed"
+_MEMBERS_EVENT = "lookup_cache.members"
+
+
+def _course_query(course_id: int):
+    return select(Course.id, Course.instructor_id).where(Course.id == course_id)
+
+
+def _assignment_query(assignment_id: int):
+    return select(
+        Assignment.id, Assignment.course_id, Assignment.due_at, Assignment.max_score
+    ).where(Assignment.id == assignment_id)
+
+
+def _members_query(course_id: int):
+    return select(Enrollment.student_id).where(Enrollment.course_id == course_id)
+
+
+def _enrollment_query(course_id: int, student_id: int):
+    return select(Enrollment.id).where(
+        Enrollment.course_id == course_id, Enrollment.student_id == student_id
+    )
+
+
+def course(db: Session, course_id: int) -> CourseInfo | None:
+    def load():
+        row = db.execute(_course_query(course_id)).first()
+        return CourseInfo(*row) if row else None
+
+    return _courses.get_or_load(course_id, load)
+
+
+async def course_async(db: AsyncSession, course_id: int) -> CourseInfo | None:
+    async def load():
+        row = (await db.execute(_course_query(course_id))).first()
+        return CourseInfo(*row) if row else None
+
+    return await _courses.get_or_load_async(course_id, load)
+
+
+def assignment(db: Session, assignment_id: int) -> AssignmentInfo | None:
+    def load():
+        row = db.execute(_assignment_query(assignment_id)).first()
+        return AssignmentInfo(*row) if row else None
+
+    return _assignments.get_or_load(assignment_id, load)
+
+
+def is_member(db: Session, course_id: int, student_id: int) -> bool:
+    """Whether the student is enrolled in the course."""
+
+    def load():
+        return frozenset(db.execute(_members_query(course_id)).scalars())
+
+    if student_id in _members.get_or_load(course_id, load):
+        return True
+    # the set may predate the enrollment (made by another process)
+    if db.execute(_enrollment_query(course_id, student_id)).first() is None:
+        return False
+    _members.invalidate(course_id)
+    return True
+
+
+async def is_member_async(db: AsyncSession, course_id: int, student_id: int) -> bool:
+    async def load():
+        return frozenset((await db.execute(_members_query(course_id))).scalars())
+
+    if student_id in await _members.get_or_load_async(course_id, load):
+        return True
+    enrolled = (await db.execute(_enrollment_query(course_id, student_id))).first()
+    if enrolled is None:
+        return False
+    _members.invalidate(course_id)
+    return True
+
+
+def on_enrollments_created(db: Session, course_id: int) -> None:
+    """Invalidate the course's roster in other processes. Does not commit."""
+    cache_events.publish(db, _MEMBERS_EVENT, course_id)
+
+
+def members_changed(course_id: int) -> None:
+    """Call after committing enrollments in the course."""
+    _members.invalidate(course_id)
+
+
+cache_events.subscribe(
+    _MEMBERS_EVENT, lambda db, course_id: _members.invalidate(course_id)
+)
+
+
+def stats() -> dict[str, CacheStats]:
+    return {
+        "courses": _courses.stats(),
+        "assignments": _assignments.stats(),
+        "members": _members.stats(),
+    }
+
+
+def clear() -> None:
+    _courses.clear()
+    _assignments.clear()
+    _members.clear()
@@ -0,0 +1,145 @@
+"""
+Refresh tokens with rotation.
+
+A refresh token is `<family>.<generation>.<hmac>`: the id of its login session
+(a refresh_token_families row), how many times that session has been
+refreshed, and an HMAC of both under SECRET_KEY. Exchanging one costs an HMAC
+check and a primary-key lookup, not a bcrypt verify. Each exchange rotates
+it: the family's generation moves on and only the new token is valid.
+
+If an already-rotated token is presented, someone holds a copy of the chain,
+so the whole family is revoked and its owner has to log in again. Two
+concurrent exchanges of the same token count as reuse for the same reason.
+"""
+
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import REFRESH_TOKEN_EXPIRE, SECRET_KEY
+from app.models.refresh_token import RefreshTokenFamily
+from app.models.token_version import TokenVersion
+from app.models.user import User
+
+
+class RefreshTokenError(Exception):
+    """The refresh token is malformed, expired, revoked or was reused."""
+
+
+class Rotation(NamedTuple):
+    """Who a refresh token was exchanged for, and their next refresh token."""
+
+    user: User
+    token_version: int
+    refresh_token: str
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; they are stored as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _sign(family_id: str, generation: int) -> str:
+    message = f"{family_id}.{generation}".encode()
+    return hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _encode(family_id: str, generation: int) -> str:
+    return f"{family_id}.{generation}.{_sign(family_id, generation)}"
+
+
+def _decode(token: str) -> tuple[str, int]:
+    try:
+        family_id, generation, signature = token.split(".")
+        generation = int(generation)
+    except ValueError:
+        raise RefreshTokenError("malformed refresh token")
+    if not hmac.compare_digest(signature, _sign(family_id, generation)):
+        raise RefreshTokenError("bad refresh token signature")
+    return family_id, generation
+
+
+def issue(db: Session, user_id: int, token_version: int) -> str:
+    """
+    Start a new family (one per login) and return its first refresh token.
+    The user's expired families are dropped on the way. Does not commit.
+    """
+    now = datetime.now(timezone.utc)
+    db.execute(
+        delete(RefreshTokenFamily).where(
+            RefreshTokenFamily.user_id == user_id,
+            RefreshTokenFamily.expires_at <= now,
+        )
+    )
+    family = RefreshTokenFamily(
+        id=secrets.token_hex(16),
+        user_id=user_id,
+        generation=0,
+        token_version=token_version,
+        expires_at=now + REFRESH_TOKEN_EXPIRE,
+    )
+    db.add(family)
+    db.flush()
+    return _encode(family.id, 0)
+
+
+def rotate(db: Session, token: str) -> Rotation:
+    """
+    Exchange `token` for the next one in its family. Raises
+    RefreshTokenError if it cannot be exchanged; when that is because it was
+    reused, the family has been revoked and the caller should commit before
+    reporting the error. Does not commit.
+    """
+    family_id, generation = _decode(token)
+    now = datetime.now(timezone.utc)
+
+    row = db.execute(
+        select(
+            RefreshTokenFamily.generation,
+            RefreshTokenFamily.token_version,
+            RefreshTokenFamily.expires_at,
+            RefreshTokenFamily.revoked_at,
+            User,
+            TokenVersion.version.label("current_version"),
+        )
+        .join(User, User.id == RefreshTokenFamily.user_id)
+        .outerjoin(TokenVersion, TokenVersion.user_id == User.id)
+        .where(RefreshTokenFamily.id == family_id)
+    ).first()
+    if row is None or row.revoked_at is not None:
+        raise RefreshTokenError("unknown or revoked refresh token")
+    if _as_utc(row.expires_at) <= now:
+        raise RefreshTokenError("refresh token expired")
+    if row.token_version < (row.current_version or 0):
+        raise RefreshTokenError("refresh token revoked")
+
+    # move the family on only if nobody else has since this token was issued
+    moved = db.execute(
+        update(RefreshTokenFamily)
+        .where(
+            RefreshTokenFamily.id == family_id,
+            RefreshTokenFamily.generation == generation,
+        )
+        .values(generation=generation + 1, expires_at=now + REFRESH_TOKEN_EXPIRE)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not moved:
+        revoke(db, family_id)
+        raise RefreshTokenError("refresh token reused")
+
+    return Rotation(row.User, row.token_version, _encode(family_id, generation + 1))
+
+
+def revoke(db: Session, family_id: str) -> None:
+    """End a login session: none of its refresh tokens work any more."""
+    db.execute(
+        update(RefreshTokenFamily)
+        .where(RefreshTokenFamily.id == family_id)
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
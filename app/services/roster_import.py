@@ -0,0 +1,255 @@
+"""
+Bulk roster import: enroll many students in one course from a streamed upload.
+
+The upload is either CSV with an `email` column (any other columns are
+ignored) or JSON lines with an "email" key. Rows are read incrementally and
+handled in chunks: one IN query resolves a chunk's emails to users, and one
+INSERT ... ON CONFLICT DO NOTHING adds the new (student, course) pairs, with
+uq_enrollments_student_course skipping the ones that already exist. The
+caller commits after each chunk, so a failure part-way through an upload
+leaves the earlier chunks enrolled.
+
+Lines longer than MAX_LINE_BYTES are rejected as rows rather than buffered.
+A quoted CSV field may contain newlines (csv.reader decides where a record
+ends); its record is reported under the line it starts on. Malformed CSV
+records are rejected as rows.
+"""
+
+import csv
+import json
+from typing import AsyncIterator, Iterator, Literal, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.services import grade_stats
+
+RosterFormat = Literal["csv", "ndjson"]
+
+# longest line (or multi-line CSV record) kept in memory, in bytes
+MAX_LINE_BYTES = 4096
+_LINE_TOO_LONG = f"line longer than {MAX_LINE_BYTES} bytes"
+
+
+class RosterFormatError(ValueError):
+    """The upload as a whole cannot be read (e.g. CSV without an email column)."""
+
+
+class RosterRow(NamedTuple):
+    line: int
+    email: str | None
+    error: str | None = None
+
+
+class ChunkResult(NamedTuple):
+    enrolled: int
+    already_enrolled: int
+    rejected: list[RosterRow]
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="replace").rstrip("\r")
+
+
+async def _iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, str | None]]:
+    """
+    Split a byte stream into numbered text lines without buffering it all.
+    A line over MAX_LINE_BYTES is skipped and yielded as None.
+    """
+    tail: list[bytes] = []  # the current line's bytes from earlier chunks
+    size = 0
+    too_long = False
+    line_no = 0
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            line_no += 1
+            if too_long or size + end - start > MAX_LINE_BYTES:
+                yield line_no, None
+            else:
+                yield line_no, _decode(b"".join(tail) + chunk[start:end])
+            tail, size, too_long = [], 0, False
+            start = end + 1
+        if too_long or start == len(chunk):
+            continue
+        size += len(chunk) - start
+        if size > MAX_LINE_BYTES:
+            tail, too_long = [], True
+        else:
+            tail.append(chunk[start:])
+    if too_long:
+        yield line_no + 1, None
+    elif tail:
+        yield line_no + 1, _decode(b"".join(tail))
+
+
+class _NeedMore(Exception):
+    """csv.reader ran out of lines inside a quoted field."""
+
+
+def _record_source(lines: list[tuple[int, str]]) -> Iterator[str]:
+    for _, text in lines:
+        yield text + "\n"
+    raise _NeedMore
+
+
+class _CsvRecords:
+    """
+    Reassemble CSV records from numbered lines. csv.reader decides where a
+    record ends, so a quoted field may span lines. A record that is still open
+    after MAX_LINE_BYTES (or at the end of the upload) is rejected at its
+    first line, and the lines after that are read again as new records.
+    Yields (line, fields, error) with exactly one of fields/error set.
+    """
+
+    def __init__(self):
+        self._lines: list[tuple[int, str]] = []
+
+    def feed(self, line_no: int, text: str) -> Iterator[tuple]:
+        self._lines.append((line_no, text))
+        yield from self._drain(final=False)
+
+    def finish(self) -> Iterator[tuple]:
+        yield from self._drain(final=True)
+
+    def _drain(self, final: bool) -> Iterator[tuple]:
+        while self._lines:
+            line_no = self._lines[0][0]
+            reader = csv.reader(_record_source(self._lines), strict=True)
+            fields = error = None
+            try:
+                fields = next(reader)
+                consumed = reader.line_num
+            except _NeedMore:
+                size = sum(len(text) + 1 for _, text in self._lines)
+                if not final and size <= MAX_LINE_BYTES:
+                    return
+                error, consumed = "unterminated quoted field", 1
+            except csv.Error as e:
+                error, consumed = f"malformed CSV: {e}", reader.line_num
+            del self._lines[:consumed]
+            yield line_no, fields, error
+
+
+def _rejected(line: int, error: str, in_header: bool) -> RosterRow:
+    if in_header:
+        raise RosterFormatError(f"CSV header: {error}")
+    return RosterRow(line, None, error)
+
+
+async def _ndjson_rows(lines: AsyncIterator[tuple]) -> AsyncIterator[RosterRow]:
+    async for line_no, text in lines:
+        if text is None:
+            yield RosterRow(line_no, None, _LINE_TOO_LONG)
+            continue
+        if not text.strip():
+            continue
+        try:
+            obj = json.loads(text)
+        except ValueError:
+            yield RosterRow(line_no, None, "invalid JSON")
+            continue
+        yield _email_row(line_no, obj.get("email") if isinstance(obj, dict) else None)
+
+
+async def _csv_rows(lines: AsyncIterator[tuple]) -> AsyncIterator[RosterRow]:
+    email_column = None
+    records = _CsvRecords()
+
+    def rows(parsed: Iterator[tuple]) -> Iterator[RosterRow]:
+        nonlocal email_column
+        for line_no, fields, error in parsed:
+            if error is not None:
+                yield _rejected(line_no, error, email_column is None)
+            elif not fields:
+                continue  # blank line
+            elif email_column is None:
+                header = [f.strip().lower() for f in fields]
+                if "email" not in header:
+                    raise RosterFormatError("CSV header must include an 'email' column")
+                email_column = header.index("email")
+            else:
+                email = fields[email_column] if email_column < len(fields) else None
+                yield _email_row(line_no, email)
+
+    async for line_no, text in lines:
+        if text is None:
+            # whatever record was open cannot continue past a dropped line
+            for row in rows(records.finish()):
+                yield row
+            yield _rejected(line_no, _LINE_TOO_LONG, email_column is None)
+            continue
+        if line_no == 1:
+            text = text.lstrip("\ufeff")
+        for row in rows(records.feed(line_no, text)):
+            yield row
+    for row in rows(records.finish()):
+        yield row
+
+
+def _email_row(line_no: int, email) -> RosterRow:
+    if not isinstance(email, str) or not email.strip():
+        return RosterRow(line_no, None, "missing email")
+    return RosterRow(line_no, email.strip())
+
+
+def iter_roster_rows(
+    chunks: AsyncIterator[bytes], fmt: RosterFormat
+) -> AsyncIterator[RosterRow]:
+    """
+    Yield one RosterRow per non-blank data row. Rows that cannot be parsed
+    come back with `error` set instead of raising, so one bad row does not
+    abort the import.
+    """
+    lines = _iter_lines(chunks)
+    return _ndjson_rows(lines) if fmt == "ndjson" else _csv_rows(lines)
+
+
+def enroll_chunk(db: Session, course_id: int, rows: list[RosterRow]) -> ChunkResult:
+    """
+    Enroll the students named in `rows` in one course. Unparseable rows,
+    unknown emails and non-student accounts are returned as rejected; a
+    student listed twice, or already enrolled, counts as already_enrolled.
+    Does not commit.
+    """
+    rejected = [r for r in rows if r.error]
+    wanted = [r for r in rows if not r.error]
+
+    users = {
+        u.email: u
+        for u in db.execute(
+            select(User.id, User.email, User.role).where(
+                User.email.in_({r.email for r in wanted})
+            )
+        )
+    }
+
+    student_ids = []
+    for r in wanted:
+        user = users.get(r.email)
+        if user is None:
+            rejected.append(r._replace(error="unknown email"))
+        elif user.role != "student":
+            rejected.append(r._replace(error="not a student account"))
+        else:
+            student_ids.append(user.id)
+
+    unique_ids = list(dict.fromkeys(student_ids))
+    inserted = []
+    if unique_ids:
+        stmt = (
+            insert(Enrollment)
+            .values([{"course_id": course_id, "student_id": sid} for sid in unique_ids])
+            .on_conflict_do_nothing(index_elements=["student_id", "course_id"])
+            .returning(Enrollment.student_id)
+        )
+        inserted = db.execute(stmt).scalars().all()
+        grade_stats.on_enrollments_created(db, course_id, inserted)
+
+    rejected.sort(key=lambda r: r.line)
+    return ChunkResult(len(inserted), len(student_ids) - len(inserted), rejected)
@@ -0,0 +1,101 @@
+"""
+Single-flight coalescing for identical expensive reads.
+
+When an assignment closes, many requests ask for the same course's gradebook
+at once. Each one passes its own access check and reads the course version
+(see app.services.course_versions). Then, instead of every request running the
+same heavy join, the first to arrive computes the result and the rest wait
+for it and share it.
+
+The key is (endpoint, course id, course version, query parameters). A
+request that saw a newer version gets a computation of its own, so nobody is
+handed data older than what they could see. The result is shared only while
+it is being computed; nothing is kept afterwards. Results are shared between
+threads, so callers must treat them as read-only.
+
+Coalescing works within one process, across the threadpool that runs sync
+routes. What is shared is the query and its result: a waiting request still
+holds its thread and its own request session, including the connection it
+used for the access check, until it returns. Counters per endpoint are
+exported on /metrics. The coalescing ratio is
+single_flight_coalesced_total / single_flight_calls_total.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Callable, Hashable, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+class FlightStats(NamedTuple):
+    calls: int
+    coalesced: int  # answered with another request's result
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[tuple[str, Hashable], _Call] = {}
+        # endpoint -> [calls, coalesced]
+        self._counts: defaultdict[str, list[int]] = defaultdict(lambda: [0, 0])
+
+    def do(self, endpoint: str, key: Hashable, compute: Callable[[], T]) -> T:
+        """
+        compute(), unless an identical call is already running: then its
+        result (or exception) instead.
+        """
+        flight = (endpoint, key)
+        with self._lock:
+            counts = self._counts[endpoint]
+            counts[0] += 1
+            call = self._calls.get(flight)
+            leader = call is None
+            if leader:
+                call = self._calls[flight] = _Call()
+            else:
+                counts[1] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict[str, FlightStats]:
+        with self._lock:
+            return {
+                endpoint: FlightStats(*counts)
+                for endpoint, counts in self._counts.items()
+            }
+
+
+_flights = SingleFlight()
+
+
+def do(endpoint: str, key: Hashable, compute: Callable[[], T]) -> T:
+    return _flights.do(endpoint, key, compute)
+
+
+def stats() -> dict[str, FlightStats]:
+    return _flights.stats()
@@ -0,0 +1,44 @@
+"""
+Submission writes shared by the request path and the group-commit writer.
+"""
+
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models.submission import Submission
+
+
+def upsert_submission(
+    db: Session,
+    assignment_id: int,
+    student_id: int,
+    content: str | None,
+    submitted_at: datetime,
+) -> dict:
+    """
+    Create the student's submission, or resubmit over the existing one, in a
+    single INSERT ... ON CONFLICT DO UPDATE. Resubmitting clears previous
+    grading (policy choice). Two concurrent submits from the same student
+    cannot collide on the unique constraint: the later one simply wins.
+
+    Returns the stored row as a dict. Does not commit.
+    """
+    stmt = insert(Submission).values(
+        assignment_id=assignment_id,
+        student_id=student_id,
+        content=content,
+        submitted_at=submitted_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Submission.assignment_id, Submission.student_id],
+        set_={
+            "content": stmt.excluded.content,
+            "submitted_at": stmt.excluded.submitted_at,
+            "score": None,
+            "feedback": None,
+            "graded_at": None,
+        },
+    ).returning(*Submission.__table__.c)
+    return dict(db.execute(stmt).one()._mapping)
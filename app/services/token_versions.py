@@ -0,0 +1,93 @@
+"""
+Access token revocation by version.
+
+Access tokens are checked without touching the database: the claims are
+trusted once the signature and expiry are. To still be able to take tokens
+back (POST /auth/logout-all), each token carries the user's token version at
+mint time, and a token older than the user's current version is rejected.
+Current versions live in the small token_versions table (only users whose
+tokens were ever revoked have a row) and in an in-process copy of it,
+refreshed every TOKEN_VERSION_REFRESH_SECONDS by
+app.workers.token_version_refresher. A revocation applies at once in the
+process that made it, and in the others once app.services.cache_events
+delivers it (or the next full refresh does, whichever comes first).
+"""
+
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models.token_version import TokenVersion
+from app.services import cache_events
+
+# user_id -> current version. Versions only go up: every update keeps the
+# higher of the cached and the new value, so a refresh that read the table
+# before a local revoke committed cannot roll that revoke back.
+_versions: dict[int, int] = {}
+_lock = threading.Lock()
+# cache_events name for "user <key> was revoked"
+_REVOKED_EVENT = "token_versions"
+
+
+def is_current(user_id: int, version: int) -> bool:
+    """Whether a token minted at `version` is still valid for the user."""
+    return version >= _versions.get(user_id, 0)
+
+
+def version_for(db: Session, user_id: int) -> int:
+    """The version to mint a new token with (read from the table, not the copy)."""
+    version = db.execute(
+        select(TokenVersion.version).where(TokenVersion.user_id == user_id)
+    ).scalar()
+    return version or 0
+
+
+def revoke(db: Session, user_id: int) -> int:
+    """
+    Invalidate every token issued to the user so far; returns the new
+    version. Does not commit.
+    """
+    version = db.execute(
+        insert(TokenVersion)
+        .values(user_id=user_id, version=1, updated_at=datetime.now(timezone.utc))
+        .on_conflict_do_update(
+            index_elements=[TokenVersion.user_id],
+            set_={
+                "version": TokenVersion.version + 1,
+                "updated_at": datetime.now(timezone.utc),
+            },
+        )
+        .returning(TokenVersion.version)
+    ).scalar_one()
+    _raise_to(user_id, version)
+    cache_events.publish(db, _REVOKED_EVENT, user_id)
+    return version
+
+
+def _raise_to(user_id: int, version: int) -> None:
+    with _lock:
+        if version > _versions.get(user_id, 0):
+            _versions[user_id] = version
+
+
+def _reload(db: Session, user_id: int) -> None:
+    _raise_to(user_id, version_for(db, user_id))
+
+
+def refresh(db: Session) -> int:
+    """Merge the table into the in-process copy; returns the number of rows."""
+    rows = db.execute(select(TokenVersion.user_id, TokenVersion.version)).all()
+    for user_id, version in rows:
+        _raise_to(user_id, version)
+    return len(rows)
+
+
+def clear() -> None:
+    with _lock:
+        _versions.clear()
+
+
+cache_events.subscribe(_REVOKED_EVENT, _reload)
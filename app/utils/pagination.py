@@ -0,0 +1,26 @@
+import base64
+import json
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encode keyset values (the sort key of the last row on a page) into an
+    opaque, URL-safe cursor string.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Inverse of encode_cursor. Raises ValueError on anything malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
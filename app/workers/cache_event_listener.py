@@ -0,0 +1,104 @@
+"""
+Background consumer of the cache_events table (see app.services.cache_events):
+applies other processes' invalidations every CACHE_EVENT_POLL_SECONDS and
+deletes expired events every CACHE_EVENT_PRUNE_INTERVAL_SECONDS.
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import (
+    CACHE_EVENT_POLL_SECONDS,
+    CACHE_EVENT_PRUNE_INTERVAL_SECONDS,
+)
+from app.services import cache_events
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEventListener:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        *,
+        poll_seconds: float = CACHE_EVENT_POLL_SECONDS,
+        prune_interval_seconds: float = CACHE_EVENT_PRUNE_INTERVAL_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self._poll_seconds = poll_seconds
+        self._prune_interval = prune_interval_seconds
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Skip the events written before this process started, then listen."""
+        db = self._session_factory()
+        try:
+            cache_events.skip_to_latest(db)
+        finally:
+            db.close()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-event-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def poll_once(self) -> int:
+        db = self._session_factory()
+        try:
+            return cache_events.poll(db)
+        finally:
+            db.close()
+
+    def prune_once(self) -> int:
+        db = self._session_factory()
+        try:
+            deleted = cache_events.prune(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return deleted
+
+    def _run(self) -> None:
+        next_prune = time.monotonic() + self._prune_interval
+        while not self._stopped.wait(self._poll_seconds):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("cache event poll failed")
+            if time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + self._prune_interval
+                try:
+                    self.prune_once()
+                except Exception:
+                    logger.exception("cache event prune failed")
+
+
+_listener: CacheEventListener | None = None
+
+
+def start_cache_event_listener(session_factory: sessionmaker) -> None:
+    global _listener
+    if _listener is None:
+        _listener = CacheEventListener(session_factory)
+        _listener.start()
+
+
+def stop_cache_event_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,82 @@
+"""
+Background deletion of expired Idempotency-Key responses.
+
+Expired keys are already ignored on lookup; sweeping only keeps the
+idempotency_keys table (and the in-process LRU) from growing without bound.
+"""
+
+import logging
+import threading
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import IDEMPOTENCY_SWEEP_INTERVAL_SECONDS
+from app.services import idempotency
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencySweeper:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        *,
+        interval_seconds: float = IDEMPOTENCY_SWEEP_INTERVAL_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self._interval = interval_seconds
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="idempotency-sweeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def sweep_once(self) -> int:
+        db = self._session_factory()
+        try:
+            deleted = idempotency.sweep(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return deleted
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            try:
+                deleted = self.sweep_once()
+            except Exception:
+                logger.exception("idempotency key sweep failed")
+            else:
+                if deleted:
+                    logger.info("swept %d expired idempotency keys", deleted)
+
+
+_sweeper: IdempotencySweeper | None = None
+
+
+def start_idempotency_sweeper(session_factory: sessionmaker) -> None:
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = IdempotencySweeper(session_factory)
+        _sweeper.start()
+
+
+def stop_idempotency_sweeper() -> None:
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.stop()
+        _sweeper = None
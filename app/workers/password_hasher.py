@@ -0,0 +1,139 @@
+"""
+bcrypt off the request path.
+
+A bcrypt hash or check costs a few hundred milliseconds of CPU. Run inline,
+a burst of logins ties up the shared request threadpool and the CPU, and
+every other endpoint slows down with it. PasswordHasher sends that work to a
+small pool of PASSWORD_HASH_WORKERS processes running at a lower priority
+(PASSWORD_HASH_NICE), so request handling wins the CPU when both want it.
+
+Admission is bounded. Once PASSWORD_HASH_MAX_PENDING calls are queued or
+running, further ones fail fast with PasswordHasherBusy (the auth routes
+answer 503 with Retry-After) rather than queueing behind minutes of work.
+stats() reports the queue depth and counters.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, NamedTuple
+
+from app.core.config import (
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_NICE,
+    PASSWORD_HASH_WORKERS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hash/verify calls already pending; retry later."""
+
+
+class HasherStats(NamedTuple):
+    workers: int
+    pending: int  # queued or running
+    max_pending: int
+    completed: int
+    rejected: int
+
+
+def _lower_priority(increment: int) -> None:
+    os.nice(increment)
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        *,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        nice: int = PASSWORD_HASH_NICE,
+    ):
+        self._workers = workers
+        self._max_pending = max_pending
+        self._nice = nice
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def start(self) -> None:
+        # spawn, not fork: the server process has threads (and open sockets)
+        self._executor = ProcessPoolExecutor(
+            self._workers,
+            mp_context=get_context("spawn"),
+            initializer=_lower_priority,
+            initargs=(self._nice,),
+        )
+
+    def stop(self) -> None:
+        if self._executor is None:
+            return
+        self._executor.shutdown(cancel_futures=True)
+        self._executor = None
+
+    async def run(self, fn: Callable, *args):
+        """
+        Await `fn(*args)` (a picklable top-level function, e.g.
+        app.core.security.verify_password) in the pool. Raises
+        PasswordHasherBusy when the pool is already full.
+        """
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        if self._executor is None:
+            raise RuntimeError("PasswordHasher is not running")
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self._rejected += 1
+                raise PasswordHasherBusy
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def stats(self) -> HasherStats:
+        with self._lock:
+            return HasherStats(
+                self._workers,
+                self._pending,
+                self._max_pending,
+                self._completed,
+                self._rejected,
+            )
+
+
+_hasher: PasswordHasher | None = None
+
+
+def start_password_hasher() -> None:
+    """Start the process-wide pool unless PASSWORD_HASH_WORKERS is 0."""
+    global _hasher
+    if PASSWORD_HASH_WORKERS and _hasher is None:
+        _hasher = PasswordHasher()
+        _hasher.start()
+
+
+def stop_password_hasher() -> None:
+    global _hasher
+    if _hasher is not None:
+        _hasher.stop()
+        _hasher = None
+
+
+def get_password_hasher() -> PasswordHasher | None:
+    """Dependency: the running pool, or None to hash in the threadpool."""
+    return _hasher
@@ -0,0 +1,230 @@
+"""
+Group commit for submissions during deadline surges (opt-in).
+
+With SUBMISSION_GROUP_COMMIT enabled, submit_assignment still validates the
+request and stamps `submitted_at` itself, at receipt, so lateness is judged on
+arrival time rather than on when the row reaches disk. It then hands the write
+to a SubmissionWriter instead of committing its own transaction. The writer's
+thread collects whatever arrives within SUBMISSION_GROUP_COMMIT_WINDOW_MS (up
+to SUBMISSION_GROUP_COMMIT_MAX_BATCH submissions) and writes the batch in one
+transaction, so a burst pays for one write lock and one fsync rather than one
+per student. Each request is answered only after its batch has committed.
+A submission sent with an Idempotency-Key has its response stored in the same
+batch transaction, so the write and its replayable response commit together.
+
+If a batch fails, its submissions are retried one transaction each, so a bad
+row fails only its own request. A request cancelled while it waits (client
+disconnect, timeout) is simply not answered; its row stays committed.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import (
+    SUBMISSION_GROUP_COMMIT,
+    SUBMISSION_GROUP_COMMIT_MAX_BATCH,
+    SUBMISSION_GROUP_COMMIT_WINDOW_MS,
+)
+from app.services import grade_stats, idempotency
+from app.services.submissions import upsert_submission
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _Pending(NamedTuple):
+    course_id: int
+    assignment_id: int
+    student_id: int
+    content: str | None
+    submitted_at: datetime
+    idempotency_key: tuple[int, str] | None
+    response_body: Callable[[dict], str] | None
+    future: Future
+
+
+class SubmissionWriter:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        *,
+        window_ms: float = SUBMISSION_GROUP_COMMIT_WINDOW_MS,
+        max_batch: int = SUBMISSION_GROUP_COMMIT_MAX_BATCH,
+    ):
+        self._session_factory = session_factory
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self.batches = 0  # transactions committed, for tests and benchmarks
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="submission-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write everything already queued, then stop the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def submit(
+        self,
+        course_id: int,
+        assignment_id: int,
+        student_id: int,
+        content: str | None,
+        submitted_at: datetime,
+        idempotency_key: tuple[int, str] | None = None,
+        response_body: Callable[[dict], str] | None = None,
+    ) -> Future:
+        """
+        Queue one submission. The future resolves to the stored row (as from
+        upsert_submission) once its batch has committed.
+
+        With `idempotency_key` as (user_id, key), the reserved key is completed
+        with `response_body(row)` as its 201 response in the batch transaction.
+        """
+        if idempotency_key is not None and response_body is None:
+            raise ValueError("idempotency_key needs a response_body")
+        if self._thread is None:
+            raise RuntimeError("SubmissionWriter is not running")
+        future: Future = Future()
+        self._queue.put(
+            _Pending(
+                course_id,
+                assignment_id,
+                student_id,
+                content,
+                submitted_at,
+                idempotency_key,
+                response_body,
+                future,
+            )
+        )
+        return future
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                rows = self._write(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    _resolve(batch[0].future, error=e)
+                    continue
+                logger.exception("group commit of %d submissions failed", len(batch))
+                for pending in batch:
+                    self._write_one(pending)
+            else:
+                for pending, row in zip(batch, rows):
+                    _resolve(pending.future, row)
+
+    def _write_one(self, pending: _Pending) -> None:
+        """Retry one submission from a failed batch in its own transaction."""
+        try:
+            [row] = self._write([pending])
+        except Exception as e:
+            _resolve(pending.future, error=e)
+        else:
+            _resolve(pending.future, row)
+
+    def _write(self, batch: list[_Pending]) -> list[dict]:
+        """
+        Write `batch` in one transaction and return its rows. Futures are left
+        to the caller, so a committed batch is never retried because a waiter
+        went away.
+        """
+        db: Session = self._session_factory()
+        try:
+            rows = [
+                upsert_submission(
+                    db, p.assignment_id, p.student_id, p.content, p.submitted_at
+                )
+                for p in batch
+            ]
+            for p, row in zip(batch, rows):
+                if p.idempotency_key is not None:
+                    user_id, key = p.idempotency_key
+                    idempotency.complete(db, user_id, key, 201, p.response_body(row))
+            touched = defaultdict(set)
+            for p in batch:
+                touched[(p.course_id, p.assignment_id)].add(p.student_id)
+            for (course_id, assignment_id), students in touched.items():
+                grade_stats.on_submissions_changed(
+                    db, course_id, assignment_id, sorted(students)
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.batches += 1
+        return rows
+
+
+def _resolve(
+    future: Future, result: dict | None = None, error: Exception | None = None
+) -> None:
+    """Answer a waiter, unless it was cancelled (e.g. the client went away)."""
+    if not future.set_running_or_notify_cancel():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+_writer: SubmissionWriter | None = None
+
+
+def start_submission_writer(session_factory: sessionmaker) -> None:
+    """Start the process-wide writer if SUBMISSION_GROUP_COMMIT is enabled."""
+    global _writer
+    if SUBMISSION_GROUP_COMMIT and _writer is None:
+        _writer = SubmissionWriter(session_factory)
+        _writer.start()
+
+
+def stop_submission_writer() -> None:
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+def get_submission_writer() -> SubmissionWriter | None:
+    """Dependency: the running writer, or None when submits commit inline."""
+    return _writer
@@ -0,0 +1,75 @@
+"""
+Background refresh of the in-process token version copy (see
+app.services.token_versions), so tokens revoked by another process are
+rejected here too, at most TOKEN_VERSION_REFRESH_SECONDS later.
+"""
+
+import logging
+import threading
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import TOKEN_VERSION_REFRESH_SECONDS
+from app.services import token_versions
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVersionRefresher:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        *,
+        interval_seconds: float = TOKEN_VERSION_REFRESH_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self._interval = interval_seconds
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Load the table once before returning, then keep it fresh."""
+        self.refresh_once()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="token-version-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def refresh_once(self) -> int:
+        db = self._session_factory()
+        try:
+            return token_versions.refresh(db)
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            try:
+                self.refresh_once()
+            except Exception:
+                logger.exception("token version refresh failed")
+
+
+_refresher: TokenVersionRefresher | None = None
+
+
+def start_token_version_refresher(session_factory: sessionmaker) -> None:
+    global _refresher
+    if _refresher is None:
+        _refresher = TokenVersionRefresher(session_factory)
+        _refresher.start()
+
+
+def stop_token_version_refresher() -> None:
+    global _refresher
+    if _refresher is not None:
+        _refresher.stop()
+        _refresher = None
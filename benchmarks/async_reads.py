@@ -0,0 +1,203 @@
+"""
+Requests/sec and latency for the hot read routes (/auth/me, /courses/me,
+/courses/{id}/assignments, /courses/{id}/gradebook/me) at 50 and 500
+concurrent clients: the async (AsyncSession) routes against sync `def` copies of them,
+mounted under /sync, that wait on SQLite in Starlette's threadpool.
+
+    python -m benchmarks.async_reads
+"""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.current_user import get_current_user
+from app.core.deps import get_read_db
+from app.main import app
+from app.models.assignment import Assignment
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.submission import Submission
+from app.models.user import User
+from app.routers.courses import (
+    _assignment_order_by,
+    _gradebook_columns,
+    _gradebook_record,
+)
+from app.schemas.assignment import AssignmentRead
+from app.schemas.course import CourseRead
+from app.schemas.gradebook import GradebookRow
+from app.schemas.user import UserRead
+from benchmarks.common import auth_header, live_server, seed_courses, temp_database
+
+CONCURRENCY = (50, 500)
+DURATION_SECONDS = 10
+STUDENTS = 500
+ASSIGNMENTS = 10
+
+PATHS = (
+    "/auth/me",
+    "/courses/me",
+    "/courses/1/assignments",
+    "/courses/1/gradebook/me",
+)
+
+sync_routes = APIRouter(prefix="/sync")
+
+
+def _enrolled(db: Session, course_id: int, user: User) -> None:
+    enrolled = (
+        db.query(Enrollment.id)
+        .filter(Enrollment.course_id == course_id, Enrollment.student_id == user.id)
+        .first()
+    )
+    if enrolled is None:
+        raise HTTPException(status_code=403, detail="Not enrolled in this course")
+
+
+@sync_routes.get("/auth/me", response_model=UserRead)
+def sync_me(current_user: User = Depends(get_current_user)):
+    return current_user
+
+
+@sync_routes.get("/courses/me", response_model=list[CourseRead])
+def sync_my_courses(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return db.scalars(
+        select(Course)
+        .join(Enrollment, Enrollment.course_id == Course.id)
+        .where(Enrollment.student_id == current_user.id)
+    ).all()
+
+
+@sync_routes.get(
+    "/courses/{course_id}/assignments", response_model=list[AssignmentRead]
+)
+def sync_list_assignments(
+    course_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    _enrolled(db, course_id, current_user)
+    return db.scalars(select(Assignment).where(Assignment.course_id == course_id)).all()
+
+
+@sync_routes.get("/courses/{course_id}/gradebook/me", response_model=list[GradebookRow])
+def sync_my_course_gradebook(
+    course_id: int,
+    db: Session = Depends(get_read_db),
+    me: User = Depends(get_current_user),
+):
+    _enrolled(db, course_id, me)
+    rows = db.execute(
+        select(*_gradebook_columns(literal(me.id), literal(me.email)))
+        .select_from(Assignment)
+        .outerjoin(
+            Submission,
+            and_(
+                Submission.assignment_id == Assignment.id,
+                Submission.student_id == me.id,
+            ),
+        )
+        .where(Assignment.course_id == course_id)
+        .order_by(*_assignment_order_by())
+    )
+    return [_gradebook_record(r) for r in rows]
+
+
+app.include_router(sync_routes)
+
+
+async def run_load(base: str, prefix: str, headers: list[dict]) -> dict:
+    """Every header set is one client looping over PATHS for the duration."""
+    latencies: list[float] = []
+    errors = 0
+    stop = time.monotonic() + DURATION_SECONDS
+
+    async def client_loop(client: httpx.AsyncClient, n: int) -> None:
+        nonlocal errors
+        i = n
+        while time.monotonic() < stop:
+            path = prefix + PATHS[i % len(PATHS)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                r = await client.get(path, headers=headers[n])
+            except httpx.TransportError:
+                errors += 1
+                continue
+            if r.status_code != 200:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(
+        max_connections=len(headers), max_keepalive_connections=len(headers)
+    )
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, n) for n in range(len(headers))))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] if latencies else float("nan"),
+        "p99_ms": (
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            if latencies
+            else float("nan")
+        ),
+        "errors": errors,
+    }
+
+
+def load_process(base: str, prefix: str, headers: list[dict]) -> dict:
+    # the clients get their own process (and GIL), away from the server's
+    return asyncio.run(run_load(base, prefix, headers))
+
+
+def main() -> None:
+    clients = max(CONCURRENCY)
+    # a sync request holds its pooled connection while it queues for a
+    # threadpool worker, so the sync routes need a connection per client or
+    # they starve the pool; the async engine keeps its default (small) pool
+    with temp_database(pool_size=clients) as (_engine, SessionLocal):
+        _, first_student = seed_courses(
+            SessionLocal, courses=1, students=STUDENTS, assignments=ASSIGNMENTS
+        )
+        headers = [
+            auth_header(SessionLocal, first_student + n % STUDENTS)
+            for n in range(clients)
+        ]
+
+        print(f"{DURATION_SECONDS}s per run")
+        print(
+            f"{'clients':>7} {'variant':<8} {'req/s':>8} {'p50 ms':>8} "
+            f"{'p99 ms':>8} {'errors':>7}"
+        )
+        with (
+            live_server(SessionLocal) as base,
+            ProcessPoolExecutor(1, mp_context=get_context("spawn")) as load,
+        ):
+            for n in CONCURRENCY:
+                for variant, prefix in (("sync", "/sync"), ("async", "")):
+                    stats = load.submit(load_process, base, prefix, headers[:n])
+                    stats = stats.result()
+                    print(
+                        f"{n:>7} {variant:<8} {stats['rps']:>8.0f} "
+                        f"{stats['p50_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+                        f"{stats['errors']:>7}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
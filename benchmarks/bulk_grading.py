@@ -0,0 +1,69 @@
+"""
+Grading a 600-student assignment one PATCH per submission against a single
+PATCH /assignments/{id}/grades batch: wall time and query count.
+
+    python -m benchmarks.bulk_grading
+"""
+
+import time
+
+from app.models.submission import Submission
+from benchmarks.common import (
+    auth_header,
+    bench_client,
+    count_queries,
+    seed_courses,
+    temp_database,
+)
+
+STUDENTS = 600
+
+
+def main() -> None:
+    print(f"{'mode':<10} {'requests':>9} {'queries':>8} {'seconds':>8}")
+    for mode in ("single", "bulk"):
+        with temp_database() as (engine, SessionLocal):
+            instructor_id, _ = seed_courses(
+                SessionLocal,
+                courses=1,
+                students=STUDENTS,
+                assignments=1,
+                submitted_ratio=1.0,
+            )
+            db = SessionLocal()
+            ids = [sid for (sid,) in db.query(Submission.id).order_by(Submission.id)]
+            db.close()
+            headers = auth_header(SessionLocal, instructor_id)
+
+            with (
+                bench_client(SessionLocal) as client,
+                count_queries(engine) as statements,
+            ):
+                start = time.perf_counter()
+                if mode == "single":
+                    for sid in ids:
+                        r = client.patch(
+                            f"/submissions/{sid}/grade",
+                            headers=headers,
+                            json={"score": 80},
+                        )
+                        assert r.status_code == 200, r.text
+                    requests = len(ids)
+                else:
+                    r = client.patch(
+                        "/assignments/1/grades",
+                        headers=headers,
+                        json={
+                            "grades": [{"submission_id": i, "score": 80} for i in ids]
+                        },
+                    )
+                    assert r.status_code == 200, r.text
+                    assert r.json()["graded"] == len(ids)
+                    requests = 1
+                elapsed = time.perf_counter() - start
+
+        print(f"{mode:<10} {requests:>9} {len(statements):>8} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Shared helpers for the scripts in this package.
+
+Each benchmark builds its own throwaway SQLite database, points the app's
+get_db dependency at it and drives the real routes through TestClient, so the
+numbers include routing, validation and serialization, not just SQL.
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.deps import get_async_read_db, get_db, get_read_db
+from app.core.security import create_user_access_token
+from app.db.base import Base
+from app.db.query_stats import instrument_engine
+from app.db.session import create_async_sqlite_engine
+from app.main import app
+from app.models.assignment import Assignment
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.submission import Submission
+from app.models.user import User
+from app.services import grade_stats
+
+# keep per-request INFO logging out of the measurements
+logging.disable(logging.INFO)
+
+# bcrypt is irrelevant to what we measure; tokens are minted directly
+FAKE_HASH = "not-a-real-hash"
+
+
+@contextmanager
+def temp_database(**engine_kwargs):
+    """
+    Yield (engine, SessionLocal) for a fresh on-disk SQLite database.
+    `engine_kwargs` go to create_engine (e.g. pool_size for concurrency runs).
+    """
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="micro_lms_bench_")
+    os.close(fd)
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        **engine_kwargs,
+    )
+    instrument_engine(engine)  # X-Query-Count like the app's engines
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    try:
+        yield engine, SessionLocal
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+@contextmanager
+def async_sessions_for(SessionLocal, **engine_kwargs):
+    """
+    Yield an async (aiosqlite, read-only) session factory on the same database
+    file as `SessionLocal`, for the get_async_read_db override.
+    """
+    url = SessionLocal.kw["bind"].url.set(drivername="sqlite+aiosqlite")
+    engine = create_async_sqlite_engine(url, read_only=True, **engine_kwargs)
+    try:
+        yield async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    finally:
+        asyncio.run(engine.dispose())
+
+
+def _override_async_read_db(factory):
+    async def override():
+        async with factory() as db:
+            yield db
+
+    return override
+
+
+@contextmanager
+def bench_client(SessionLocal):
+    """TestClient whose get_db dependency uses `SessionLocal`."""
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # TestClient may run each request on a fresh event loop: don't pool
+    with async_sessions_for(SessionLocal, poolclass=NullPool) as AsyncSessions:
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        app.dependency_overrides[get_async_read_db] = _override_async_read_db(
+            AsyncSessions
+        )
+        try:
+            yield TestClient(app)
+        finally:
+            app.dependency_overrides.clear()
+
+
+def auth_header(SessionLocal, user_id: int) -> dict:
+    """Bearer header for a seeded user, with the claims a login would mint."""
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+    finally:
+        db.close()
+    token = create_user_access_token(user, expires_delta=timedelta(hours=1))
+    return {"Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def count_queries(engine):
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_courses(
+    SessionLocal,
+    *,
+    courses: int,
+    students: int,
+    assignments: int,
+    submitted_ratio: float = 0.5,
+) -> tuple[int, int]:
+    """
+    Seed one instructor owning `courses` courses. Every course shares the same
+    `students` enrolled students and gets `assignments` assignments, a share of
+    which are submitted (every other submission graded).
+
+    Returns (instructor_id, first_student_id).
+    """
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(User),
+            [
+                {
+                    "email": "instructor@bench.example.com",
+                    "role": "instructor",
+                    "hashed_password": FAKE_HASH,
+                }
+            ]
+            + [
+                {
+                    "email": f"student{i:06d}@bench.example.com",
+                    "role": "student",
+                    "hashed_password": FAKE_HASH,
+                }
+                for i in range(students)
+            ],
+        )
+        instructor_id = db.query(User.id).filter(User.role == "instructor").scalar()
+        student_ids = [
+            sid for (sid,) in db.query(User.id).filter(User.role == "student")
+        ]
+
+        db.execute(
+            insert(Course),
+            [
+                {"title": f"Course {c}", "instructor_id": instructor_id}
+                for c in range(courses)
+            ],
+        )
+        course_ids = [cid for (cid,) in db.query(Course.id).order_by(Course.id)]
+
+        db.execute(
+            insert(Enrollment),
+            [
+                {"course_id": cid, "student_id": sid}
+                for cid in course_ids
+                for sid in student_ids
+            ],
+        )
+        db.execute(
+            insert(Assignment),
+            [
+                {
+                    "course_id": cid,
+                    "title": f"A{a}",
+                    "due_at": now + timedelta(days=a - assignments // 2),
+                    "max_score": 100,
+                }
+                for cid in course_ids
+                for a in range(assignments)
+            ],
+        )
+        assignment_ids = [aid for (aid,) in db.query(Assignment.id)]
+
+        cutoff = int(len(student_ids) * submitted_ratio)
+        submissions = []
+        for aid in assignment_ids:
+            for n, sid in enumerate(student_ids[:cutoff]):
+                submissions.append(
+                    {
+                        "assignment_id": aid,
+                        "student_id": sid,
+                        "content": "x",
+                        "submitted_at": now,
+                        "score": 90 if n % 2 == 0 else None,
+                    }
+                )
+        if submissions:
+            db.execute(insert(Submission), submissions)
+
+        # bulk inserts bypass the routers' hooks: fill the stats tables here
+        grade_stats.rebuild(db)
+        db.commit()
+        return instructor_id, student_ids[0]
+    finally:
+        db.close()
+
+
+def measure(fn, *, repeat: int = 20, warmup: int = 2) -> dict:
+    """Call `fn` repeatedly; return latency stats in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+@contextmanager
+def live_server(SessionLocal, port: int = 8765, ReadSessionLocal=None):
+    """
+    Run the app under uvicorn in a background thread (get_db pointed at
+    `SessionLocal`, get_read_db at `ReadSessionLocal` or else the same, and
+    get_async_read_db at the same file) for benchmarks that need real
+    sockets, e.g. streaming. Yields the base URL.
+    """
+    import threading
+
+    import uvicorn
+
+    def session_from(factory):
+        def override():
+            db = factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        return override
+
+    with async_sessions_for(SessionLocal) as AsyncSessions:
+        app.dependency_overrides[get_db] = session_from(SessionLocal)
+        app.dependency_overrides[get_read_db] = session_from(
+            ReadSessionLocal or SessionLocal
+        )
+        app.dependency_overrides[get_async_read_db] = _override_async_read_db(
+            AsyncSessions
+        )
+        server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        try:
+            while not server.started:
+                time.sleep(0.01)
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.should_exit = True
+            thread.join()
+            app.dependency_overrides.clear()
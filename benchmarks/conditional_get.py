@@ -0,0 +1,68 @@
+"""
+Polling the gradebook and dashboard reads with and without If-None-Match, on
+an unchanged course (500 students x 50 assignments; the student is enrolled
+in 5 such courses).
+
+    python -m benchmarks.conditional_get
+"""
+
+from benchmarks.common import (
+    auth_header,
+    bench_client,
+    measure,
+    seed_courses,
+    temp_database,
+)
+
+COURSES = 5
+STUDENTS = 500
+ASSIGNMENTS = 50
+
+
+def main() -> None:
+    with temp_database() as (_engine, SessionLocal):
+        instructor_id, student_id = seed_courses(
+            SessionLocal, courses=COURSES, students=STUDENTS, assignments=ASSIGNMENTS
+        )
+        polls = [
+            (auth_header(SessionLocal, instructor_id), "/courses/1/gradebook"),
+            (auth_header(SessionLocal, instructor_id), "/courses/1/gradebook/summary"),
+            (auth_header(SessionLocal, student_id), "/courses/1/gradebook/me"),
+            (auth_header(SessionLocal, student_id), "/courses/me/dashboard"),
+        ]
+
+        with bench_client(SessionLocal) as client:
+            print(
+                f"{'route':<30} {'200 ms':>8} {'q':>3} {'304 ms':>8} {'q':>3}"
+                f" {'speedup':>8}"
+            )
+            for headers, path in polls:
+                first = client.get(path, headers=headers)
+                # an empty payload would make the 200 side meaninglessly cheap
+                assert first.json(), f"{path} returned nothing to revalidate"
+                etag = first.headers["etag"]
+                conditional = {**headers, "If-None-Match": etag}
+
+                def full():
+                    assert client.get(path, headers=headers).status_code == 200
+
+                def revalidate():
+                    assert client.get(path, headers=conditional).status_code == 304
+
+                full_queries = client.get(path, headers=headers).headers[
+                    "x-query-count"
+                ]
+                revalidate_queries = client.get(path, headers=conditional).headers[
+                    "x-query-count"
+                ]
+                full_ms = measure(full)["median_ms"]
+                revalidate_ms = measure(revalidate, repeat=200)["median_ms"]
+                print(
+                    f"{path:<30} {full_ms:>8.2f} {full_queries:>3}"
+                    f" {revalidate_ms:>8.2f} {revalidate_queries:>3}"
+                    f" {full_ms / revalidate_ms:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Gradebook CSV export against the JSON gradebook for a 500k-cell course
+(5,000 students x 100 assignments): time to first byte and total time, over
+real HTTP so streaming is visible.
+
+    python -m benchmarks.gradebook_export
+"""
+
+import time
+
+import httpx
+
+from benchmarks.common import auth_header, live_server, seed_courses, temp_database
+
+STUDENTS = 5_000
+ASSIGNMENTS = 100
+
+
+def fetch(client: httpx.Client, url: str, headers: dict) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    with client.stream("GET", url, headers=headers) as r:
+        assert r.status_code == 200, r.read()
+        for chunk in r.iter_raw():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+    return first_byte, time.perf_counter() - start, size
+
+
+def main() -> None:
+    with temp_database() as (_engine, SessionLocal):
+        instructor_id, _ = seed_courses(
+            SessionLocal, courses=1, students=STUDENTS, assignments=ASSIGNMENTS
+        )
+        headers = auth_header(SessionLocal, instructor_id)
+
+        with live_server(SessionLocal) as base, httpx.Client(timeout=300) as client:
+            print(f"{STUDENTS * ASSIGNMENTS:,} cells")
+            print(f"{'endpoint':<28} {'first byte':>11} {'total':>9} {'MB':>7}")
+            for label, path in (
+                ("gradebook (json)", "/courses/1/gradebook"),
+                ("gradebook/export.csv", "/courses/1/gradebook/export.csv"),
+            ):
+                ttfb, total, size = fetch(client, base + path, headers)
+                print(
+                    f"{label:<28} {ttfb * 1000:>9.1f}ms {total:>8.2f}s "
+                    f"{size / 1e6:>7.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
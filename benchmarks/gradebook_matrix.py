@@ -0,0 +1,37 @@
+"""
+Matrix gradebook against the long-format JSON gradebook for a 100k-cell
+course (1,000 students x 100 assignments): response time and payload size.
+
+    python -m benchmarks.gradebook_matrix
+"""
+
+import time
+
+from benchmarks.common import auth_header, bench_client, seed_courses, temp_database
+
+STUDENTS = 1_000
+ASSIGNMENTS = 100
+
+
+def main() -> None:
+    with temp_database() as (_engine, SessionLocal):
+        instructor_id, _ = seed_courses(
+            SessionLocal, courses=1, students=STUDENTS, assignments=ASSIGNMENTS
+        )
+        headers = auth_header(SessionLocal, instructor_id)
+
+        with bench_client(SessionLocal) as client:
+            print(f"{STUDENTS * ASSIGNMENTS:,} cells")
+            print(f"{'format':<10} {'time':>9} {'MB':>7}")
+            for fmt in ("json", "matrix"):
+                start = time.perf_counter()
+                r = client.get(
+                    "/courses/1/gradebook", headers=headers, params={"format": fmt}
+                )
+                elapsed = time.perf_counter() - start
+                assert r.status_code == 200, r.text
+                print(f"{fmt:<10} {elapsed:>8.2f}s {len(r.content) / 1e6:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Submission throughput with one transaction per request against group commit
+(app.workers.submission_writer), for 1 and N concurrent writers, over real
+HTTP.
+
+    python -m benchmarks.group_commit
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from app.main import app
+from app.workers.submission_writer import SubmissionWriter, get_submission_writer
+from benchmarks.common import auth_header, live_server, seed_courses, temp_database
+
+WRITERS = (1, 4, 16, 64)
+SUBMITS_PER_WRITER = 25
+
+
+def run(base: str, headers: list[dict], writers: int) -> tuple[float, int]:
+    """
+    (successful submissions per second, failed submissions) with `writers`
+    clients submitting in parallel. Failures are mostly "database is locked"
+    500s from transactions contending for SQLite's write lock.
+    """
+
+    def writer(n: int) -> int:
+        failed = 0
+        with httpx.Client(base_url=base, timeout=60) as client:
+            for attempt in range(SUBMITS_PER_WRITER):
+                try:
+                    r = client.post(
+                        "/assignments/1/submissions",
+                        headers=headers[n],
+                        json={"content": f"attempt {attempt}"},
+                    )
+                except httpx.TransportError:
+                    failed += 1
+                else:
+                    failed += r.status_code != 201
+        return failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        failed = sum(pool.map(writer, range(writers)))
+    elapsed = time.perf_counter() - start
+    return (writers * SUBMITS_PER_WRITER - failed) / elapsed, failed
+
+
+def main() -> None:
+    print(
+        f"{'writers':>8} {'inline/s':>10} {'failed':>7} "
+        f"{'group/s':>10} {'failed':>7} {'batches':>8}"
+    )
+    results = {}
+    for mode in ("inline", "group"):
+        # a request keeps its session's connection between threadpool hops,
+        # so size the pool for every client (+1 for the writer) to measure
+        # SQLite rather than pool starvation
+        with temp_database(pool_size=max(WRITERS) + 1) as (_engine, SessionLocal):
+            _, first_student = seed_courses(
+                SessionLocal,
+                courses=1,
+                students=max(WRITERS),
+                assignments=1,
+                submitted_ratio=0,
+            )
+            headers = [
+                auth_header(SessionLocal, first_student + i)
+                for i in range(max(WRITERS))
+            ]
+
+            writer = None
+            if mode == "group":
+                writer = SubmissionWriter(SessionLocal)
+                writer.start()
+                app.dependency_overrides[get_submission_writer] = lambda: writer
+            try:
+                with live_server(SessionLocal) as base:
+                    for n in WRITERS:
+                        before = writer.batches if writer else 0
+                        rate, failed = run(base, headers, n)
+                        batches = writer.batches - before if writer else None
+                        results.setdefault(n, {})[mode] = (rate, failed, batches)
+            finally:
+                if writer:
+                    writer.stop()
+
+    for n in WRITERS:
+        inline, inline_failed, _ = results[n]["inline"]
+        group, group_failed, batches = results[n]["group"]
+        print(
+            f"{n:>8} {inline:>10.0f} {inline_failed:>7} "
+            f"{group:>10.0f} {group_failed:>7} {batches:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
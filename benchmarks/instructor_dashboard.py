@@ -0,0 +1,50 @@
+"""
+Instructor dashboard latency and query count as the number of courses grows.
+
+    python -m benchmarks.instructor_dashboard
+"""
+
+from benchmarks.common import (
+    auth_header,
+    bench_client,
+    count_queries,
+    measure,
+    seed_courses,
+    temp_database,
+)
+
+COURSE_COUNTS = (1, 10, 25, 50, 100)
+STUDENTS_PER_COURSE = 30
+ASSIGNMENTS_PER_COURSE = 10
+
+
+def main() -> None:
+    print(f"{'courses':>8} {'queries':>8} {'median ms':>10} {'p95 ms':>8}")
+    for courses in COURSE_COUNTS:
+        with temp_database() as (engine, SessionLocal):
+            instructor_id, _ = seed_courses(
+                SessionLocal,
+                courses=courses,
+                students=STUDENTS_PER_COURSE,
+                assignments=ASSIGNMENTS_PER_COURSE,
+            )
+            headers = auth_header(SessionLocal, instructor_id)
+
+            with bench_client(SessionLocal) as client:
+
+                def call():
+                    r = client.get("/instructor/dashboard", headers=headers)
+                    assert r.status_code == 200, r.text
+
+                with count_queries(engine) as statements:
+                    call()
+                stats = measure(call)
+
+        print(
+            f"{courses:>8} {len(statements):>8} "
+            f"{stats['median_ms']:>10.2f} {stats['p95_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
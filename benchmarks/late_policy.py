@@ -0,0 +1,63 @@
+"""
+Late-policy evaluation over 1M (due_at, submitted_at) pairs: the old
+row-by-row call pattern versus the batch engine, with and without NumPy.
+
+    python -m benchmarks.late_policy
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.services import late_policy
+
+ROWS = 1_000_000
+
+
+def make_rows(n: int) -> tuple[list, list]:
+    rng = random.Random(42)
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    due, submitted = [], []
+    for i in range(n):
+        d = base + timedelta(days=i % 90)
+        due.append(d if i % 10 else None)
+        if i % 4 == 0:
+            submitted.append(None)  # missing
+        else:
+            submitted.append(d + timedelta(minutes=rng.randint(-3000, 6000)))
+    return due, submitted
+
+
+def timed(label: str, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    print(f"{label:<28} {time.perf_counter() - start:8.3f} s")
+
+
+def main() -> None:
+    due, submitted = make_rows(ROWS)
+    print(f"{ROWS:,} rows")
+
+    timed(
+        "row-by-row late_penalty",
+        lambda: [late_policy.late_penalty(d, s) for d, s in zip(due, submitted)],
+    )
+
+    numpy = late_policy.np
+    late_policy.np = None
+    try:
+        timed(
+            "late_columns (pure Python)",
+            lambda: late_policy.late_columns(due, submitted),
+        )
+    finally:
+        late_policy.np = numpy
+
+    if numpy is None:
+        print("late_columns (NumPy)         skipped: numpy not installed")
+    else:
+        timed("late_columns (NumPy)", lambda: late_policy.late_columns(due, submitted))
+
+
+if __name__ == "__main__":
+    main()
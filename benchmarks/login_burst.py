@@ -0,0 +1,139 @@
+"""
+list_assignments latency while a burst of logins hammers /auth/login, with
+bcrypt run in the request threadpool against app.workers.password_hasher's
+process pool, over real HTTP.
+
+    python -m benchmarks.login_burst
+"""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import httpx
+from sqlalchemy import select, update
+
+from app.core.security import hash_password
+from app.main import app
+from app.models.user import User
+from app.workers.password_hasher import PasswordHasher, get_password_hasher
+from benchmarks.common import auth_header, live_server, seed_courses, temp_database
+
+READERS = 4
+LOGIN_CLIENTS = 32
+DURATION_SECONDS = 10
+PASSWORD = "password123"
+
+
+def percentile(samples: list[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def run_load(base: str, reader: dict, emails: list[str]) -> dict:
+    """READERS clients listing assignments, plus one login loop per email."""
+    stop = time.monotonic() + DURATION_SECONDS
+    read_ms: list[float] = []
+    logins = {"ok": 0, "503": 0, "other": 0}
+
+    async def read_loop(client: httpx.AsyncClient) -> None:
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            r = await client.get("/courses/1/assignments", headers=reader)
+            r.raise_for_status()
+            read_ms.append((time.perf_counter() - start) * 1000)
+
+    async def login_loop(client: httpx.AsyncClient, email: str) -> None:
+        while time.monotonic() < stop:
+            r = await client.post(
+                "/auth/login", json={"email": email, "password": PASSWORD}
+            )
+            if r.status_code == 200:
+                logins["ok"] += 1
+            elif r.status_code == 503:
+                logins["503"] += 1
+                await asyncio.sleep(float(r.headers["Retry-After"]))
+            else:
+                logins["other"] += 1
+
+    async with httpx.AsyncClient(base_url=base, timeout=120) as client:
+        await asyncio.gather(
+            *(read_loop(client) for _ in range(READERS)),
+            *(login_loop(client, email) for email in emails),
+        )
+    return {
+        "p50_ms": percentile(read_ms, 0.5),
+        "p99_ms": percentile(read_ms, 0.99),
+        "logins_per_s": logins["ok"] / DURATION_SECONDS,
+        "rejected": logins["503"],
+        "failed": logins["other"],
+    }
+
+
+def load_process(base: str, reader: dict, emails: list[str]) -> dict:
+    # the clients get their own process, away from the server's
+    return asyncio.run(run_load(base, reader, emails))
+
+
+def use(hasher: PasswordHasher | None):
+    # a closure, not a default argument: FastAPI would read that as a parameter
+    return lambda: hasher
+
+
+def main() -> None:
+    with temp_database() as (_engine, SessionLocal):
+        _, first_student = seed_courses(
+            SessionLocal, courses=1, students=LOGIN_CLIENTS + 1, assignments=10
+        )
+        db = SessionLocal()
+        try:
+            db.execute(update(User).values(hashed_password=hash_password(PASSWORD)))
+            db.commit()
+            emails = list(
+                db.scalars(
+                    select(User.email)
+                    .where(User.id > first_student)
+                    .order_by(User.id)
+                    .limit(LOGIN_CLIENTS)
+                )
+            )
+        finally:
+            db.close()
+        reader = auth_header(SessionLocal, first_student)
+
+        hasher = PasswordHasher()
+        hasher.start()
+        runs = (
+            ("no logins", None, []),
+            ("threadpool", None, emails),
+            ("process pool", hasher, emails),
+        )
+        print(
+            f"{READERS} list_assignments readers, {LOGIN_CLIENTS} login clients, "
+            f"{DURATION_SECONDS}s per run"
+        )
+        print(
+            f"{'bcrypt in':<13} {'p50 ms':>8} {'p99 ms':>8} {'logins/s':>9} "
+            f"{'503s':>6} {'failed':>7}"
+        )
+        try:
+            with (
+                live_server(SessionLocal) as base,
+                ProcessPoolExecutor(1, mp_context=get_context("spawn")) as load,
+            ):
+                for label, mode, login_emails in runs:
+                    app.dependency_overrides[get_password_hasher] = use(mode)
+                    stats = load.submit(load_process, base, reader, login_emails)
+                    stats = stats.result()
+                    print(
+                        f"{label:<13} {stats['p50_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+                        f"{stats['logins_per_s']:>9.1f} {stats['rejected']:>6} "
+                        f"{stats['failed']:>7}"
+                    )
+        finally:
+            hasher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Routes that open with course/assignment/enrollment checks, with the lookup
+cache emptied before every call ("cold") and left warm, on courses of 500
+students x 50 assignments.
+
+    python -m benchmarks.lookup_cache
+"""
+
+from app.services import lookup_cache
+from benchmarks.common import (
+    auth_header,
+    bench_client,
+    measure,
+    seed_courses,
+    temp_database,
+)
+
+COURSES = 2
+STUDENTS = 500
+ASSIGNMENTS = 50
+
+
+def main() -> None:
+    with temp_database() as (_engine, SessionLocal):
+        instructor_id, student_id = seed_courses(
+            SessionLocal, courses=COURSES, students=STUDENTS, assignments=ASSIGNMENTS
+        )
+        instructor = auth_header(SessionLocal, instructor_id)
+        student = auth_header(SessionLocal, student_id)
+        calls = [
+            (student, "GET", "/courses/1/assignments", None),
+            (student, "POST", "/assignments/1/submissions", {"content": "x"}),
+            (instructor, "GET", "/assignments/1/submissions", None),
+        ]
+
+        with bench_client(SessionLocal) as client:
+            print(f"{'route':<38} {'cold ms':>8} {'q':>3} {'warm ms':>8} {'q':>3}")
+            for headers, method, path, body in calls:
+
+                def call() -> str:
+                    r = client.request(method, path, json=body, headers=headers)
+                    assert r.status_code < 300, r.text
+                    return r.headers["x-query-count"]
+
+                def cold():
+                    lookup_cache.clear()
+                    return call()
+
+                cold_queries, warm_queries = cold(), call()
+                cold_ms = measure(cold)["median_ms"]
+                warm_ms = measure(call)["median_ms"]
+                print(
+                    f"{method + ' ' + path:<38} {cold_ms:>8.2f} {cold_queries:>3}"
+                    f" {warm_ms:>8.2f} {warm_queries:>3}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Per-request cost of the request logging/metrics middleware: no middleware,
+the old BaseHTTPMiddleware logger, and app.core.metrics_middleware, on a
+trivial route driven in-process (so the middleware is most of the work).
+
+    python -m benchmarks.middleware_overhead
+"""
+
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.core.metrics import RequestMetrics
+from app.core.metrics_middleware import MetricsMiddleware
+
+REQUESTS = 5000
+
+logger = logging.getLogger(__name__)
+
+
+class OldLoggingMiddleware(BaseHTTPMiddleware):
+    """The middleware MetricsMiddleware replaced, for comparison."""
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.monotonic()
+        response = await call_next(request)
+        duration = time.monotonic() - start
+        logger.info(
+            "%s %s -> %s (%.2fs)",
+            request.method,
+            request.url.path,
+            response.status_code,
+            duration,
+        )
+        return response
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if middleware is MetricsMiddleware:
+        app.add_middleware(MetricsMiddleware, metrics=RequestMetrics())
+    elif middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def per_request_us(app: FastAPI) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://x") as client:
+        for i in range(200):  # warm up
+            await client.get(f"/items/{i}")
+        start = time.perf_counter()
+        for i in range(REQUESTS):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def main() -> None:
+    results = {
+        label: asyncio.run(per_request_us(build_app(middleware)))
+        for label, middleware in (
+            ("none", None),
+            ("BaseHTTPMiddleware", OldLoggingMiddleware),
+            ("MetricsMiddleware", MetricsMiddleware),
+        )
+    }
+    print(f"{'middleware':<20} {'us/request':>11} {'overhead us':>12}")
+    for label, us in results.items():
+        print(f"{label:<20} {us:>11.1f} {us - results['none']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Bulk roster import throughput: 50,000 students streamed as CSV into an empty
+course, then the same roster again (every row already enrolled).
+
+    python -m benchmarks.roster_import
+"""
+
+import time
+
+from app.models.course import Course
+from app.models.user import User
+from benchmarks.common import (
+    auth_header,
+    bench_client,
+    count_queries,
+    seed_courses,
+    temp_database,
+)
+
+STUDENTS = 50_000
+
+
+def main() -> None:
+    with temp_database() as (engine, SessionLocal):
+        instructor_id, _ = seed_courses(
+            SessionLocal, courses=1, students=STUDENTS, assignments=5
+        )
+        db = SessionLocal()
+        try:
+            emails = [e for (e,) in db.query(User.email).filter(User.role == "student")]
+            course = Course(title="Roster target", instructor_id=instructor_id)
+            db.add(course)
+            db.commit()
+            course_id = course.id
+        finally:
+            db.close()
+
+        body = ("email\n" + "\n".join(emails)).encode()
+        headers = {
+            **auth_header(SessionLocal, instructor_id),
+            "Content-Type": "text/csv",
+        }
+
+        print(f"{'run':<10} {'rows':>7} {'enrolled':>9} {'queries':>8} {'seconds':>8}")
+        with bench_client(SessionLocal) as client:
+            for label in ("fresh", "re-import"):
+                with count_queries(engine) as statements:
+                    start = time.perf_counter()
+                    r = client.post(
+                        "/enrollments/bulk",
+                        params={"course_id": course_id},
+                        headers=headers,
+                        content=body,
+                    )
+                    elapsed = time.perf_counter() - start
+                assert r.status_code == 200, r.text
+                summary = r.json()
+                print(
+                    f"{label:<10} {summary['rows']:>7} {summary['enrolled']:>9} "
+                    f"{len(statements):>8} {elapsed:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+A stampede of identical gradebook reads (an assignment just closed, every TA
+opens the gradebook), on a course of 500 students x 50 assignments. The
+same requests issued one after another, where nothing can be shared, are the
+baseline.
+
+    python -m benchmarks.single_flight
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import single_flight
+from benchmarks.common import (
+    auth_header,
+    bench_client,
+    seed_courses,
+    temp_database,
+)
+
+STUDENTS = 500
+ASSIGNMENTS = 50
+STAMPEDE = 16
+ROUNDS = 5
+ROUTES = [
+    ("gradebook", "/courses/1/gradebook"),
+    ("gradebook", "/courses/1/gradebook?format=matrix"),
+    ("gradebook/assignments", "/courses/1/gradebook/assignments"),
+]
+
+
+def main() -> None:
+    with temp_database() as (_engine, SessionLocal):
+        instructor_id, _student_id = seed_courses(
+            SessionLocal, courses=1, students=STUDENTS, assignments=ASSIGNMENTS
+        )
+        headers = auth_header(SessionLocal, instructor_id)
+
+        with bench_client(SessionLocal) as client:
+            print(
+                f"{'route':<36} {'serial ms':>10} {'stampede ms':>12}"
+                f" {'computed':>9} {'coalesced':>10}"
+            )
+            for endpoint, path in ROUTES:
+
+                def get(_=None):
+                    assert client.get(path, headers=headers).status_code == 200
+
+                get()  # warm up
+
+                start = time.perf_counter()
+                for _ in range(STAMPEDE * ROUNDS):
+                    get()
+                serial_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+
+                before = single_flight.stats()[endpoint]
+                start = time.perf_counter()
+                with ThreadPoolExecutor(STAMPEDE) as pool:
+                    for _ in range(ROUNDS):
+                        list(pool.map(get, range(STAMPEDE)))
+                stampede_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+                after = single_flight.stats()[endpoint]
+
+                calls = after.calls - before.calls
+                coalesced = after.coalesced - before.coalesced
+                print(
+                    f"{path:<36} {serial_ms:>10.1f} {stampede_ms:>12.1f}"
+                    f" {calls - coalesced:>9} {coalesced:>10}"
+                )
+            print(f"(per round of {STAMPEDE} requests; {ROUNDS} rounds)")
+
+
+if __name__ == "__main__":
+    main()
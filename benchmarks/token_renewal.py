@@ -0,0 +1,54 @@
+"""
+Renewing a session by logging in again (bcrypt verify) against exchanging a
+refresh token (HMAC check and one lookup): requests per second, sequential.
+
+    python -m benchmarks.token_renewal
+"""
+
+import time
+
+from sqlalchemy import select, update
+
+from app.core.security import hash_password
+from app.models.user import User
+from benchmarks.common import bench_client, seed_courses, temp_database
+
+LOGINS = 20
+REFRESHES = 1000
+PASSWORD = "password123"
+
+
+def main() -> None:
+    with temp_database() as (_engine, SessionLocal):
+        seed_courses(SessionLocal, courses=1, students=1, assignments=1)
+        db = SessionLocal()
+        try:
+            db.execute(update(User).values(hashed_password=hash_password(PASSWORD)))
+            db.commit()
+            email = db.scalars(select(User.email).where(User.role == "student")).one()
+        finally:
+            db.close()
+        credentials = {"email": email, "password": PASSWORD}
+
+        with bench_client(SessionLocal) as client:
+            start = time.perf_counter()
+            for _ in range(LOGINS):
+                r = client.post("/auth/login", json=credentials)
+                assert r.status_code == 200, r.text
+            login_rate = LOGINS / (time.perf_counter() - start)
+
+            refresh_token = r.json()["refresh_token"]
+            start = time.perf_counter()
+            for _ in range(REFRESHES):
+                r = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+                assert r.status_code == 200, r.text
+                refresh_token = r.json()["refresh_token"]
+            refresh_rate = REFRESHES / (time.perf_counter() - start)
+
+    print(f"{'renewal':<8} {'req/s':>8} {'ms/req':>8}")
+    for label, rate in (("login", login_rate), ("refresh", refresh_rate)):
+        print(f"{label:<8} {rate:>8.1f} {1000 / rate:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Mixed read/write throughput over real HTTP: gradebook readers and submission
+writers running together for a fixed time, on the old default engine (one
+pool, rollback journal, no pragmas) against app.db.session's profile (WAL,
+pragmas, separate read-only pool).
+
+    python -m benchmarks.wal_mixed_load
+"""
+
+import threading
+import time
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import create_sqlite_engine
+from benchmarks.common import auth_header, live_server, seed_courses, temp_database
+
+READERS = 8
+WRITERS = 16
+DURATION_SECONDS = 10
+STUDENTS = 100
+ASSIGNMENTS = 10
+
+
+def run_load(base: str, instructor: dict, students: list[dict]) -> dict:
+    stop = time.monotonic() + DURATION_SECONDS
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def loop(request) -> None:
+        with httpx.Client(base_url=base, timeout=60) as client:
+            while time.monotonic() < stop:
+                try:
+                    kind = request(client)
+                except httpx.TransportError:
+                    kind = "errors"
+                with lock:
+                    counts[kind] += 1
+
+    def read(client) -> str:
+        r = client.get("/courses/1/gradebook", headers=instructor)
+        return "reads" if r.status_code == 200 else "errors"
+
+    def write_as(headers):
+        def write(client) -> str:
+            r = client.post(
+                "/assignments/1/submissions", headers=headers, json={"content": "x"}
+            )
+            return "writes" if r.status_code == 201 else "errors"
+
+        return write
+
+    threads = [threading.Thread(target=loop, args=(read,)) for _ in range(READERS)]
+    threads += [
+        threading.Thread(target=loop, args=(write_as(students[i]),))
+        for i in range(WRITERS)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {k: v / DURATION_SECONDS for k, v in counts.items()}
+
+
+def main() -> None:
+    with temp_database() as (seed_engine, SeedSession):
+        instructor_id, first_student = seed_courses(
+            SeedSession, courses=1, students=STUDENTS, assignments=ASSIGNMENTS
+        )
+        seed_engine.dispose()
+        url = seed_engine.url
+        instructor = auth_header(SeedSession, instructor_id)
+        students = [auth_header(SeedSession, first_student + i) for i in range(WRITERS)]
+
+        print(
+            f"{READERS} gradebook readers + {WRITERS} submitters, {DURATION_SECONDS}s"
+        )
+        print(f"{'profile':<10} {'reads/s':>8} {'writes/s':>9} {'errors/s':>9}")
+        for profile in ("default", "wal"):
+            if profile == "default":
+                engine = create_engine(
+                    url, connect_args={"check_same_thread": False}, pool_size=64
+                )
+                engines = [engine]
+                Write = Read = sessionmaker(bind=engine, autoflush=False)
+            else:
+                engines = [
+                    create_sqlite_engine(url),
+                    create_sqlite_engine(url, read_only=True),
+                ]
+                Write = sessionmaker(bind=engines[0], autoflush=False)
+                Read = sessionmaker(bind=engines[1], autoflush=False)
+
+            try:
+                with live_server(Write, ReadSessionLocal=Read) as base:
+                    rates = run_load(base, instructor, students)
+            finally:
+                for e in engines:
+                    e.dispose()
+            print(
+                f"{profile:<10} {rates['reads']:>8.1f} {rates['writes']:>9.1f} "
+                f"{rates['errors']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,50 @@
 import os
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from app.core.deps import get_db
+from app.core.deps import get_async_read_db, get_db, get_read_db
 from app.core.security import hash_password
 from app.db.base import Base
+from app.db.session import create_async_sqlite_engine, create_sqlite_engine
 from app.main import app
 from app.models.assignment import Assignment
+from app.models.cache_event import CacheEvent
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.models.grade_stats import CourseAssignmentStats, CourseStudentStats
+from app.models.idempotency import IdempotencyKey
+from app.models.refresh_token import RefreshTokenFamily
+from app.models.submission import Submission
+from app.models.token_version import TokenVersion
 from app.models.user import User
+from app.services import grade_stats, idempotency, lookup_cache, token_versions
+from app.workers.password_hasher import get_password_hasher
+from app.workers.submission_writer import SubmissionWriter, get_submission_writer
 
 TEST_DB_FILE = "test_micro_lms.db"
 TEST_DB_URL = f"sqlite:///./{TEST_DB_FILE}"
 
-engine = create_engine(
-    TEST_DB_URL,
-    connect_args={"check_same_thread": False},
-)
+# same engine profile as the app: WAL, pragmas, separate read-only pool
+engine = create_sqlite_engine(TEST_DB_URL)
+read_engine = create_sqlite_engine(TEST_DB_URL, read_only=True)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine
+)
+# each TestClient runs its own event loop, so async connections are not pooled
+async_read_engine = create_async_sqlite_engine(
+    f"sqlite+aiosqlite:///./{TEST_DB_FILE}", read_only=True, poolclass=NullPool
+)
+TestingAsyncReadSessionLocal = async_sessionmaker(
+    autoflush=False, expire_on_commit=False, bind=async_read_engine
+)
 
 
 def override_get_db():
@@ -33,6 +55,63 @@ def override_get_db():
         db.close()
 
 
+def override_get_read_db():
+    db = TestingReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_async_read_db():
+    async with TestingAsyncReadSessionLocal() as db:
+        yield db
+
+
+@contextmanager
+def count_queries():
+    """Collect every SQL statement run against the test engines inside the block."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    for e in (engine, read_engine, async_read_engine.sync_engine):
+        event.listen(e, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for e in (engine, read_engine, async_read_engine.sync_engine):
+            event.remove(e, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def max_queries(budget: int):
+    """
+    Fail if the block runs more than `budget` SQL statements, listing them.
+    Run the endpoint against more rows than the budget to catch an N+1.
+    """
+    with count_queries() as statements:
+        yield statements
+    assert (
+        len(statements) <= budget
+    ), f"{len(statements)} queries, budget {budget}:\n" + "\n".join(statements)
+
+
+def login(client, email: str, password: str = "password123") -> str:
+    """Log in through the API and return the access token."""
+    r = client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+def auth_header(token: str, idempotency_key: str | None = None) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    if idempotency_key is not None:
+        headers["Idempotency-Key"] = idempotency_key
+    return headers
+
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_db():
     """Create a fresh schema once for the whole test session."""
@@ -40,8 +119,11 @@ def setup_test_db():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
-    if os.path.exists(TEST_DB_FILE):
-        os.remove(TEST_DB_FILE)
+    read_engine.dispose()
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_FILE + suffix):
+            os.remove(TEST_DB_FILE + suffix)
 
 
 @pytest.fixture(autouse=True)
@@ -50,6 +132,16 @@ def seed_data():
     db = TestingSessionLocal()
     try:
         # Clear tables (child -> parent)
+        db.query(IdempotencyKey).delete()
+        idempotency.clear_cache()
+        db.query(TokenVersion).delete()
+        db.query(RefreshTokenFamily).delete()
+        token_versions.clear()
+        lookup_cache.clear()
+        db.query(CacheEvent).delete()
+        db.query(CourseStudentStats).delete()
+        db.query(CourseAssignmentStats).delete()
+        db.query(Submission).delete()
         db.query(Enrollment).delete()
         db.query(Assignment).delete()
         db.query(Course).delete()
@@ -98,6 +190,10 @@ def seed_data():
         )
         db.commit()
 
+        # seeding bypasses the routers, so fill the stats tables from source
+        grade_stats.rebuild(db)
+        db.commit()
+
         yield
     finally:
         db.close()
@@ -107,6 +203,23 @@ def seed_data():
 def client():
     """Test client that uses the test DB session via dependency override."""
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    # bcrypt inline: tests that want the process pool override this themselves
+    app.dependency_overrides[get_password_hasher] = lambda: None
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def group_commit_writer():
+    """Route submits through a running SubmissionWriter on the test DB."""
+    writer = SubmissionWriter(TestingSessionLocal, window_ms=20)
+    writer.start()
+    app.dependency_overrides[get_submission_writer] = lambda: writer
+    try:
+        yield writer
+    finally:
+        app.dependency_overrides.pop(get_submission_writer, None)
+        writer.stop()
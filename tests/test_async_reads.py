@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import event
+
+from tests.conftest import async_read_engine, auth_header, login
+
+
+@pytest.fixture()
+def async_statements():
+    """SQL run on the async read engine (and not the sync ones)."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    target = async_read_engine.sync_engine
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/auth/me", "/courses/me", "/courses/1/assignments", "/courses/1/gradebook/me"],
+)
+def test_hot_reads_use_async_session(client, async_statements, path):
+    token = login(client, "student1@example.com", "password123")
+    r = client.get(path, headers=auth_header(token))
+    assert r.status_code == 200, r.text
+    assert async_statements
+
+
+def test_async_reads_return_student_view(client):
+    headers = auth_header(login(client, "student1@example.com", "password123"))
+
+    me = client.get("/auth/me", headers=headers).json()
+    assert me["email"] == "student1@example.com"
+
+    courses = client.get("/courses/me", headers=headers).json()
+    assert [c["title"] for c in courses] == ["CS5004"]
+
+    assignments = client.get("/courses/1/assignments", headers=headers).json()
+    assert [a["title"] for a in assignments] == ["HW1"]
+
+    rows = client.get("/courses/1/gradebook/me", headers=headers).json()
+    assert [(r["assignment_title"], r["status"]) for r in rows] == [("HW1", "missing")]
+
+
+def test_async_reads_check_access(client):
+    instructor = auth_header(login(client, "instructor1@example.com", "password123"))
+
+    # the instructor may list assignments but has no personal gradebook
+    assert client.get("/courses/1/assignments", headers=instructor).status_code == 200
+    assert client.get("/courses/1/gradebook/me", headers=instructor).status_code == 403
+    assert client.get("/courses/999/assignments", headers=instructor).status_code == 404
+    assert (
+        client.get("/courses/999/gradebook/me", headers=instructor).status_code == 404
+    )
+
+    r = client.get("/auth/me", headers=auth_header("not-a-token"))
+    assert r.status_code == 401
@@ -0,0 +1,170 @@
+from jose import jwt
+
+from app.core.config import ALGORITHM, SECRET_KEY
+from app.core.security import create_access_token
+from app.services import token_versions
+from app.workers.token_version_refresher import TokenVersionRefresher
+from tests.conftest import TestingSessionLocal, auth_header, count_queries, login
+
+
+def student_id(token: str) -> int:
+    return int(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["sub"])
+
+
+def test_login_token_carries_role_and_email(client):
+    token = login(client, "instructor1@example.com", "password123")
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert claims["email"] == "instructor1@example.com"
+    assert claims["role"] == "instructor"
+    assert claims["ver"] == 0
+
+
+def test_authorization_needs_no_user_lookup(client):
+    student = auth_header(login(client, "student1@example.com", "password123"))
+    instructor = auth_header(login(client, "instructor1@example.com", "password123"))
+
+    with count_queries() as statements:
+        assert client.get("/courses/me", headers=student).status_code == 200
+        assert client.get("/admin/ping", headers=student).status_code == 403
+        r = client.get("/admin/ping", headers=instructor)
+    assert r.json()["user"] == "instructor1@example.com"
+    assert not any("FROM users" in s for s in statements), statements
+
+
+def test_revoked_tokens_are_rejected(client):
+    old = login(client, "student1@example.com", "password123")
+
+    db = TestingSessionLocal()
+    try:
+        assert token_versions.revoke(db, student_id(old)) == 1
+        db.commit()
+    finally:
+        db.close()
+
+    assert client.get("/courses/me", headers=auth_header(old)).status_code == 401
+
+    # logging in again mints a token at the new version
+    new = login(client, "student1@example.com", "password123")
+    assert client.get("/courses/me", headers=auth_header(new)).status_code == 200
+
+
+def test_revocation_by_another_process_applies_after_refresh(client):
+    token = login(client, "student1@example.com", "password123")
+
+    db = TestingSessionLocal()
+    try:
+        token_versions.revoke(db, student_id(token))
+        db.commit()
+    finally:
+        db.close()
+    # as seen from a process that did not make the revocation
+    token_versions.clear()
+    assert client.get("/courses/me", headers=auth_header(token)).status_code == 200
+
+    assert TokenVersionRefresher(TestingSessionLocal).refresh_once() == 1
+    assert client.get("/courses/me", headers=auth_header(token)).status_code == 401
+
+
+def test_refresh_does_not_roll_back_a_local_revoke(client):
+    token = login(client, "student1@example.com", "password123")
+
+    writer = TestingSessionLocal()
+    reader = TestingSessionLocal()
+    try:
+        token_versions.revoke(writer, student_id(token))
+        # a refresh whose snapshot predates the revoke's commit
+        assert token_versions.refresh(reader) == 0
+        writer.commit()
+    finally:
+        writer.close()
+        reader.close()
+
+    assert client.get("/courses/me", headers=auth_header(token)).status_code == 401
+
+
+def test_tokens_without_role_claims_are_rejected(client):
+    token = login(client, "student1@example.com", "password123")
+    legacy = create_access_token({"sub": str(student_id(token))})
+    assert client.get("/courses/me", headers=auth_header(legacy)).status_code == 401
+
+
+def login_pair(client, email: str = "student1@example.com") -> dict:
+    r = client.post("/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_rotates_tokens(client):
+    first = login_pair(client)
+
+    with count_queries() as statements:
+        r = refresh(client, first["refresh_token"])
+    assert r.status_code == 200, r.text
+    # one joined lookup and the generation bump; no password check
+    assert len(statements) == 2, statements
+
+    second = r.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    claims = jwt.decode(second["access_token"], SECRET_KEY, algorithms=[ALGORITHM])
+    assert (claims["email"], claims["role"]) == ("student1@example.com", "student")
+    r = client.get("/courses/me", headers=auth_header(second["access_token"]))
+    assert r.status_code == 200
+
+    assert refresh(client, second["refresh_token"]).status_code == 200
+
+
+def test_reused_refresh_token_revokes_the_family(client):
+    first = login_pair(client)
+    other_session = login_pair(client)
+    second = refresh(client, first["refresh_token"]).json()
+
+    # the rotated-out token again: the whole chain is now untrusted
+    assert refresh(client, first["refresh_token"]).status_code == 401
+    assert refresh(client, second["refresh_token"]).status_code == 401
+
+    # other logins of the same user are separate families
+    assert refresh(client, other_session["refresh_token"]).status_code == 200
+
+
+def test_refresh_rejects_revoked_and_tampered_tokens(client):
+    pair = login_pair(client)
+    family, generation, signature = pair["refresh_token"].split(".")
+
+    forged = f"{family}.{int(generation) + 5}.{signature}"
+    assert refresh(client, forged).status_code == 401
+    assert refresh(client, "not-a-token").status_code == 401
+
+    db = TestingSessionLocal()
+    try:
+        token_versions.revoke(db, student_id(pair["access_token"]))
+        db.commit()
+    finally:
+        db.close()
+    assert refresh(client, pair["refresh_token"]).status_code == 401
+
+
+def test_logout_all_ends_every_session(client):
+    phone, laptop = login_pair(client), login_pair(client)
+    other_user = auth_header(login(client, "instructor1@example.com", "password123"))
+
+    r = client.post("/auth/logout-all", headers=auth_header(phone["access_token"]))
+    assert r.status_code == 204
+
+    for session in (phone, laptop):
+        headers = auth_header(session["access_token"])
+        assert client.get("/courses/me", headers=headers).status_code == 401
+        assert refresh(client, session["refresh_token"]).status_code == 401
+    # only the caller's sessions end
+    assert client.get("/admin/ping", headers=other_user).status_code == 200
+
+    fresh = login_pair(client)
+    headers = auth_header(fresh["access_token"])
+    assert client.get("/courses/me", headers=headers).status_code == 200
+
+
+def test_logout_all_needs_a_valid_token(client):
+    assert client.post("/auth/logout-all").status_code == 401
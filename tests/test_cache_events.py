@@ -0,0 +1,144 @@
+import time
+from datetime import datetime, timedelta, timezone
+from multiprocessing import get_context
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.session import create_sqlite_engine
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.services import cache_events, lookup_cache, token_versions
+from app.workers.cache_event_listener import CacheEventListener
+from tests.conftest import TestingSessionLocal
+
+WORKERS = 3
+POLL_SECONDS = 0.05
+
+
+def test_poll_applies_each_new_event_once(monkeypatch):
+    seen = []
+    monkeypatch.setitem(
+        cache_events._handlers, "test.poll", [lambda db, key: seen.append(key)]
+    )
+    db = TestingSessionLocal()
+    try:
+        cache_events.publish(db, "test.poll", 1)
+        db.commit()
+        cache_events.skip_to_latest(db)  # written before "this process" started
+
+        for key in (2, 3, 2):
+            cache_events.publish(db, "test.poll", key)
+        cache_events.publish(db, "test.nobody_listens", 4)
+        db.commit()
+
+        assert cache_events.poll(db) == 4
+        assert seen == [2, 3]
+        assert cache_events.poll(db) == 0
+    finally:
+        db.close()
+
+
+def test_prune_keeps_recent_events():
+    db = TestingSessionLocal()
+    try:
+        cache_events.publish(db, "test.prune", 1)
+        db.commit()
+        assert cache_events.prune(db) == 0
+        tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+        assert cache_events.prune(db, now=tomorrow) == 1
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_revocations_reach_processes_that_did_not_make_them():
+    db = TestingSessionLocal()
+    try:
+        student_id = db.query(User.id).filter(User.role == "student").scalar()
+        cache_events.skip_to_latest(db)
+        token_versions.revoke(db, student_id)
+        db.commit()
+
+        token_versions.clear()  # as in a process that never saw the revoke
+        assert token_versions.is_current(student_id, 0)
+        cache_events.poll(db)
+        assert not token_versions.is_current(student_id, 0)
+    finally:
+        db.close()
+
+
+def _worker(url: str, course_id: int, student_id: int, ready, seen) -> None:
+    """One "uvicorn worker": warm caches, then wait for the other's writes."""
+    SessionLocal = sessionmaker(bind=create_sqlite_engine(url))
+    listener = CacheEventListener(SessionLocal, poll_seconds=POLL_SECONDS)
+    listener.start()
+    try:
+        db = SessionLocal()
+        try:
+            assert lookup_cache.is_member(db, course_id, student_id)
+        finally:
+            db.close()
+        ready.put(True)
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if lookup_cache.stats()["members"].size == 0 and not (
+                token_versions.is_current(student_id, 0)
+            ):
+                seen.put(time.time())
+                return
+            time.sleep(0.005)
+        seen.put(None)
+    finally:
+        listener.stop()
+
+
+def test_workers_sharing_a_database_file_see_each_others_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    engine = create_sqlite_engine(url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    db = SessionLocal()
+    instructor = User(email="i@example.com", role="instructor", hashed_password="-")
+    student = User(email="s@example.com", role="student", hashed_password="-")
+    newcomer = User(email="n@example.com", role="student", hashed_password="-")
+    db.add_all([instructor, student, newcomer])
+    db.flush()
+    course = Course(title="Shared", instructor_id=instructor.id)
+    db.add(course)
+    db.flush()
+    db.add(Enrollment(course_id=course.id, student_id=student.id))
+    db.commit()
+
+    ctx = get_context("spawn")
+    ready, seen = ctx.Queue(), ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, args=(url, course.id, student.id, ready, seen))
+        for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in workers:
+            ready.get(timeout=60)
+
+        # this process plays the worker that handles the writes
+        db.add(Enrollment(course_id=course.id, student_id=newcomer.id))
+        lookup_cache.on_enrollments_created(db, course.id)
+        token_versions.revoke(db, student.id)
+        db.commit()
+        committed_at = time.time()
+
+        applied_at = [seen.get(timeout=15) for _ in workers]
+        assert None not in applied_at
+        # a few poll intervals, with room for a loaded CI machine
+        lag = max(applied_at) - committed_at
+        assert lag < 1.0, lag
+    finally:
+        db.close()
+        for worker in workers:
+            worker.join(timeout=15)
+        engine.dispose()
+    assert all(worker.exitcode == 0 for worker in workers)
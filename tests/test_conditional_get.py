@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.utils.etag import etag_matches
+from tests.conftest import auth_header, count_queries, login
+
+STUDENT = "student1@example.com"
+INSTRUCTOR = "instructor1@example.com"
+
+
+def etag_of(client, path: str, headers: dict) -> str:
+    r = client.get(path, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.headers["cache-control"] == "private, no-cache"
+    return r.headers["etag"]
+
+
+@pytest.mark.parametrize(
+    "email,path",
+    [
+        (INSTRUCTOR, "/courses/1/gradebook"),
+        (INSTRUCTOR, "/courses/1/gradebook?format=matrix"),
+        (INSTRUCTOR, "/courses/1/gradebook?format=ndjson"),
+        (INSTRUCTOR, "/courses/1/gradebook/summary"),
+        (INSTRUCTOR, "/courses/1/gradebook/assignments"),
+        (STUDENT, "/courses/1/gradebook/me"),
+        (STUDENT, "/courses/me/dashboard"),
+    ],
+)
+def test_unchanged_reads_answer_304_after_one_lookup(client, email, path):
+    headers = auth_header(login(client, email))
+    etag = etag_of(client, path, headers)
+
+    with count_queries() as statements:
+        r = client.get(path, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert r.content == b""
+    assert len(statements) == 1, statements
+
+
+def test_writes_change_the_course_etag(client):
+    instructor = auth_header(login(client, INSTRUCTOR))
+    student = auth_header(login(client, STUDENT))
+    path = "/courses/1/gradebook"
+    seen = {etag_of(client, path, instructor)}
+
+    def changed() -> bool:
+        etag = etag_of(client, path, instructor)
+        fresh = etag not in seen
+        seen.add(etag)
+        return fresh
+
+    r = client.post(
+        "/assignments/1/submissions", json={"content": "x"}, headers=student
+    )
+    assert r.status_code == 201
+    assert changed()
+
+    submission_id = r.json()["id"]
+    r = client.patch(
+        f"/submissions/{submission_id}/grade", json={"score": 90}, headers=instructor
+    )
+    assert r.status_code == 200
+    assert changed()
+
+    r = client.post(
+        "/courses/1/assignments",
+        json={"title": "HW2", "max_score": 10},
+        headers=instructor,
+    )
+    assert r.status_code == 201
+    assert changed()
+
+    client.post(
+        "/auth/register",
+        json={"email": "student2@example.com", "password": "password123"},
+    )
+    newcomer = auth_header(login(client, "student2@example.com"))
+    r = client.post("/enrollments", json={"course_id": 1}, headers=newcomer)
+    assert r.status_code == 201
+    assert changed()
+
+    # reads alone do not
+    assert not changed()
+
+
+def test_etag_depends_on_the_query(client):
+    headers = auth_header(login(client, INSTRUCTOR))
+
+    plain = etag_of(client, "/courses/1/gradebook", headers)
+    matrix = etag_of(client, "/courses/1/gradebook?format=matrix", headers)
+    graded = etag_of(client, "/courses/1/gradebook?status=graded", headers)
+    assert len({plain, matrix, graded}) == 3
+
+    r = client.get(
+        "/courses/1/gradebook?format=matrix",
+        headers={**headers, "If-None-Match": plain},
+    )
+    assert r.status_code == 200
+
+
+def test_access_is_checked_before_304(client):
+    student = auth_header(login(client, STUDENT))
+    etag = etag_of(client, "/courses/1/gradebook/me", student)
+
+    # the instructor is not enrolled, and cannot reuse the student's ETag
+    instructor = auth_header(login(client, INSTRUCTOR))
+    r = client.get(
+        "/courses/1/gradebook/me", headers={**instructor, "If-None-Match": etag}
+    )
+    assert r.status_code == 403
+
+
+def test_dashboard_etag_moves_with_the_clock(client, monkeypatch):
+    instructor = auth_header(login(client, INSTRUCTOR))
+    student = auth_header(login(client, STUDENT))
+    due = datetime.now(timezone.utc) + timedelta(hours=2)
+    r = client.post(
+        "/courses/1/assignments",
+        json={"title": "HW2", "max_score": 10, "due_at": due.isoformat()},
+        headers=instructor,
+    )
+    assert r.status_code == 201
+
+    before = etag_of(client, "/courses/me/dashboard", student)
+
+    class Later(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(days=2)
+
+    # nothing was written, but HW1 and HW2 are overdue now
+    monkeypatch.setattr("app.routers.courses.datetime", Later)
+    r = client.get(
+        "/courses/me/dashboard", headers={**student, "If-None-Match": before}
+    )
+    assert r.status_code == 200
+    assert r.json()[0]["next_due_is_overdue"] is True
+    assert r.headers["etag"] != before
+
+
+def test_if_none_match_parsing():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.assignment import Assignment
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.submission import Submission
+from app.models.user import User
+from app.services import grade_stats
+from tests.conftest import TestingSessionLocal, auth_header, count_queries, login
+
+
+def add_courses(n: int) -> None:
+    """Enroll student1 in `n` more courses, each with two assignments."""
+    db = TestingSessionLocal()
+    try:
+        student = db.query(User).filter(User.email == "student1@example.com").one()
+        instructor = (
+            db.query(User).filter(User.email == "instructor1@example.com").one()
+        )
+        due = datetime.now(timezone.utc) + timedelta(days=3)
+        for i in range(n):
+            course = Course(title=f"Extra {i}", instructor_id=instructor.id)
+            db.add(course)
+            db.flush()
+            db.add(Enrollment(course_id=course.id, student_id=student.id))
+            db.add_all(
+                [
+                    Assignment(
+                        course_id=course.id, title="A", due_at=due, max_score=10
+                    ),
+                    Assignment(
+                        course_id=course.id, title="B", due_at=None, max_score=10
+                    ),
+                ]
+            )
+        db.flush()
+        grade_stats.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_dashboard_aggregates_and_next_due(client):
+    student = login(client, "student1@example.com", "password123")
+
+    db = TestingSessionLocal()
+    try:
+        hw2 = Assignment(
+            course_id=1,
+            title="HW2",
+            due_at=datetime.now(timezone.utc) + timedelta(days=5),
+            max_score=100,
+        )
+        db.add(hw2)
+        db.add(
+            Submission(
+                assignment_id=1,
+                student_id=1,
+                content="done",
+                submitted_at=datetime.now(timezone.utc),
+                score=80,
+            )
+        )
+        db.flush()
+        grade_stats.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+
+    r = client.get("/courses/me/dashboard", headers=auth_header(student))
+    assert r.status_code == 200, r.text
+    [row] = r.json()
+    assert row["course_id"] == 1
+    assert row["total_assignments"] == 2
+    assert row["submitted"] == 1
+    assert row["missing"] == 1
+    assert row["graded"] == 1
+    assert row["average_grade"] == 80.0
+    # HW1 is submitted, so HW2 is next even though HW1 is due sooner
+    assert row["next_due_title"] == "HW2"
+    assert row["next_due_is_overdue"] is False
+
+
+def test_dashboard_query_count_is_constant(client):
+    student = login(client, "student1@example.com", "password123")
+    headers = auth_header(student)
+
+    with count_queries() as one_course:
+        r = client.get("/courses/me/dashboard", headers=headers)
+    assert r.status_code == 200
+    assert len(r.json()) == 1
+
+    add_courses(8)
+
+    with count_queries() as many_courses:
+        r = client.get("/courses/me/dashboard", headers=headers)
+    assert r.status_code == 200
+    rows = r.json()
+    assert len(rows) == 9
+    assert all(row["total_assignments"] == 2 for row in rows[1:])
+    assert all(row["next_due_title"] == "A" for row in rows[1:])
+
+    assert len(many_courses) == len(one_course)
+
+
+def test_instructor_dashboard_counts(client):
+    instructor = login(client, "instructor1@example.com", "password123")
+    student = login(client, "student1@example.com", "password123")
+
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(student),
+        json={"content": "hw1"},
+    )
+    assert r.status_code == 201, r.text
+
+    r = client.get("/instructor/dashboard", headers=auth_header(instructor))
+    assert r.status_code == 200, r.text
+    assert r.json() == [
+        {
+            "course_id": 1,
+            "course_title": "CS5004",
+            "total_students": 1,
+            "total_assignments": 1,
+            "total_submissions": 1,
+            "ungraded_submissions": 1,
+        }
+    ]
+
+
+def test_instructor_dashboard_query_count_is_constant(client):
+    instructor = login(client, "instructor1@example.com", "password123")
+    headers = auth_header(instructor)
+
+    with count_queries() as one_course:
+        r = client.get("/instructor/dashboard", headers=headers)
+    assert r.status_code == 200
+    assert len(r.json()) == 1
+
+    add_courses(8)
+
+    with count_queries() as many_courses:
+        r = client.get("/instructor/dashboard", headers=headers)
+    assert r.status_code == 200
+    rows = r.json()
+    assert len(rows) == 9
+    assert all(row["total_students"] == 1 for row in rows)
+    assert all(row["total_assignments"] == 2 for row in rows[1:])
+
+    assert len(many_courses) == len(one_course)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import SQLITE_PRAGMAS
+from app.db.session import create_async_sqlite_engine, create_sqlite_engine
+
+
+@pytest.fixture()
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pragmas.db'}"
+    writer = create_sqlite_engine(url)
+    reader = create_sqlite_engine(url, read_only=True)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+    yield writer, reader
+    reader.dispose()
+    writer.dispose()
+
+
+def pragma(conn, name: str):
+    return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_connections_get_pragma_profile(engines):
+    writer, reader = engines
+    for engine in (writer, reader):
+        with engine.connect() as conn:
+            assert pragma(conn, "journal_mode") == "wal"
+            assert pragma(conn, "synchronous") == 1  # NORMAL
+            assert pragma(conn, "busy_timeout") == SQLITE_PRAGMAS["busy_timeout"]
+            assert pragma(conn, "cache_size") == SQLITE_PRAGMAS["cache_size"]
+            assert pragma(conn, "query_only") == (engine is reader)
+
+
+def test_read_only_engine_refuses_writes(engines):
+    _, reader = engines
+    with reader.connect() as conn, pytest.raises(OperationalError):
+        conn.execute(text("INSERT INTO t VALUES (2)"))
+
+
+def test_reader_is_not_blocked_by_open_write_transaction(engines):
+    writer, reader = engines
+    with writer.connect() as w:
+        w.execute(text("BEGIN IMMEDIATE"))
+        w.execute(text("INSERT INTO t VALUES (2)"))
+
+        # WAL: the reader sees the last committed state instead of waiting
+        with reader.connect() as r:
+            assert r.execute(text("SELECT count(*) FROM t")).scalar() == 1
+
+        w.execute(text("COMMIT"))
+
+    with reader.connect() as r:
+        assert r.execute(text("SELECT count(*) FROM t")).scalar() == 2
+
+
+def test_async_engine_gets_same_profile(engines, tmp_path):
+    reader = create_async_sqlite_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}", read_only=True
+    )
+
+    async def check():
+        try:
+            async with reader.connect() as conn:
+                assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == (
+                    "wal"
+                )
+                assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 1
+                assert (await conn.execute(text("SELECT x FROM t"))).scalar() == 1
+        finally:
+            await reader.dispose()
+
+    asyncio.run(check())
@@ -0,0 +1,196 @@
+import json
+
+import pytest
+
+from app.core.security import hash_password
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from tests.conftest import TestingSessionLocal, auth_header, login
+from tests.test_grade_stats import rebuilt_snapshot, stats_snapshot
+
+
+@pytest.fixture()
+def roster_students():
+    """Ten registered (not yet enrolled) students: roster0..roster9."""
+    db = TestingSessionLocal()
+    try:
+        hashed = hash_password("password123")
+        db.add_all(
+            User(email=f"roster{i}@example.com", role="student", hashed_password=hashed)
+            for i in range(10)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def enrolled_emails(course_id: int = 1) -> list[str]:
+    db = TestingSessionLocal()
+    try:
+        return sorted(
+            email
+            for (email,) in db.query(User.email)
+            .join(Enrollment, Enrollment.student_id == User.id)
+            .filter(Enrollment.course_id == course_id)
+        )
+    finally:
+        db.close()
+
+
+def import_roster(client, token: str, body, content_type: str, course_id: int = 1):
+    return client.post(
+        "/enrollments/bulk",
+        params={"course_id": course_id},
+        headers={**auth_header(token), "Content-Type": content_type},
+        content=body,
+    )
+
+
+def test_csv_roster_import_reports_each_outcome(client, roster_students):
+    instructor = login(client, "instructor1@example.com", "password123")
+    csv_body = "\n".join(
+        [
+            "name,Email",
+            "R0,roster0@example.com",
+            "R1, roster1@example.com ",
+            "",
+            "S1,student1@example.com",  # already enrolled by the seed
+            "R0 again,roster0@example.com",
+            "Ghost,ghost@example.com",
+            "Teacher,instructor1@example.com",
+            "No email,",
+        ]
+    )
+
+    r = import_roster(client, instructor, csv_body, "text/csv")
+    assert r.status_code == 200, r.text
+    summary = r.json()
+    assert (
+        summary["rows"],
+        summary["enrolled"],
+        summary["already_enrolled"],
+        summary["rejected"],
+        summary["chunks_committed"],
+    ) == (7, 2, 2, 3, 1)
+    assert [(e["line"], e["error"]) for e in summary["errors"]] == [
+        (7, "unknown email"),
+        (8, "not a student account"),
+        (9, "missing email"),
+    ]
+
+    assert enrolled_emails() == [
+        "roster0@example.com",
+        "roster1@example.com",
+        "student1@example.com",
+    ]
+    assert stats_snapshot() == rebuilt_snapshot()
+
+
+def test_ndjson_roster_import_commits_in_chunks(client, roster_students, monkeypatch):
+    monkeypatch.setattr("app.routers.enrollments.ROSTER_IMPORT_CHUNK_SIZE", 3)
+    instructor = login(client, "instructor1@example.com", "password123")
+
+    lines = [json.dumps({"email": f"roster{i}@example.com"}) for i in range(10)]
+    lines.insert(4, "{not json")
+
+    def stream():
+        # arbitrary chunk boundaries, including mid-line splits
+        body = ("\n".join(lines) + "\n").encode()
+        for start in range(0, len(body), 17):
+            yield body[start : start + 17]
+
+    r = import_roster(client, instructor, stream(), "application/x-ndjson")
+    assert r.status_code == 200, r.text
+    summary = r.json()
+    assert (summary["rows"], summary["enrolled"], summary["rejected"]) == (11, 10, 1)
+    assert summary["chunks_committed"] == 4
+    assert summary["errors"] == [{"line": 5, "email": None, "error": "invalid JSON"}]
+    assert len(enrolled_emails()) == 11
+
+    # importing the same roster again adds nothing
+    r = import_roster(client, instructor, "\n".join(lines), "application/x-ndjson")
+    assert (r.json()["enrolled"], r.json()["already_enrolled"]) == (0, 10)
+    assert stats_snapshot() == rebuilt_snapshot()
+
+
+def test_csv_roster_import_handles_quoted_newlines_and_long_lines(
+    client, roster_students
+):
+    from app.services.roster_import import MAX_LINE_BYTES
+
+    instructor = login(client, "instructor1@example.com", "password123")
+    lines = [
+        "name,email",
+        '"R0',
+        'second line",roster0@example.com',
+        "R1,roster1@example.com",
+        "x" * MAX_LINE_BYTES + ",roster2@example.com",
+        'R3 O"Brien,roster3@example.com',  # a stray quote is just a character
+        '"R4 "x",roster4@example.com',
+        '"R5,roster5@example.com',
+        "R6,roster6@example.com",
+    ]
+
+    def stream():
+        body = "\n".join(lines).encode()
+        for start in range(0, len(body), 100):
+            yield body[start : start + 100]
+
+    r = import_roster(client, instructor, stream(), "text/csv")
+    assert r.status_code == 200, r.text
+    summary = r.json()
+    assert (summary["rows"], summary["enrolled"], summary["rejected"]) == (7, 4, 3)
+    assert [(e["line"], e["error"]) for e in summary["errors"]] == [
+        (5, f"line longer than {MAX_LINE_BYTES} bytes"),
+        (7, "malformed CSV: ',' expected after '\"'"),
+        (8, "unterminated quoted field"),
+    ]
+    # the open quote on line 8 does not swallow the rows after it
+    assert [e for e in enrolled_emails() if e.startswith("roster")] == [
+        "roster0@example.com",
+        "roster1@example.com",
+        "roster3@example.com",
+        "roster6@example.com",
+    ]
+
+
+def test_roster_import_queries_per_chunk_not_per_row(
+    client, roster_students, monkeypatch
+):
+    from tests.conftest import count_queries
+
+    monkeypatch.setattr("app.routers.enrollments.ROSTER_IMPORT_CHUNK_SIZE", 100)
+    instructor = login(client, "instructor1@example.com", "password123")
+
+    def run(n: int) -> int:
+        body = "email\n" + "\n".join(f"roster{i}@example.com" for i in range(n))
+        with count_queries() as statements:
+            r = import_roster(client, instructor, body, "text/csv")
+        assert r.status_code == 200, r.text
+        return len(statements)
+
+    run(1)  # warm the course lookup cache
+    assert run(2) == run(10)
+
+
+def test_roster_import_rejects_bad_uploads(client):
+    instructor = login(client, "instructor1@example.com", "password123")
+
+    r = import_roster(client, instructor, "name\nx", "text/csv")
+    assert r.status_code == 400
+
+    r = import_roster(client, instructor, "email," + "x" * 5000 + "\nx", "text/csv")
+    assert r.status_code == 400
+
+    r = import_roster(client, instructor, "{}", "application/json")
+    assert r.status_code == 415
+
+
+def test_roster_import_requires_course_instructor(client):
+    student = login(client, "student1@example.com", "password123")
+    r = import_roster(client, student, "email\nx@example.com", "text/csv")
+    assert r.status_code == 403
+
+    instructor = login(client, "instructor1@example.com", "password123")
+    r = import_roster(client, instructor, "email\nx", "text/csv", course_id=999)
+    assert r.status_code == 404
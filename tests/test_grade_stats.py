@@ -0,0 +1,181 @@
+from app.models.grade_stats import CourseAssignmentStats, CourseStudentStats
+from app.services import grade_stats
+from tests.conftest import TestingSessionLocal, auth_header, login
+
+
+def stats_snapshot() -> tuple[list, list]:
+    db = TestingSessionLocal()
+    try:
+        students = [
+            (r.course_id, r.student_id, r.total_assignments, r.submitted, r.graded)
+            + (r.score_sum,)
+            for r in db.query(CourseStudentStats).order_by(
+                CourseStudentStats.course_id, CourseStudentStats.student_id
+            )
+        ]
+        assignments = [
+            (r.course_id, r.assignment_id, r.total_students, r.submitted, r.graded)
+            + (r.score_sum,)
+            for r in db.query(CourseAssignmentStats).order_by(
+                CourseAssignmentStats.course_id, CourseAssignmentStats.assignment_id
+            )
+        ]
+        return students, assignments
+    finally:
+        db.close()
+
+
+def rebuilt_snapshot() -> tuple[list, list]:
+    db = TestingSessionLocal()
+    try:
+        grade_stats.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    return stats_snapshot()
+
+
+def test_write_paths_keep_stats_in_step(client):
+    instructor = auth_header(login(client, "instructor1@example.com", "password123"))
+    student1 = auth_header(login(client, "student1@example.com", "password123"))
+
+    r = client.post(
+        "/auth/register",
+        json={"email": "student2@example.com", "password": "password123"},
+    )
+    assert r.status_code == 201, r.text
+    student2 = auth_header(login(client, "student2@example.com", "password123"))
+
+    r = client.post("/enrollments", headers=student2, json={"course_id": 1})
+    assert r.status_code == 201, r.text
+
+    r = client.post(
+        "/courses/1/assignments",
+        headers=instructor,
+        json={"title": "HW2", "max_score": 50},
+    )
+    assert r.status_code == 201, r.text
+    hw2 = r.json()["id"]
+
+    r = client.post(
+        "/assignments/1/submissions", headers=student1, json={"content": "x"}
+    )
+    assert r.status_code == 201, r.text
+    sub1 = r.json()["id"]
+    r = client.post(
+        f"/assignments/{hw2}/submissions", headers=student2, json={"content": "x"}
+    )
+    assert r.status_code == 201, r.text
+
+    r = client.patch(
+        f"/submissions/{sub1}/grade", headers=instructor, json={"score": 90}
+    )
+    assert r.status_code == 200, r.text
+
+    summary = client.get("/courses/1/gradebook/summary", headers=instructor).json()
+    assert [
+        (s["student_email"], s["total_assignments"], s["submitted"], s["graded"])
+        for s in summary
+    ] == [("student1@example.com", 2, 1, 1), ("student2@example.com", 2, 1, 0)]
+    assert summary[0]["average_grade"] == 90.0
+    assert summary[1]["missing"] == 1
+
+    per_assignment = client.get(
+        "/courses/1/gradebook/assignments", headers=instructor
+    ).json()
+    assert [
+        (a["total_students"], a["submitted"], a["graded"], a["missing"])
+        for a in per_assignment
+    ] == [(2, 1, 1, 1), (2, 1, 0, 1)]
+
+    # incremental maintenance and a full rebuild must agree
+    assert stats_snapshot() == rebuilt_snapshot()
+
+
+def test_summary_lists_nobody_until_the_course_has_assignments(client):
+    instructor = auth_header(login(client, "instructor1@example.com", "password123"))
+    student = auth_header(login(client, "student1@example.com", "password123"))
+
+    r = client.post("/courses/", headers=instructor, json={"title": "Empty"})
+    assert r.status_code == 201, r.text
+    course_id = r.json()["id"]
+    r = client.post("/enrollments", headers=student, json={"course_id": course_id})
+    assert r.status_code == 201, r.text
+
+    path = f"/courses/{course_id}/gradebook/summary"
+    assert client.get(path, headers=instructor).json() == []
+
+    r = client.post(
+        f"/courses/{course_id}/assignments",
+        headers=instructor,
+        json={"title": "HW1", "max_score": 10},
+    )
+    assert r.status_code == 201, r.text
+    [row] = client.get(path, headers=instructor).json()
+    assert row["student_email"] == "student1@example.com"
+    assert row["total_assignments"] == row["missing"] == 1
+
+
+def test_resubmission_clears_graded_count(client):
+    instructor = auth_header(login(client, "instructor1@example.com", "password123"))
+    student = auth_header(login(client, "student1@example.com", "password123"))
+
+    r = client.post(
+        "/assignments/1/submissions", headers=student, json={"content": "x"}
+    )
+    sub_id = r.json()["id"]
+    client.patch(f"/submissions/{sub_id}/grade", headers=instructor, json={"score": 70})
+
+    r = client.post(
+        "/assignments/1/submissions", headers=student, json={"content": "x"}
+    )
+    assert r.status_code == 201, r.text
+
+    [row] = client.get("/courses/1/gradebook/assignments", headers=instructor).json()
+    assert row["submitted"] == 1
+    assert row["graded"] == 0
+    assert row["average_grade"] is None
+    assert stats_snapshot() == rebuilt_snapshot()
+
+
+def test_bulk_grading_keeps_stats_in_step(client):
+    instructor = auth_header(login(client, "instructor1@example.com", "password123"))
+    student = auth_header(login(client, "student1@example.com", "password123"))
+
+    r = client.post(
+        "/assignments/1/submissions", headers=student, json={"content": "x"}
+    )
+    student_id = r.json()["student_id"]
+    r = client.patch(
+        "/assignments/1/grades",
+        headers=instructor,
+        json={"grades": [{"student_id": student_id, "score": 40}]},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["graded"] == 1
+
+    [row] = client.get("/courses/1/gradebook/assignments", headers=instructor).json()
+    assert (row["graded"], row["average_grade"]) == (1, 40.0)
+    assert stats_snapshot() == rebuilt_snapshot()
+
+
+def test_repeated_hooks_do_not_drift_totals():
+    from app.models.assignment import Assignment
+    from app.models.enrollment import Enrollment
+
+    db = TestingSessionLocal()
+    try:
+        enrollment = db.query(Enrollment).first()
+        assignment = db.query(Assignment).first()
+        course_id, student_id = enrollment.course_id, enrollment.student_id
+
+        # duplicate calls, and ids that were never inserted
+        for _ in range(2):
+            grade_stats.on_enrollment_created(db, course_id, student_id)
+            grade_stats.on_enrollments_created(db, course_id, [student_id, 9999])
+            grade_stats.on_assignment_created(db, course_id, assignment.id)
+        db.commit()
+    finally:
+        db.close()
+
+    assert stats_snapshot() == rebuilt_snapshot()
@@ -1,44 +1,73 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
 import pytest
-from fastapi.testclient import TestClient
 
-from app.main import app
+from app.core.security import hash_password
+from app.models.assignment import Assignment
+from app.models.enrollment import Enrollment
+from app.models.submission import Submission
+from app.models.user import User
+from app.services.late_policy import late_penalty
+from tests.conftest import auth_header, login
 
-client = TestClient(app)
 
+@pytest.fixture()
+def instructor_token(client):
+    # adjust if your seed users differ
+    return login(client, "instructor1@example.com", "password123")
 
-def login(email: str, password: str) -> str:
-    r = client.post("/auth/login", json={"email": email, "password": password})
-    assert r.status_code == 200, r.text
-    return r.json()["access_token"]
 
+@pytest.fixture()
+def student_token(client):
+    return login(client, "student1@example.com", "password123")
 
-def auth_header(token: str) -> dict:
-    return {"Authorization": f"Bearer {token}"}
 
+@pytest.fixture()
+def bigger_course():
+    """Add a few students and assignments (one without a due date) to course 1."""
+    from tests.conftest import TestingSessionLocal
 
-@pytest.fixture(scope="module")
-def instructor_token():
-    # adjust if your seed users differ
-    return login("instructor1@example.com", "password123")
+    db = TestingSessionLocal()
+    try:
+        hashed = hash_password("password123")
+        students = [
+            User(
+                email=f"student{i}@example.com", role="student", hashed_password=hashed
+            )
+            for i in range(2, 5)
+        ]
+        db.add_all(students)
+        db.flush()
+        db.add_all(Enrollment(course_id=1, student_id=s.id) for s in students)
 
+        due = datetime.now(timezone.utc) + timedelta(days=2)
+        db.add_all(
+            [
+                Assignment(course_id=1, title="HW2", due_at=due, max_score=100),
+                Assignment(course_id=1, title="HW3", due_at=due, max_score=100),
+                Assignment(course_id=1, title="Project", due_at=None, max_score=100),
+            ]
+        )
+        db.commit()
+    finally:
+        db.close()
 
-@pytest.fixture(scope="module")
-def student_token():
-    return login("student1@example.com", "password123")
 
-
-def test_student_cannot_view_instructor_gradebook(student_token):
+def test_student_cannot_view_instructor_gradebook(client, student_token):
     r = client.get("/courses/1/gradebook", headers=auth_header(student_token))
     assert r.status_code == 403
 
 
-def test_instructor_can_view_gradebook(instructor_token):
+def test_instructor_can_view_gradebook(client, instructor_token):
     r = client.get("/courses/1/gradebook", headers=auth_header(instructor_token))
     assert r.status_code == 200
     assert isinstance(r.json(), list)
 
 
-def test_student_can_view_my_gradebook(student_token):
+def test_student_can_view_my_gradebook(client, student_token):
     r = client.get("/courses/1/gradebook/me", headers=auth_header(student_token))
     assert r.status_code == 200
     data = r.json()
@@ -47,10 +76,223 @@ def test_student_can_view_my_gradebook(student_token):
     assert all(row["student_email"] == "student1@example.com" for row in data)
 
 
-def test_gradebook_rows_have_late_fields(instructor_token):
+def test_gradebook_rows_have_late_fields(client, instructor_token):
     r = client.get("/courses/1/gradebook", headers=auth_header(instructor_token))
     assert r.status_code == 200
     rows = r.json()
     if rows:
         assert "is_late" in rows[0]
         assert "late_by_minutes" in rows[0]
+
+
+def test_gradebook_keyset_pages_match_full_listing(
+    client, instructor_token, bigger_course
+):
+    headers = auth_header(instructor_token)
+    full = client.get("/courses/1/gradebook", headers=headers).json()
+    assert len(full) == 16  # 4 students x 4 assignments
+
+    paged = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/courses/1/gradebook", headers=headers, params=params)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        assert len(page) <= 3
+        paged.extend(page)
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert paged == full
+
+
+def test_gradebook_rejects_bad_cursor(client, instructor_token):
+    r = client.get(
+        "/courses/1/gradebook",
+        headers=auth_header(instructor_token),
+        params={"cursor": "not-a-cursor"},
+    )
+    assert r.status_code == 400
+
+
+def test_gradebook_ndjson_stream_matches_json(client, instructor_token, bigger_course):
+    headers = auth_header(instructor_token)
+    full = client.get("/courses/1/gradebook", headers=headers).json()
+
+    r = client.get("/courses/1/gradebook", headers=headers, params={"format": "ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    streamed = [json.loads(line) for line in r.text.splitlines()]
+    assert streamed == full
+
+
+@pytest.fixture()
+def hw1_submissions(bigger_course):
+    """HW1 submissions for students 1-3: on time, within grace, two days late."""
+    from tests.conftest import TestingSessionLocal
+
+    db = TestingSessionLocal()
+    try:
+        hw1 = db.query(Assignment).filter(Assignment.id == 1).one()
+        offsets = {
+            "student1@example.com": timedelta(hours=-2),
+            "student2@example.com": timedelta(minutes=5, seconds=30),
+            "student3@example.com": timedelta(days=2, minutes=3),
+        }
+        for email, offset in offsets.items():
+            student = db.query(User).filter(User.email == email).one()
+            db.add(
+                Submission(
+                    assignment_id=hw1.id,
+                    student_id=student.id,
+                    content="hw1",
+                    submitted_at=hw1.due_at + offset,
+                    score=75 if email == "student3@example.com" else None,
+                )
+            )
+        db.commit()
+        return hw1.due_at, offsets
+    finally:
+        db.close()
+
+
+def test_gradebook_late_fields_match_late_policy(
+    client, instructor_token, hw1_submissions
+):
+    due_at, offsets = hw1_submissions
+    rows = client.get(
+        "/courses/1/gradebook", headers=auth_header(instructor_token)
+    ).json()
+
+    hw1_rows = {r["student_email"]: r for r in rows if r["assignment_id"] == 1}
+    for email, offset in offsets.items():
+        is_late, minutes, _days, _mult = late_penalty(due_at, due_at + offset)
+        assert hw1_rows[email]["is_late"] is is_late
+        assert hw1_rows[email]["late_by_minutes"] == (minutes or None)
+
+    assert hw1_rows["student1@example.com"]["status"] == "submitted"
+    assert hw1_rows["student3@example.com"]["status"] == "graded"
+    assert hw1_rows["student4@example.com"]["status"] == "missing"
+    assert hw1_rows["student4@example.com"]["late_by_minutes"] is None
+
+
+def test_gradebook_filters_by_status_and_lateness(
+    client, instructor_token, hw1_submissions
+):
+    headers = auth_header(instructor_token)
+
+    def fetch(**params):
+        r = client.get("/courses/1/gradebook", headers=headers, params=params)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    everything = fetch()
+    for status_val in ("missing", "submitted", "graded"):
+        rows = fetch(status=status_val)
+        assert rows == [r for r in everything if r["status"] == status_val]
+
+    late_rows = fetch(late="true")
+    assert [(r["student_email"], r["assignment_id"]) for r in late_rows] == [
+        ("student3@example.com", 1)
+    ]
+    assert len(fetch(late="false")) == len(everything) - 1
+
+    r = client.get("/courses/1/gradebook", headers=headers, params={"status": "x"})
+    assert r.status_code == 422
+
+
+def test_my_gradebook_status_filter(client, student_token, hw1_submissions):
+    r = client.get(
+        "/courses/1/gradebook/me",
+        headers=auth_header(student_token),
+        params={"status": "missing"},
+    )
+    assert r.status_code == 200
+    assert [row["assignment_title"] for row in r.json()] == ["HW2", "HW3", "Project"]
+
+
+def test_gradebook_csv_export_matches_json(client, instructor_token, hw1_submissions):
+    headers = auth_header(instructor_token)
+    expected = client.get("/courses/1/gradebook", headers=headers).json()
+
+    r = client.get("/courses/1/gradebook/export.csv", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    assert "course-1-gradebook.csv" in r.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == len(expected)
+    for row, exp in zip(rows, expected):
+        assert row["student_email"] == exp["student_email"]
+        assert int(row["assignment_id"]) == exp["assignment_id"]
+        assert row["status"] == exp["status"]
+        assert row["is_late"] == ("true" if exp["is_late"] else "false")
+        assert row["late_by_minutes"] == str(exp["late_by_minutes"] or "")
+
+
+def test_gradebook_tsv_export(client, instructor_token, student_token):
+    r = client.get(
+        "/courses/1/gradebook/export.tsv", headers=auth_header(instructor_token)
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/tab-separated-values")
+    header, *lines = r.text.splitlines()
+    assert header.split("\t")[:2] == ["student_id", "student_email"]
+    assert len(lines) == 1
+
+    r = client.get(
+        "/courses/1/gradebook/export.tsv", headers=auth_header(student_token)
+    )
+    assert r.status_code == 403
+
+
+def test_gradebook_matrix_matches_long_format(
+    client, instructor_token, hw1_submissions
+):
+    headers = auth_header(instructor_token)
+    long_rows = client.get("/courses/1/gradebook", headers=headers).json()
+
+    r = client.get("/courses/1/gradebook", headers=headers, params={"format": "matrix"})
+    assert r.status_code == 200, r.text
+    matrix = r.json()
+
+    emails = [s["email"] for s in matrix["students"]]
+    assert emails == sorted(emails)
+    assert matrix["assignments"][-1]["title"] == "Project"  # no due date sorts last
+
+    rebuilt = []
+    for i, student in enumerate(matrix["students"]):
+        for j, assignment in enumerate(matrix["assignments"]):
+            rebuilt.append(
+                (
+                    student["email"],
+                    assignment["id"],
+                    matrix["grades"][i][j],
+                    matrix["status_codes"][matrix["status"][i][j]],
+                    matrix["late_by_minutes"][i][j],
+                )
+            )
+    expected = [
+        (
+            r["student_email"],
+            r["assignment_id"],
+            r["grade"],
+            r["status"],
+            r["late_by_minutes"],
+        )
+        for r in long_rows
+    ]
+    assert rebuilt == expected
+
+
+def test_gradebook_matrix_rejects_row_parameters(client, instructor_token):
+    r = client.get(
+        "/courses/1/gradebook",
+        headers=auth_header(instructor_token),
+        params={"format": "matrix", "limit": 10},
+    )
+    assert r.status_code == 400
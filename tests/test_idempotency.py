@@ -0,0 +1,344 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.idempotency import IdempotencyKey
+from app.models.submission import Submission
+from app.routers import submissions
+from app.services import idempotency
+from app.workers.idempotency_sweeper import IdempotencySweeper
+from tests.conftest import TestingSessionLocal, auth_header, count_queries, login
+
+
+def hold_write(monkeypatch, name: str, until: threading.Event) -> list:
+    """
+    Make submissions.<name> (the write behind a route) wait for `until`
+    (or 10 s) before running. Returns the list of calls it gets.
+    """
+    calls = []
+    write = getattr(submissions, name)
+
+    def held(*args):
+        calls.append(1)
+        until.wait(timeout=10)
+        return write(*args)
+
+    monkeypatch.setattr(submissions, name, held)
+    return calls
+
+
+def watch_for_claims(monkeypatch) -> threading.Event:
+    """Set once a request finds its key claimed by one still running."""
+    seen = threading.Event()
+    lookup = idempotency.lookup
+
+    def watched(*args):
+        stored = lookup(*args)
+        if stored is not None and stored.pending:
+            seen.set()
+        return stored
+
+    monkeypatch.setattr(idempotency, "lookup", watched)
+    return seen
+
+
+def test_submit_replay_returns_stored_response(client):
+    student = login(client, "student1@example.com", "password123")
+    headers = auth_header(student, "submit-1")
+
+    first = client.post(
+        "/assignments/1/submissions", headers=headers, json={"content": "v1"}
+    )
+    assert first.status_code == 201, first.text
+    assert "Idempotent-Replayed" not in first.headers
+
+    for _ in range(2):
+        with count_queries() as statements:
+            again = client.post(
+                "/assignments/1/submissions", headers=headers, json={"content": "v1"}
+            )
+        assert again.status_code == 201
+        assert again.headers["Idempotent-Replayed"] == "true"
+        assert again.json() == first.json()
+        assert not any("submissions" in s for s in statements)
+
+    # the second replay came from the in-process cache
+    assert not any("idempotency_keys" in s for s in statements)
+
+
+def test_retried_submit_does_not_clear_grade(client):
+    student = login(client, "student1@example.com", "password123")
+    instructor = login(client, "instructor1@example.com", "password123")
+
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(student, "submit-1"),
+        json={"content": "v1"},
+    )
+    sub_id = r.json()["id"]
+    r = client.patch(
+        f"/submissions/{sub_id}/grade",
+        headers=auth_header(instructor),
+        json={"score": 88},
+    )
+    assert r.status_code == 200, r.text
+
+    # a retry of the original submit (e.g. after a client timeout)
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(student, "submit-1"),
+        json={"content": "v1"},
+    )
+    assert r.headers["Idempotent-Replayed"] == "true"
+
+    db = TestingSessionLocal()
+    try:
+        assert db.get(Submission, sub_id).score == 88
+    finally:
+        db.close()
+
+
+def test_group_committed_submit_stores_response_in_batch(client, group_commit_writer):
+    student = login(client, "student1@example.com", "password123")
+    instructor = login(client, "instructor1@example.com", "password123")
+    headers = auth_header(student, "submit-1")
+
+    first = client.post(
+        "/assignments/1/submissions", headers=headers, json={"content": "v1"}
+    )
+    assert first.status_code == 201, first.text
+    r = client.patch(
+        f"/submissions/{first.json()['id']}/grade",
+        headers=auth_header(instructor),
+        json={"score": 88},
+    )
+    assert r.status_code == 200, r.text
+
+    again = client.post(
+        "/assignments/1/submissions", headers=headers, json={"content": "v1"}
+    )
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json() == first.json()
+    assert group_commit_writer.batches == 1
+
+
+def test_failed_response_store_rolls_back_group_committed_submit(
+    client, monkeypatch, group_commit_writer
+):
+    student = login(client, "student1@example.com", "password123")
+    headers = auth_header(student, "submit-1")
+
+    def fail(*args):
+        raise RuntimeError("response store failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(idempotency, "complete", fail)
+        with pytest.raises(RuntimeError):
+            client.post(
+                "/assignments/1/submissions", headers=headers, json={"content": "v1"}
+            )
+
+    # nothing was acknowledged, so nothing was written and the key is free
+    db = TestingSessionLocal()
+    try:
+        assert db.query(Submission).count() == 0
+        assert db.query(IdempotencyKey).count() == 0
+    finally:
+        db.close()
+
+    r = client.post(
+        "/assignments/1/submissions", headers=headers, json={"content": "v1"}
+    )
+    assert r.status_code == 201, r.text
+    assert "Idempotent-Replayed" not in r.headers
+
+
+def test_grade_replay_keeps_original_grading(client):
+    student = login(client, "student1@example.com", "password123")
+    instructor = login(client, "instructor1@example.com", "password123")
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(student),
+        json={"content": "v1"},
+    )
+    sub_id = r.json()["id"]
+
+    headers = auth_header(instructor, "grade-1")
+    first = client.patch(
+        f"/submissions/{sub_id}/grade", headers=headers, json={"score": 70}
+    )
+    again = client.patch(
+        f"/submissions/{sub_id}/grade", headers=headers, json={"score": 70}
+    )
+    assert first.status_code == again.status_code == 200
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json() == first.json()
+
+
+@pytest.mark.parametrize("route", ["submit", "grade"])
+def test_concurrent_requests_with_one_key_write_once(client, monkeypatch, route):
+    if route == "submit":
+        token = login(client, "student1@example.com", "password123")
+        write = "upsert_submission"
+
+        def send(_=None):
+            return client.post(
+                "/assignments/1/submissions",
+                headers=auth_header(token, "key-1"),
+                json={"content": "v1"},
+            )
+
+    else:
+        student = login(client, "student1@example.com", "password123")
+        sub_id = client.post(
+            "/assignments/1/submissions",
+            headers=auth_header(student),
+            json={"content": "v1"},
+        ).json()["id"]
+        token = login(client, "instructor1@example.com", "password123")
+        write = "_grade"
+
+        def send(_=None):
+            return client.patch(
+                f"/submissions/{sub_id}/grade",
+                headers=auth_header(token, "key-1"),
+                json={"score": 70},
+            )
+
+    # the first request's write waits until the second has found the claim
+    writes = hold_write(monkeypatch, write, watch_for_claims(monkeypatch))
+    with ThreadPoolExecutor(2) as pool:
+        responses = list(pool.map(send, range(2)))
+
+    assert writes == [1]
+    assert responses[0].status_code == responses[1].status_code
+    assert responses[0].status_code in (200, 201), responses[0].text
+    assert responses[0].json() == responses[1].json()
+    replayed = sorted("Idempotent-Replayed" in r.headers for r in responses)
+    assert replayed == [False, True]
+
+
+def test_request_still_running_with_the_key_gets_409(client, monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_SECONDS", 0)
+    student = login(client, "student1@example.com", "password123")
+    headers = auth_header(student, "submit-1")
+
+    def send():
+        return client.post(
+            "/assignments/1/submissions", headers=headers, json={"content": "v1"}
+        )
+
+    released = threading.Event()
+    writes = hold_write(monkeypatch, "upsert_submission", released)
+    with ThreadPoolExecutor(1) as pool:
+        first = pool.submit(send)
+        while not writes:  # the first request holds the key from here on
+            released.wait(0.005)
+        second = send()
+        released.set()
+        assert first.result().status_code == 201
+
+    assert second.status_code == 409
+    assert second.headers["Retry-After"] == "1"
+    again = send()
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json() == first.result().json()
+
+
+def test_failed_write_releases_the_key(client):
+    student = login(client, "student1@example.com", "password123")
+    instructor = login(client, "instructor1@example.com", "password123")
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(student),
+        json={"content": "v1"},
+    )
+    sub_id = r.json()["id"]
+
+    r = client.patch(
+        f"/submissions/{sub_id}/grade",
+        headers=auth_header(instructor, "grade-1"),
+        json={"score": 10_000},
+    )
+    assert r.status_code == 400
+
+    db = TestingSessionLocal()
+    try:
+        assert db.query(IdempotencyKey).count() == 0
+    finally:
+        db.close()
+
+
+def test_key_reused_for_different_request_is_rejected(client):
+    student = login(client, "student1@example.com", "password123")
+    headers = auth_header(student, "submit-1")
+
+    client.post("/assignments/1/submissions", headers=headers, json={"content": "a"})
+    r = client.post(
+        "/assignments/1/submissions", headers=headers, json={"content": "b"}
+    )
+    assert r.status_code == 422
+
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(student, "x" * 256),
+        json={"content": "a"},
+    )
+    assert r.status_code == 400
+
+
+def test_keys_are_scoped_per_user(client):
+    from app.core.security import hash_password
+    from app.models.enrollment import Enrollment
+    from app.models.user import User
+
+    db = TestingSessionLocal()
+    try:
+        other = User(
+            email="student2@example.com",
+            role="student",
+            hashed_password=hash_password("password123"),
+        )
+        db.add(other)
+        db.flush()
+        db.add(Enrollment(course_id=1, student_id=other.id))
+        db.commit()
+    finally:
+        db.close()
+
+    bodies = []
+    for email in ("student1@example.com", "student2@example.com"):
+        token = login(client, email, "password123")
+        r = client.post(
+            "/assignments/1/submissions",
+            headers=auth_header(token, "same-key"),
+            json={"content": "x"},
+        )
+        assert "Idempotent-Replayed" not in r.headers
+        bodies.append(r.json())
+    assert bodies[0]["id"] != bodies[1]["id"]
+
+
+def test_expired_keys_are_swept_and_not_replayed(client):
+    student = login(client, "student1@example.com", "password123")
+    headers = auth_header(student, "submit-1")
+    client.post("/assignments/1/submissions", headers=headers, json={"content": "a"})
+
+    db = TestingSessionLocal()
+    try:
+        db.query(IdempotencyKey).update(
+            {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    assert IdempotencySweeper(TestingSessionLocal).sweep_once() == 1
+
+    r = client.post(
+        "/assignments/1/submissions", headers=headers, json={"content": "a"}
+    )
+    assert r.status_code == 201
+    assert "Idempotent-Replayed" not in r.headers
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import GRACE_PERIOD_MINUTES
+from app.services import late_policy
+
+DUE = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def sample_pairs() -> tuple[list, list]:
+    offsets = [
+        None,  # not submitted
+        timedelta(minutes=-30),
+        timedelta(0),
+        timedelta(seconds=30),
+        timedelta(minutes=GRACE_PERIOD_MINUTES),
+        timedelta(minutes=GRACE_PERIOD_MINUTES, seconds=1),
+        timedelta(minutes=GRACE_PERIOD_MINUTES + 1),
+        timedelta(days=1),
+        timedelta(days=1, minutes=1),
+        timedelta(days=3, hours=5),
+        timedelta(days=30),
+    ]
+    due = [DUE] * len(offsets) + [None, DUE.replace(tzinfo=timezone.utc)]
+    submitted = [DUE + o if o is not None else None for o in offsets] + [
+        DUE,
+        # aware timestamp in another zone, 2 days late
+        (DUE + timedelta(days=2))
+        .replace(tzinfo=timezone.utc)
+        .astimezone(timezone(timedelta(hours=-5))),
+    ]
+    return due, submitted
+
+
+def test_late_penalty_policy():
+    assert late_policy.late_penalty(None, DUE) == (False, None, 0, 1.0)
+    assert late_policy.late_penalty(DUE, None) == (False, None, 0, 1.0)
+    assert late_policy.late_penalty(DUE, DUE - timedelta(hours=1)) == (
+        False,
+        0,
+        0,
+        1.0,
+    )
+    within_grace = DUE + timedelta(minutes=GRACE_PERIOD_MINUTES)
+    assert late_policy.late_penalty(DUE, within_grace) == (
+        False,
+        GRACE_PERIOD_MINUTES,
+        0,
+        1.0,
+    )
+    is_late, minutes, days, mult = late_policy.late_penalty(
+        DUE, DUE + timedelta(days=1, minutes=1)
+    )
+    assert (is_late, minutes, days) == (True, 1441, 2)
+    assert mult == pytest.approx(0.8)
+    # deduction is capped
+    assert late_policy.late_penalty(DUE, DUE + timedelta(days=30))[3] == 0.5
+
+
+def test_python_fallback_matches_scalar_policy(monkeypatch):
+    monkeypatch.setattr(late_policy, "np", None)
+    due, submitted = sample_pairs()
+
+    cols = late_policy.late_columns(due, submitted)
+
+    expected = [late_policy.late_penalty(d, s) for d, s in zip(due, submitted)]
+    assert list(zip(*cols)) == expected
+
+
+def test_numpy_engine_matches_scalar_policy():
+    pytest.importorskip("numpy")
+    due, submitted = sample_pairs()
+
+    cols = late_policy.late_columns(due, submitted)
+
+    expected = [late_policy.late_penalty(d, s) for d, s in zip(due, submitted)]
+    assert list(zip(*cols)) == expected
+
+
+def test_late_columns_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        late_policy.late_columns([DUE], [])
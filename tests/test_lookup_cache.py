@@ -0,0 +1,135 @@
+import pytest
+
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.services import lookup_cache
+from app.services.lookup_cache import CacheStats, TTLCache
+from tests.conftest import TestingSessionLocal, auth_header, count_queries, login
+from tests.test_metrics import sample
+
+STUDENT = "student1@example.com"
+
+
+def new_student(client, email: str) -> dict:
+    r = client.post("/auth/register", json={"email": email, "password": "password123"})
+    assert r.status_code in (200, 201), r.text
+    return auth_header(login(client, email))
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.lookup_cache.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl_cache_counts_and_evicts_least_recently_used(clock):
+    cache = TTLCache(capacity=2, ttl=30)
+    loads = []
+
+    def loader(value):
+        def load():
+            loads.append(value)
+            return value
+
+        return load
+
+    assert cache.get_or_load("a", loader("A")) == "A"
+    assert cache.get_or_load("b", loader("B")) == "B"
+    assert cache.get_or_load("a", loader("A2")) == "A"  # hit, and now newest
+    assert cache.get_or_load("c", loader("C")) == "C"  # evicts "b"
+    assert cache.get_or_load("b", loader("B2")) == "B2"
+    assert loads == ["A", "B", "C", "B2"]
+    assert cache.stats() == CacheStats(size=2, hits=1, misses=4, evictions=2)
+
+
+def test_ttl_cache_expires_entries(clock):
+    cache = TTLCache(capacity=10, ttl=30)
+    cache.get_or_load("a", lambda: 1)
+    clock[0] += 29
+    assert cache.get_or_load("a", lambda: 2) == 1
+    clock[0] += 2
+    assert cache.get_or_load("a", lambda: 2) == 2
+
+
+def test_ttl_cache_does_not_keep_misses_or_stale_loads(clock):
+    cache = TTLCache(capacity=10, ttl=30)
+    assert cache.get_or_load("gone", lambda: None) is None
+    assert cache.stats().size == 0
+
+    def load_then_invalidated():
+        # a write lands while the old value is being read
+        cache.invalidate("a")
+        return "old"
+
+    assert cache.get_or_load("a", load_then_invalidated) == "old"
+    assert cache.get_or_load("a", lambda: "new") == "new"
+
+
+def test_warm_lookups_skip_the_database(client):
+    headers = auth_header(login(client, STUDENT))
+    counts = []
+    for _ in range(2):
+        with count_queries() as statements:
+            r = client.get("/courses/1/assignments", headers=headers)
+        assert r.status_code == 200
+        counts.append(len(statements))
+    # course and roster, then only the assignment list itself
+    assert counts == [3, 1]
+
+
+def test_enrolling_invalidates_the_roster(client):
+    newcomer = new_student(client, "student2@example.com")
+
+    # caches course 1's roster without the newcomer
+    r = client.get("/courses/1/assignments", headers=newcomer)
+    assert r.status_code == 403
+
+    r = client.post("/enrollments", json={"course_id": 1}, headers=newcomer)
+    assert r.status_code == 201
+    r = client.get("/courses/1/assignments", headers=newcomer)
+    assert r.status_code == 200
+
+
+def test_enrollments_made_elsewhere_are_not_refused(client):
+    newcomer = new_student(client, "student2@example.com")
+    r = client.get("/courses/1/assignments", headers=newcomer)
+    assert r.status_code == 403
+
+    # e.g. another worker process, which cannot invalidate this one's cache
+    db = TestingSessionLocal()
+    try:
+        student = db.query(User).filter(User.email == "student2@example.com").one()
+        db.add(Enrollment(student_id=student.id, course_id=1))
+        db.commit()
+    finally:
+        db.close()
+
+    r = client.post(
+        "/assignments/1/submissions", json={"content": "x"}, headers=newcomer
+    )
+    assert r.status_code == 201, r.text
+
+
+def test_unknown_ids_are_not_cached(client):
+    headers = auth_header(login(client, STUDENT))
+    for _ in range(2):
+        r = client.get("/courses/999/assignments", headers=headers)
+        assert r.status_code == 404
+    assert lookup_cache.stats()["courses"].size == 0
+
+
+def test_metrics_expose_cache_counters(client):
+    headers = auth_header(login(client, STUDENT))
+    hits = 'lookup_cache_hits_total{cache="courses"}'
+    misses = 'lookup_cache_misses_total{cache="courses"}'
+    before = client.get("/metrics").text
+    for _ in range(3):
+        client.get("/courses/1/assignments", headers=headers)
+
+    text = client.get("/metrics").text
+    assert "# TYPE lookup_cache_hits_total counter" in text
+    assert sample(text, misses) - sample(before, misses) == 1
+    assert sample(text, hits) - sample(before, hits) == 2
+    assert sample(text, 'lookup_cache_entries{cache="members"}') == 1
+    assert 'lookup_cache_evictions_total{cache="assignments"} ' in text
@@ -0,0 +1,74 @@
+import re
+
+from app.core.metrics import RequestMetrics
+from tests.conftest import auth_header, login
+
+
+def sample(text: str, series: str) -> float:
+    """Value of one exposition line, e.g. 'http_requests_total{...}'; 0 if absent."""
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_count_requests_by_route_template(client):
+    headers = auth_header(login(client, "student1@example.com", "password123"))
+    ok = 'http_requests_total{method="GET",route="/courses/{course_id}/assignments",'
+    before = client.get("/metrics").text
+
+    for course_id in (1, 1, 999):
+        client.get(f"/courses/{course_id}/assignments", headers=headers)
+    client.get("/no-such-page")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    assert (
+        sample(text, ok + 'status="200"}') - sample(before, ok + 'status="200"}') == 2
+    )
+    assert (
+        sample(text, ok + 'status="404"}') - sample(before, ok + 'status="404"}') == 1
+    )
+    unmatched = 'http_requests_total{method="GET",route="unmatched",status="404"}'
+    assert sample(text, unmatched) - sample(before, unmatched) == 1
+    # the scrape itself is the one request in flight
+    assert sample(text, "http_requests_in_flight") == 1
+
+    labels = 'method="GET",route="/courses/{course_id}/assignments"'
+    count = sample(text, f"http_request_duration_seconds_count{{{labels}}}")
+    assert sample(
+        text, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'
+    ) == (count)
+    assert count >= 3
+
+
+def test_streamed_response_size_is_recorded(client):
+    headers = auth_header(login(client, "instructor1@example.com", "password123"))
+    series = (
+        "http_response_size_bytes_sum"
+        '{method="GET",route="/courses/{course_id}/gradebook/export.csv"}'
+    )
+    before = sample(client.get("/metrics").text, series)
+
+    r = client.get("/courses/1/gradebook/export.csv", headers=headers)
+    assert r.status_code == 200
+
+    after = sample(client.get("/metrics").text, series)
+    assert after - before == len(r.content)
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = RequestMetrics()
+    for seconds in (0.001, 0.02, 0.02, 30.0):
+        metrics.observe("GET", "/x", 200, seconds, 10)
+    metrics.register_callback("queue_depth", "gauge", "Queued things.", lambda: 3)
+    metrics.register_callback("idle", "gauge", "Not running.", lambda: None)
+
+    text = metrics.render()
+    bucket = 'http_request_duration_seconds_bucket{method="GET",route="/x",le="%s"}'
+    assert sample(text, bucket % "0.005") == 1
+    assert sample(text, bucket % "0.025") == 3
+    assert sample(text, bucket % "10.0") == 3
+    assert sample(text, bucket % "+Inf") == 4
+    assert sample(text, "queue_depth") == 3
+    assert "idle" not in text
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from app.main import app
+from app.workers.password_hasher import PasswordHasher, get_password_hasher
+
+
+@pytest.fixture(scope="module")
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    hasher.start()
+    yield hasher
+    hasher.stop()
+
+
+@pytest.fixture()
+def pooled_client(client, hasher):
+    app.dependency_overrides[get_password_hasher] = lambda: hasher
+    yield client
+
+
+def test_login_and_register_hash_in_pool(pooled_client, hasher):
+    before = hasher.stats().completed
+
+    r = pooled_client.post(
+        "/auth/login",
+        json={"email": "student1@example.com", "password": "password123"},
+    )
+    assert r.status_code == 200, r.text
+    r = pooled_client.post(
+        "/auth/login",
+        json={"email": "student1@example.com", "password": "wrong-password"},
+    )
+    assert r.status_code == 401
+
+    r = pooled_client.post(
+        "/auth/register",
+        json={"email": "new@example.com", "password": "password123"},
+    )
+    assert r.status_code == 201, r.text
+    r = pooled_client.post(
+        "/auth/login", json={"email": "new@example.com", "password": "password123"}
+    )
+    assert r.status_code == 200, r.text
+
+    stats = hasher.stats()
+    assert stats.completed - before == 4
+    assert stats.pending == 0
+
+
+def test_full_pool_turns_logins_away(pooled_client, hasher):
+    busy = hasher._submit(time.sleep, 1)
+    try:
+        r = pooled_client.post(
+            "/auth/login",
+            json={"email": "student1@example.com", "password": "password123"},
+        )
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "1"
+        assert hasher.stats().rejected == 1
+    finally:
+        busy.result()
+
+    # unknown emails are refused before any hashing is queued
+    r = pooled_client.post(
+        "/auth/login", json={"email": "nobody@example.com", "password": "password123"}
+    )
+    assert r.status_code == 401
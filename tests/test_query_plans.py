@@ -0,0 +1,120 @@
+"""
+Query-plan regression tests: every statement the hot endpoints run is put
+through EXPLAIN QUERY PLAN, and none may fall back to a full table scan.
+"""
+
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.db.base import Base
+from app.db.query_stats import query_plan
+from tests.conftest import async_read_engine, auth_header, engine, login, read_engine
+from tests.test_dashboard import add_courses
+
+STUDENT = "student1@example.com"
+INSTRUCTOR = "instructor1@example.com"
+
+# (who, method, path, json body)
+HOT_ENDPOINTS = [
+    (STUDENT, "GET", "/courses/me", None),
+    (STUDENT, "GET", "/courses/me/dashboard", None),
+    (STUDENT, "GET", "/enrollments/me", None),
+    (STUDENT, "GET", "/courses/1/assignments", None),
+    (STUDENT, "GET", "/courses/1/gradebook/me", None),
+    (STUDENT, "POST", "/assignments/1/submissions", {"content": "hello"}),
+    (INSTRUCTOR, "GET", "/instructor/dashboard", None),
+    (INSTRUCTOR, "GET", "/courses/1/gradebook", None),
+    (INSTRUCTOR, "GET", "/courses/1/gradebook?status=submitted", None),
+    (INSTRUCTOR, "GET", "/courses/1/gradebook?format=matrix", None),
+    (INSTRUCTOR, "GET", "/courses/1/gradebook/summary", None),
+    (INSTRUCTOR, "GET", "/courses/1/gradebook/assignments", None),
+    (INSTRUCTOR, "GET", "/courses/1/gradebook/export.csv", None),
+    (INSTRUCTOR, "GET", "/assignments/1/submissions", None),
+    (
+        INSTRUCTOR,
+        "PATCH",
+        "/assignments/1/grades",
+        {"grades": [{"student_id": 1, "score": 90}]},
+    ),
+]
+
+# "SCAN users" is a full scan of the table; "SCAN users USING [COVERING]
+# INDEX ..." walks an index and "SCAN anon_1" reads a materialized subquery
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: LEFT-JOIN)?$")
+
+
+@pytest.fixture()
+def executed():
+    """(statement, parameters) for everything the test engines run."""
+    statements: list[tuple[str, tuple]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if not many:
+            statements.append((statement, parameters))
+
+    targets = (engine, read_engine, async_read_engine.sync_engine)
+    for target in targets:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    for target in targets:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def plans_for(client, executed, email, method, path, body) -> list[tuple[str, list]]:
+    headers = auth_header(login(client, email, "password123"))
+    if method == "PATCH":
+        # something to grade
+        student = auth_header(login(client, STUDENT, "password123"))
+        client.post(
+            "/assignments/1/submissions", json={"content": "x"}, headers=student
+        )
+    add_courses(3)
+
+    executed.clear()
+    r = client.request(method, path, json=body, headers=headers)
+    assert r.status_code < 300, r.text
+    assert executed
+
+    with engine.connect() as conn:
+        return [(st, query_plan(conn, st, params)) for st, params in list(executed)]
+
+
+@pytest.mark.parametrize("email,method,path,body", HOT_ENDPOINTS)
+def test_hot_queries_do_not_scan_tables(client, executed, email, method, path, body):
+    for statement, plan in plans_for(client, executed, email, method, path, body):
+        scanned = [
+            m.group(1)
+            for step in plan
+            if (m := _FULL_SCAN.match(step)) and m.group(1) in Base.metadata.tables
+        ]
+        assert not scanned, f"full scan of {scanned}:\n{statement}\n" + "\n".join(plan)
+
+
+@pytest.mark.parametrize(
+    "email,path",
+    [
+        (STUDENT, "/courses/1/gradebook/me"),
+        (INSTRUCTOR, "/courses/1/gradebook?format=matrix"),
+    ],
+)
+def test_assignment_order_comes_from_the_index(client, executed, email, path):
+    plans = plans_for(client, executed, email, "GET", path, None)
+
+    ordered = [(st, plan) for st, plan in plans if "FROM assignments" in st]
+    assert ordered
+    for statement, plan in ordered:
+        assert any("ix_assignments_course_due" in step for step in plan), plan
+        if "users" not in statement:  # ordered by student first otherwise
+            assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+def test_course_roster_lookup_is_covering(client, executed):
+    plans = plans_for(client, executed, INSTRUCTOR, "GET", "/courses/1/gradebook", None)
+
+    steps = [step for _, plan in plans for step in plan]
+    assert (
+        "SEARCH enrollments USING COVERING INDEX ix_enrollments_course_student "
+        "(course_id=?)"
+    ) in steps, steps
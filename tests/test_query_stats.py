@@ -0,0 +1,58 @@
+import logging
+import re
+
+import pytest
+
+from tests.conftest import auth_header, count_queries, login, max_queries
+from tests.test_dashboard import add_courses
+
+
+@pytest.mark.parametrize("path", ["/courses/me/dashboard", "/courses/me"])
+def test_responses_report_query_count_and_db_time(client, path):
+    headers = auth_header(login(client, "student1@example.com", "password123"))
+
+    with count_queries() as statements:
+        r = client.get(path, headers=headers)
+    assert r.status_code == 200
+
+    assert int(r.headers["x-query-count"]) == len(statements) > 0
+    assert re.fullmatch(r"db;dur=\d+\.\d\d", r.headers["server-timing"])
+
+    # no database work, nothing counted
+    r = client.get("/auth/ping")
+    assert r.headers["x-query-count"] == "0"
+
+
+def test_slow_queries_are_logged_with_their_plan(client, monkeypatch, caplog):
+    headers = auth_header(login(client, "instructor1@example.com", "password123"))
+    monkeypatch.setattr("app.db.query_stats.SLOW_QUERY_THRESHOLD_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.db.query_stats"):
+        r = client.get("/instructor/dashboard", headers=headers)
+    assert r.status_code == 200
+
+    slow = [m for m in caplog.messages if m.startswith("slow query")]
+    assert slow
+    assert any("FROM courses" in m and "SEARCH" in m for m in slow), slow
+    assert not any("example.com" in m for m in slow)
+
+
+# per-endpoint query budgets, checked against nine courses' worth of rows
+QUERY_BUDGETS = [
+    ("student1@example.com", "/courses/me/dashboard", 2),
+    ("student1@example.com", "/courses/me", 1),
+    ("student1@example.com", "/enrollments/me", 1),
+    ("student1@example.com", "/courses/1/gradebook/me", 2),
+    ("instructor1@example.com", "/instructor/dashboard", 1),
+    ("instructor1@example.com", "/courses/1/gradebook", 2),
+]
+
+
+@pytest.mark.parametrize("email,path,budget", QUERY_BUDGETS)
+def test_endpoint_query_budget(client, email, path, budget):
+    headers = auth_header(login(client, email, "password123"))
+    add_courses(8)
+
+    with max_queries(budget):
+        r = client.get(path, headers=headers)
+    assert r.status_code == 200, r.text
@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.single_flight import FlightStats, SingleFlight
+from tests.conftest import auth_header, login
+from tests.test_metrics import sample
+
+INSTRUCTOR = "instructor1@example.com"
+CONCURRENT = 5
+
+
+def coalesced(stats, endpoint: str) -> int:
+    return stats().get(endpoint, FlightStats(0, 0)).coalesced
+
+
+def held_until(joined, compute):
+    """compute, held back until joined() is true (or 10 s have passed)."""
+    release = threading.Event()
+
+    def watch():
+        while not release.is_set():
+            if joined():
+                release.set()
+            release.wait(0.005)
+
+    def held(*args):
+        release.wait(timeout=10)
+        release.set()
+        return compute(*args)
+
+    threading.Thread(target=watch, daemon=True).start()
+    return held
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    flights = SingleFlight()
+    computed = []
+    compute = held_until(
+        lambda: coalesced(flights.stats, "e") == CONCURRENT - 1,
+        lambda: computed.append(1) or ["result"],
+    )
+
+    with ThreadPoolExecutor(CONCURRENT) as pool:
+        results = list(
+            pool.map(lambda _: flights.do("e", "k", compute), range(CONCURRENT))
+        )
+
+    assert computed == [1]
+    assert all(r is results[0] for r in results)
+    assert flights.stats() == {
+        "e": FlightStats(calls=CONCURRENT, coalesced=CONCURRENT - 1)
+    }
+
+
+def test_waiters_get_the_leaders_error():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    compute = held_until(lambda: coalesced(flights.stats, "e") == CONCURRENT - 1, fail)
+    with ThreadPoolExecutor(CONCURRENT) as pool:
+        futures = [
+            pool.submit(flights.do, "e", "k", compute) for _ in range(CONCURRENT)
+        ]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_results_are_not_kept_after_the_flight():
+    flights = SingleFlight()
+    assert flights.do("e", "k", lambda: 1) == 1
+    assert flights.do("e", "k", lambda: 2) == 2
+    assert flights.do("e", "other", lambda: 3) == 3
+    assert flights.stats() == {"e": FlightStats(calls=3, coalesced=0)}
+
+
+@pytest.mark.parametrize(
+    "path,endpoint,heavy",
+    [
+        ("/courses/1/gradebook", "gradebook", "_gradebook_page"),
+        ("/courses/1/gradebook?format=matrix", "gradebook", "_gradebook_matrix"),
+        (
+            "/courses/1/gradebook/assignments",
+            "gradebook/assignments",
+            "_gradebook_assignment_stats",
+        ),
+    ],
+)
+def test_gradebook_stampede_runs_the_query_once(
+    client, monkeypatch, path, endpoint, heavy
+):
+    from app.routers import courses
+    from app.services import single_flight
+
+    headers = auth_header(login(client, INSTRUCTOR))
+    expected = client.get(path, headers=headers).json()
+
+    runs = []
+    original = getattr(courses, heavy)
+
+    def counted(*args):
+        runs.append(1)
+        return original(*args)
+
+    before = coalesced(single_flight.stats, endpoint)
+    joined = before + CONCURRENT - 1
+    monkeypatch.setattr(
+        courses,
+        heavy,
+        held_until(lambda: coalesced(single_flight.stats, endpoint) == joined, counted),
+    )
+
+    with ThreadPoolExecutor(CONCURRENT) as pool:
+        responses = list(
+            pool.map(lambda _: client.get(path, headers=headers), range(CONCURRENT))
+        )
+
+    assert [r.status_code for r in responses] == [200] * CONCURRENT
+    assert all(r.json() == expected for r in responses)
+    assert len(runs) == 1
+
+    text = client.get("/metrics").text
+    series = f'single_flight_coalesced_total{{endpoint="{endpoint}"}}'
+    assert sample(text, series) == joined
@@ -1,19 +1,11 @@
 from datetime import datetime, timedelta, timezone
 
+import pytest
 from sqlalchemy.orm import Session
 
 from app.core.config import GRACE_PERIOD_MINUTES
 from app.models.assignment import Assignment
-
-
-def login(client, email: str, password: str) -> str:
-    r = client.post("/auth/login", json={"email": email, "password": password})
-    assert r.status_code == 200, r.text
-    return r.json()["access_token"]
-
-
-def auth_header(token: str) -> dict:
-    return {"Authorization": f"Bearer {token}"}
+from tests.conftest import auth_header, login
 
 
 def test_submit_and_resubmit_updates_same_row(client):
@@ -66,3 +58,388 @@ def test_late_submission_is_allowed_and_marked_late(client):
     assert body["is_late"] is True
     assert body["late_by_minutes"] is not None
     assert body["late_by_minutes"] > GRACE_PERIOD_MINUTES
+
+
+def _seed_hw1_submissions(n: int) -> list[int]:
+    """n extra enrolled students with HW1 submissions; every third is 2 days late."""
+    from app.core.security import hash_password
+    from app.models.enrollment import Enrollment
+    from app.models.submission import Submission
+    from app.models.user import User
+    from tests.conftest import TestingSessionLocal
+
+    db: Session = TestingSessionLocal()
+    try:
+        hw1 = db.query(Assignment).filter(Assignment.id == 1).one()
+        hashed = hash_password("password123")
+        students = [
+            User(email=f"bulk{i}@example.com", role="student", hashed_password=hashed)
+            for i in range(n)
+        ]
+        db.add_all(students)
+        db.flush()
+        db.add_all(Enrollment(course_id=1, student_id=s.id) for s in students)
+        subs = [
+            Submission(
+                assignment_id=hw1.id,
+                student_id=s.id,
+                content="hw1",
+                submitted_at=hw1.due_at
+                + (timedelta(days=2) if i % 3 == 0 else timedelta(hours=-1)),
+            )
+            for i, s in enumerate(students)
+        ]
+        db.add_all(subs)
+        db.commit()
+        return [s.id for s in subs]
+    finally:
+        db.close()
+
+
+def test_bulk_grade_applies_late_penalty_and_reports_per_item(client):
+    instructor = login(client, "instructor1@example.com", "password123")
+    late_id, on_time_id, _ = _seed_hw1_submissions(3)
+
+    r = client.patch(
+        "/assignments/1/grades",
+        headers=auth_header(instructor),
+        json={
+            "grades": [
+                {"submission_id": late_id, "score": 80, "feedback": "ok"},
+                {"submission_id": on_time_id, "score": 90},
+                {"submission_id": 999_999, "score": 50},
+                {"submission_id": on_time_id, "score": 10},
+                {"student_id": 999_999, "score": 50},
+                {"submission_id": late_id + 2, "score": 101},
+            ]
+        },
+    )
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["graded"], body["failed"]) == (2, 4)
+
+    results = body["results"]
+    assert [x["status"] for x in results] == ["graded", "graded"] + ["error"] * 4
+    assert results[0]["is_late"] is True
+    assert results[0]["score"] == 64  # 2 days late: -20%
+    assert results[1]["score"] == 90
+    assert "more than once" in results[3]["error"]
+    assert "between 0 and 100" in results[5]["error"]
+
+    subs = client.get("/assignments/1/submissions", headers=auth_header(instructor))
+    by_id = {s["id"]: s for s in subs.json()}
+    assert by_id[late_id]["score"] == 64
+    assert by_id[late_id]["feedback"].startswith("ok\nLate penalty applied: -20%")
+    assert by_id[on_time_id]["feedback"] is None
+    assert by_id[late_id + 2]["score"] is None
+
+
+def test_bulk_grade_by_student_matches_single_grade(client):
+    instructor = login(client, "instructor1@example.com", "password123")
+    late_id, _, _ = _seed_hw1_submissions(3)
+
+    single = client.patch(
+        f"/submissions/{late_id}/grade",
+        headers=auth_header(instructor),
+        json={"score": 70, "feedback": "see notes"},
+    ).json()
+
+    subs = client.get("/assignments/1/submissions", headers=auth_header(instructor))
+    student_id = next(s["student_id"] for s in subs.json() if s["id"] == late_id)
+    r = client.patch(
+        "/assignments/1/grades",
+        headers=auth_header(instructor),
+        json={
+            "grades": [{"student_id": student_id, "score": 70, "feedback": "see notes"}]
+        },
+    )
+    assert r.status_code == 200, r.text
+    [result] = r.json()["results"]
+    assert result["submission_id"] == late_id
+    assert result["score"] == single["score"]
+    assert result["late_by_minutes"] == single["late_by_minutes"]
+
+
+def test_bulk_grade_query_count_is_constant(client):
+    from tests.conftest import count_queries
+
+    instructor = login(client, "instructor1@example.com", "password123")
+
+    def grade(ids):
+        with count_queries() as queries:
+            r = client.patch(
+                "/assignments/1/grades",
+                headers=auth_header(instructor),
+                json={"grades": [{"submission_id": i, "score": 50} for i in ids]},
+            )
+        assert r.status_code == 200, r.text
+        assert r.json()["graded"] == len(ids)
+        return len(queries)
+
+    ids = _seed_hw1_submissions(30)
+    grade(ids[:3])  # warm the lookup cache
+    assert grade(ids[:3]) == grade(ids)
+
+
+def test_bulk_grade_requires_course_instructor(client):
+    student = login(client, "student1@example.com", "password123")
+    r = client.patch(
+        "/assignments/1/grades",
+        headers=auth_header(student),
+        json={"grades": [{"student_id": 1, "score": 10}]},
+    )
+    assert r.status_code == 403
+
+
+def test_bulk_grade_item_needs_exactly_one_target(client):
+    instructor = login(client, "instructor1@example.com", "password123")
+    r = client.patch(
+        "/assignments/1/grades",
+        headers=auth_header(instructor),
+        json={"grades": [{"submission_id": 1, "student_id": 1, "score": 10}]},
+    )
+    assert r.status_code == 422
+
+
+def test_submit_runs_constant_statement_count(client):
+    from tests.conftest import count_queries
+
+    student = login(client, "student1@example.com", "password123")
+    # the first submit loads the assignment and the course roster into the
+    # lookup cache; after that: upsert, 2 stats upserts, course version bump
+    # (the caller comes from the token's claims, not a users lookup)
+    for content, expected in (("first", 6), ("resubmit", 4), ("again", 4)):
+        with count_queries() as statements:
+            r = client.post(
+                "/assignments/1/submissions",
+                headers=auth_header(student),
+                json={"content": content},
+            )
+        assert r.status_code == 201, r.text
+        assert len(statements) == expected, statements
+
+
+def test_resubmit_clears_grade(client):
+    student = login(client, "student1@example.com", "password123")
+    instructor = login(client, "instructor1@example.com", "password123")
+
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(student),
+        json={"content": "v1"},
+    )
+    sub_id = r.json()["id"]
+    r = client.patch(
+        f"/submissions/{sub_id}/grade",
+        headers=auth_header(instructor),
+        json={"score": 80, "feedback": "nice"},
+    )
+    assert r.json()["score"] == 80
+
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(student),
+        json={"content": "v2"},
+    )
+    body = r.json()
+    assert (body["id"], body["content"]) == (sub_id, "v2")
+    assert (body["score"], body["feedback"], body["graded_at"]) == (None, None, None)
+
+
+def test_submit_checks_assignment_and_enrollment(client):
+    student = login(client, "student1@example.com", "password123")
+    r = client.post(
+        "/assignments/999/submissions",
+        headers=auth_header(student),
+        json={"content": "x"},
+    )
+    assert r.status_code == 404
+
+    from app.core.security import hash_password
+    from app.models.user import User
+    from tests.conftest import TestingSessionLocal
+
+    db: Session = TestingSessionLocal()
+    try:
+        db.add(
+            User(
+                email="outsider@example.com",
+                role="student",
+                hashed_password=hash_password("password123"),
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    outsider = login(client, "outsider@example.com", "password123")
+    r = client.post(
+        "/assignments/1/submissions",
+        headers=auth_header(outsider),
+        json={"content": "x"},
+    )
+    assert r.status_code == 403
+
+
+def test_parallel_submits_never_collide(client):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.core.security import create_user_access_token
+    from app.models.submission import Submission
+    from app.models.user import User
+    from tests.conftest import TestingSessionLocal
+    from tests.test_grade_stats import rebuilt_snapshot, stats_snapshot
+
+    late_id, *_ = _seed_hw1_submissions(20)
+    db: Session = TestingSessionLocal()
+    try:
+        students = (
+            db.query(User)
+            .join(Submission, Submission.student_id == User.id)
+            .filter(Submission.id >= late_id)
+            .all()
+        )
+    finally:
+        db.close()
+
+    # 20 students x 10 submits each, all in flight at once
+    student_ids = [student.id for student in students]
+    tokens = [create_user_access_token(student) for student in students]
+    jobs = [(token, n) for n in range(10) for token in tokens]
+
+    def submit(job):
+        token, n = job
+        r = client.post(
+            "/assignments/1/submissions",
+            headers=auth_header(token),
+            json={"content": f"attempt {n}"},
+        )
+        return r.status_code
+
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        codes = list(pool.map(submit, jobs))
+
+    assert len(codes) == 200
+    assert set(codes) == {201}
+
+    db = TestingSessionLocal()
+    try:
+        rows = (
+            db.query(Submission.student_id)
+            .filter(Submission.student_id.in_(student_ids))
+            .all()
+        )
+    finally:
+        db.close()
+    assert sorted(r.student_id for r in rows) == sorted(student_ids)
+    assert stats_snapshot() == rebuilt_snapshot()
+
+
+def test_group_commit_batches_parallel_submits(client, group_commit_writer):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.core.security import create_user_access_token
+    from app.models.submission import Submission
+    from app.models.user import User
+    from tests.conftest import TestingSessionLocal
+    from tests.test_grade_stats import rebuilt_snapshot, stats_snapshot
+
+    first_id, *_ = _seed_hw1_submissions(40)
+    db: Session = TestingSessionLocal()
+    try:
+        students = (
+            db.query(User)
+            .join(Submission, Submission.student_id == User.id)
+            .filter(Submission.id >= first_id)
+            .all()
+        )
+    finally:
+        db.close()
+    student_ids = [student.id for student in students]
+    tokens = [create_user_access_token(student) for student in students]
+
+    def submit(token):
+        r = client.post(
+            "/assignments/1/submissions",
+            headers=auth_header(token),
+            json={"content": "surge"},
+        )
+        return r.status_code, r.json()
+
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        results = list(pool.map(submit, tokens * 5))
+
+    assert {code for code, _ in results} == {201}
+    assert group_commit_writer.batches < len(results)
+
+    # acknowledged means committed: every response matches what is stored
+    db = TestingSessionLocal()
+    try:
+        stored = {
+            s.id: s
+            for s in db.query(Submission).filter(Submission.student_id.in_(student_ids))
+        }
+    finally:
+        db.close()
+    assert {body["id"] for _, body in results} == set(stored)
+    assert all(s.content == "surge" and s.score is None for s in stored.values())
+    assert stats_snapshot() == rebuilt_snapshot()
+
+
+def test_group_commit_failure_is_isolated(group_commit_writer):
+    from app.models.submission import Submission
+    from tests.conftest import TestingSessionLocal
+
+    ok_id, *_ = _seed_hw1_submissions(1)
+    db: Session = TestingSessionLocal()
+    try:
+        sub = db.query(Submission).filter(Submission.id == ok_id).one()
+        student_id = sub.student_id
+    finally:
+        db.close()
+
+    now = datetime.now(timezone.utc)
+    good = group_commit_writer.submit(1, 1, student_id, "fine", now)
+    bad = group_commit_writer.submit(1, 1, student_id, None, now)  # NOT NULL
+
+    assert good.result(timeout=5)["content"] == "fine"
+    with pytest.raises(Exception):
+        bad.result(timeout=5)
+
+
+def test_group_commit_survives_a_cancelled_waiter():
+    from app.models.submission import Submission
+    from app.workers.submission_writer import SubmissionWriter
+    from tests.conftest import TestingSessionLocal
+
+    first_id, second_id = _seed_hw1_submissions(2)[:2]
+    db: Session = TestingSessionLocal()
+    try:
+        student_ids = [
+            db.get(Submission, sub_id).student_id for sub_id in (first_id, second_id)
+        ]
+    finally:
+        db.close()
+
+    # a long window, so both submits land in one batch
+    writer = SubmissionWriter(TestingSessionLocal, window_ms=200)
+    writer.start()
+    try:
+        now = datetime.now(timezone.utc)
+        gone = writer.submit(1, 1, student_ids[0], "gone", now)
+        kept = writer.submit(1, 1, student_ids[1], "kept", now)
+        assert gone.cancel()  # the client went away mid-batch
+
+        assert kept.result(timeout=5)["content"] == "kept"
+        assert writer.batches == 1  # committed once, not retried per item
+        db = TestingSessionLocal()
+        try:
+            assert db.get(Submission, first_id).content == "gone"
+        finally:
+            db.close()
+
+        later = writer.submit(1, 1, student_ids[0], "later", now)
+        assert later.result(timeout=5)["content"] == "later"
+    finally:
+        writer.stop()
+    assert writer.batches == 2